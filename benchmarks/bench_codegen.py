@@ -0,0 +1,50 @@
+"""
+Benchmark del mapeo a esquema relacional y de la generación de modelos.
+
+Uso:
+    python benchmarks/bench_codegen.py -n 10000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ontology2db.codegen import SQLAlchemyGenerator
+from ontology2db.mapper import OntologyMapper
+from ontology2db.parser import OntologyParser
+from synthetic import write_synthetic_ontology
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de mapper y codegen")
+    parser.add_argument("-n", "--classes", type=int, default=10000,
+                        help="Número de clases sintéticas (default: 10000)")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.xml")
+        write_synthetic_ontology(path, args.classes)
+        ontology = OntologyParser().parse(path)
+        
+        start = time.perf_counter()
+        schema = OntologyMapper().map(ontology)
+        mapped = time.perf_counter()
+        SQLAlchemyGenerator().generate(schema, os.path.join(tmp, "models.py"))
+        generated = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            SQLAlchemyGenerator().export_ddl_to_files(schema, os.path.join(tmp, "ddl"))
+        exported = time.perf_counter()
+        
+        print(f"{args.classes} clases, {len(schema.tables)} tablas")
+        print(f"  mapper  {mapped - start:8.3f} s")
+        print(f"  codegen {generated - mapped:8.3f} s")
+        print(f"  ddl     {exported - generated:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
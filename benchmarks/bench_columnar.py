@@ -0,0 +1,87 @@
+"""
+Benchmark de la representación columnar (ColumnarOntology).
+
+Para tamaños crecientes compara la memoria retenida por el modelo de
+objetos y por el columnar, y el tiempo de OntologyMapper.map sobre cada
+uno. "map vistas" mapea el columnar a través de sus vistas de fila
+(ClassRow, RelationRow), como si fuera una Ontology, para comparar con el
+camino que lee directamente los arrays. En el columnar memoria y tiempo
+deben crecer linealmente.
+
+Uso:
+    python benchmarks/bench_columnar.py -n 10000 --steps 3
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ontology2db.columnar import ColumnarOntology
+from ontology2db.mapper import OntologyMapper
+from ontology2db.parser import OntologyParser
+from synthetic import write_synthetic_ontology
+
+
+def retained(build):
+    """Retorna (resultado, bytes retenidos) de ``build``."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def timed(func, repeat: int = 3) -> float:
+    """Mejor tiempo de ``repeat`` ejecuciones de ``func``."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la ontología columnar")
+    parser.add_argument("-n", "--classes", type=int, default=10000,
+                        help="Número de clases del primer tamaño (default: 10000)")
+    parser.add_argument("--steps", type=int, default=3,
+                        help="Tamaños a medir, duplicando cada vez (default: 3)")
+    args = parser.parse_args()
+    
+    ontology_parser = OntologyParser()
+    mapper = OntologyMapper()
+    
+    print(f"{'clases':>8s} {'objetos MB':>11s} {'columnas MB':>12s} "
+          f"{'map objetos':>12s} {'map vistas':>11s} {'map columnas':>13s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for step in range(args.steps):
+            num_classes = args.classes * 2 ** step
+            xml_file = os.path.join(tmp, f"synthetic_{num_classes}.xml")
+            write_synthetic_ontology(xml_file, num_classes)
+            
+            ontology, object_bytes = retained(lambda: ontology_parser.parse(xml_file))
+            columnar, columnar_bytes = retained(
+                lambda: ColumnarOntology.from_items(ontology_parser.iterparse(xml_file)))
+            
+            # Sin ser una ColumnarOntology el mapper recorre las vistas
+            views = SimpleNamespace(classes=columnar.classes, relations=columnar.relations)
+            object_time = timed(lambda: mapper.map(ontology))
+            views_time = timed(lambda: mapper.map(views))
+            columnar_time = timed(lambda: mapper.map(columnar))
+            print(f"{num_classes:8d} {object_bytes / 1e6:11.1f} {columnar_bytes / 1e6:12.1f} "
+                  f"{object_time:11.3f}s {views_time:10.3f}s {columnar_time:12.3f}s")
+            del ontology, columnar
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark del parseo de entradas comprimidas (plano vs gzip/bz2/xz).
+
+Uso:
+    python benchmarks/bench_compression.py -n 20000 --repeat 3
+"""
+import argparse
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ontology2db.parser import OntologyParser
+from synthetic import write_synthetic_ontology
+
+CODECS = {
+    "plano": (None, ""),
+    "gzip": (gzip.open, ".gz"),
+    "bz2": (bz2.open, ".bz2"),
+    "xz": (lzma.open, ".xz"),
+}
+
+
+def best_time(func, repeat: int) -> float:
+    """Retorna el mejor tiempo de ``repeat`` ejecuciones."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compress(xml_file: str, opener, suffix: str) -> str:
+    """Escribe una copia comprimida de ``xml_file`` y retorna su ruta."""
+    if opener is None:
+        return xml_file
+    target = xml_file + suffix
+    with open(xml_file, "rb") as src, opener(target, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de entradas comprimidas")
+    parser.add_argument("-n", "--classes", type=int, default=20000,
+                        help="Número de clases sintéticas (default: 20000)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Repeticiones por medida (default: 3)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Parsear en streaming")
+    args = parser.parse_args()
+    
+    ontology_parser = OntologyParser()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_file = os.path.join(tmp, "synthetic.xml")
+        write_synthetic_ontology(xml_file, args.classes)
+        size_mb = os.path.getsize(xml_file) / 1e6
+        print(f"Ontología sintética: {args.classes} clases, {size_mb:.1f} MB\n")
+        
+        for codec, (opener, suffix) in CODECS.items():
+            path = compress(xml_file, opener, suffix)
+            disk_mb = os.path.getsize(path) / 1e6
+            elapsed = best_time(
+                lambda: ontology_parser.parse(path, streaming=args.streaming),
+                args.repeat)
+            print(f"  {codec:6s} {disk_mb:8.1f} MB en disco {elapsed:8.3f} s "
+                  f"({size_mb / elapsed:6.1f} MB/s de XML)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark del extractor de paquetes Python sobre un paquete sintético.
+
+Uso:
+    python benchmarks/bench_extractor.py -m 2000 -c 20 -j 1 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ontology2db.extractor import PackageExtractor
+
+
+def write_synthetic_package(root: str, modules: int, classes: int):
+    """
+    Paquete con ``modules`` módulos de ``classes`` clases cada uno. Cada
+    clase hereda de una clase del módulo anterior (importada) y referencia
+    con un ``*_id`` a otra del mismo módulo.
+    """
+    package = os.path.join(root, "synthpkg")
+    os.makedirs(package)
+    with open(os.path.join(package, "__init__.py"), "w") as f:
+        f.write('"""Paquete sintético."""\n')
+    for m in range(modules):
+        lines = []
+        if m:
+            lines.append(f"from .mod{m - 1} import C{m - 1}_0 as Base\n")
+        for c in range(classes):
+            base = "Base" if m else "object"
+            lines.append(f"class C{m}_{c}({base}):\n")
+            lines.append(f'    """Clase {c} del módulo {m}."""\n')
+            lines.append(f"    def __init__(self, name: str, value: int, "
+                         f"c{m}_{max(c - 1, 0)}_id=None, **kwargs):\n")
+            lines.append("        super().__init__(**kwargs)\n\n")
+        with open(os.path.join(package, f"mod{m}.py"), "w") as f:
+            f.writelines(lines)
+    return package
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del extractor de paquetes")
+    parser.add_argument("-m", "--modules", type=int, default=2000,
+                        help="Número de módulos (default: 2000)")
+    parser.add_argument("-c", "--classes", type=int, default=20,
+                        help="Clases por módulo (default: 20)")
+    parser.add_argument("-j", "--jobs", type=int, nargs="+", default=[1, 4],
+                        help="Procesos a comparar (default: 1 4)")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        package = write_synthetic_package(tmp, args.modules, args.classes)
+        output = os.path.join(tmp, "ontology.xml")
+        print(f"{args.modules} módulos, {args.modules * args.classes} clases")
+        
+        for jobs in args.jobs:
+            start = time.perf_counter()
+            stats = PackageExtractor(workers=jobs).extract(package, output)
+            elapsed = time.perf_counter() - start
+            print(f"  -j {jobs:<3d} {elapsed:8.3f} s, {stats.classes} clases, "
+                  f"{stats.relations} relaciones, "
+                  f"{os.path.getsize(output) / 1e6:.1f} MB de XML")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark de las descripciones diferidas (lazy_descriptions).
+
+Mide el tiempo de parseo y la memoria retenida y pico con las
+descripciones cargadas y con las descripciones leídas bajo demanda.
+
+Uso:
+    python benchmarks/bench_lazy.py -n 20000 --doc-lines 25
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ontology2db.parser import OntologyParser, _tokenize_docstring
+from synthetic import write_synthetic_ontology
+
+
+def measure(xml_file: str, lazy: bool):
+    """Retorna (segundos, bytes retenidos, bytes pico) de un parseo."""
+    _tokenize_docstring.cache_clear()
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    ontology = OntologyParser(lazy_descriptions=lazy).parse(xml_file)
+    elapsed = time.perf_counter() - start
+    # El LRU de docstrings no forma parte de la ontología
+    _tokenize_docstring.cache_clear()
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del ontology
+    return elapsed, retained, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de descripciones diferidas")
+    parser.add_argument("-n", "--classes", type=int, default=20000,
+                        help="Número de clases sintéticas (default: 20000)")
+    parser.add_argument("--doc-lines", type=int, default=25,
+                        help="Líneas extra por descripción de clase (default: 25)")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_file = os.path.join(tmp, "synthetic.xml")
+        write_synthetic_ontology(xml_file, args.classes, args.doc_lines)
+        size_mb = os.path.getsize(xml_file) / 1e6
+        print(f"Ontología sintética: {args.classes} clases, {size_mb:.1f} MB\n")
+        
+        for label, lazy in (("cargadas", False), ("diferidas", True)):
+            elapsed, retained, peak = measure(xml_file, lazy)
+            print(f"  {label:9s} {elapsed:8.3f} s  retenida {retained / 1e6:7.1f} MB  "
+                  f"pico {peak / 1e6:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
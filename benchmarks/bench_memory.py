@@ -0,0 +1,117 @@
+"""
+Benchmark de memoria del modelo parseado.
+
+Compara el modelo actual (dataclasses con __slots__ y cadenas internadas)
+con una réplica del modelo anterior (dataclasses con __dict__ y una copia
+de cada cadena por instancia), y el parseo con y sin atributos compartidos
+(``share_attributes``).
+
+Uso:
+    python benchmarks/bench_memory.py -n 20000
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+from dataclasses import dataclass, field, replace
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ontology2db.parser import OntologyParser
+from synthetic import write_synthetic_ontology
+
+
+@dataclass
+class LegacyAttribute:
+    name: str
+    type: str
+    cardinality: str = "1"
+    description: Optional[str] = None
+
+
+@dataclass
+class LegacyClass:
+    id: str
+    name: str
+    description: Optional[str] = None
+    attributes: List[LegacyAttribute] = field(default_factory=list)
+
+
+def copy_str(value: Optional[str]) -> Optional[str]:
+    """Copia una cadena (como hace el parser XML con cada valor leído)."""
+    return None if value is None else "".join(list(value))
+
+
+def to_legacy(ontology) -> List[LegacyClass]:
+    """Replica las clases con el modelo anterior."""
+    return [
+        LegacyClass(copy_str(cls.id), copy_str(cls.name), cls.description, [
+            LegacyAttribute(copy_str(attr.name), copy_str(attr.type),
+                            copy_str(attr.cardinality), attr.description)
+            for attr in cls.attributes
+        ])
+        for cls in ontology.classes
+    ]
+
+
+def measure(build) -> int:
+    """Bytes retenidos por el resultado de ``build``."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de memoria del modelo")
+    parser.add_argument("-n", "--classes", type=int, default=20000,
+                        help="Número de clases sintéticas (default: 20000)")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_file = os.path.join(tmp, "synthetic.xml")
+        write_synthetic_ontology(xml_file, args.classes)
+        ontology = OntologyParser().parse(xml_file)
+        separate = measure(lambda: OntologyParser().parse(xml_file))
+        shared_parser = OntologyParser(share_attributes=True)
+        shared = measure(lambda: shared_parser.parse(xml_file))
+        stats = shared_parser.stats
+    
+    num_attrs = sum(len(cls.attributes) for cls in ontology.classes)
+    # Las descripciones son idénticas en ambos modelos: se excluyen
+    for cls in ontology.classes:
+        cls.description = None
+        cls.attributes = [replace(attr, description=None) for attr in cls.attributes]
+    
+    current = measure(lambda: [
+        type(cls)(copy_str(cls.id), copy_str(cls.name), None, [
+            type(attr)(copy_str(attr.name), copy_str(attr.type),
+                       copy_str(attr.cardinality))
+            for attr in cls.attributes
+        ])
+        for cls in ontology.classes
+    ])
+    legacy = measure(lambda: to_legacy(ontology))
+    
+    print(f"{len(ontology.classes)} clases, {num_attrs} atributos\n")
+    print(f"  Modelo anterior:  {legacy / 1e6:8.2f} MB ({legacy / num_attrs:6.1f} B/atributo)")
+    print(f"  Modelo actual:    {current / 1e6:8.2f} MB ({current / num_attrs:6.1f} B/atributo)")
+    print(f"  Reducción:        {legacy / current:8.2f}x")
+    
+    print(f"\nParseo completo ({stats.shared_attributes} de {stats.attributes} "
+          f"atributos compartidos)\n")
+    print(f"  Sin compartir:    {separate / 1e6:8.2f} MB")
+    print(f"  Compartidos:      {shared / 1e6:8.2f} MB")
+    print(f"  Reducción:        {separate / shared:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark del parser OWL (RDF/XML y OWL/XML) sobre ontologías sintéticas.
+
+Uso:
+    python benchmarks/bench_owl.py -n 100000
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ontology2db.owl import OWLParser
+from ontology2db.parser import LET
+from synthetic import write_synthetic_owl
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del parser OWL")
+    parser.add_argument("-n", "--classes", type=int, default=100000,
+                        help="Número de clases sintéticas (default: 100000)")
+    parser.add_argument("--memory", action="store_true",
+                        help="Medir también la memoria retenida y pico (más lento)")
+    args = parser.parse_args()
+    
+    engines = ["stdlib"] + (["lxml"] if LET is not None else [])
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for syntax in ("rdfxml", "owlxml"):
+            path = os.path.join(tmp, f"synthetic.{syntax}")
+            write_synthetic_owl(path, args.classes, syntax)
+            size_mb = os.path.getsize(path) / 1e6
+            print(f"{syntax}: {args.classes} clases, {size_mb:.1f} MB")
+            
+            for engine in engines:
+                start = time.perf_counter()
+                ontology = OWLParser(engine=engine).parse(path)
+                elapsed = time.perf_counter() - start
+                print(f"  {engine:7s} {elapsed:8.3f} s ({size_mb / elapsed:6.1f} MB/s), "
+                      f"{len(ontology.classes)} clases, {len(ontology.relations)} relaciones")
+                del ontology
+            
+            if args.memory:
+                gc.collect()
+                tracemalloc.start()
+                ontology = OWLParser(engine=engines[0]).parse(path)
+                retained, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"  memoria: retenida {retained / 1e6:.1f} MB, pico {peak / 1e6:.1f} MB")
+                del ontology
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark de los motores de parseo (stdlib vs lxml) y del parseo paralelo.
+
+Uso:
+    python benchmarks/bench_parser.py -n 20000 --repeat 3 -j 2 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ontology2db.parser import OntologyParser, LET
+from synthetic import write_synthetic_ontology
+
+
+def best_time(func, repeat: int) -> float:
+    """Retorna el mejor tiempo de ``repeat`` ejecuciones."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de motores de parseo")
+    parser.add_argument("-n", "--classes", type=int, default=20000,
+                        help="Número de clases sintéticas (default: 20000)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Repeticiones por medida (default: 3)")
+    parser.add_argument("-j", "--jobs", type=int, nargs="+", default=[2, 4],
+                        help="Workers del parseo paralelo (default: 2 4)")
+    args = parser.parse_args()
+    
+    engines = ["stdlib"] + (["lxml"] if LET is not None else [])
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        xml_file = os.path.join(tmp, "synthetic.xml")
+        write_synthetic_ontology(xml_file, args.classes)
+        size_mb = os.path.getsize(xml_file) / 1e6
+        print(f"Ontología sintética: {args.classes} clases, {size_mb:.1f} MB\n")
+        
+        results = {}
+        for engine in engines:
+            ontology_parser = OntologyParser(engine=engine)
+            for streaming in (False, True):
+                elapsed = best_time(
+                    lambda: ontology_parser.parse(xml_file, streaming=streaming),
+                    args.repeat)
+                results[(engine, streaming)] = elapsed
+                mode = "streaming" if streaming else "árbol"
+                print(f"  {engine:7s} {mode:10s} {elapsed:8.3f} s "
+                      f"({size_mb / elapsed:6.1f} MB/s)")
+        
+        if "lxml" in engines:
+            print()
+            for streaming in (False, True):
+                mode = "streaming" if streaming else "árbol"
+                speedup = results[("stdlib", streaming)] / results[("lxml", streaming)]
+                print(f"  Speedup lxml ({mode}): {speedup:.2f}x")
+        
+        # Con más workers que núcleos el parser usa uno por núcleo
+        print(f"\nParseo paralelo ({os.cpu_count()} núcleos):")
+        engine = engines[-1]
+        ontology_parser = OntologyParser(engine=engine)
+        for jobs in args.jobs:
+            elapsed = best_time(lambda: ontology_parser.parse(xml_file, workers=jobs),
+                                args.repeat)
+            speedup = results[(engine, False)] / elapsed
+            print(f"  {engine:7s} -j {jobs:<3d} {elapsed:8.3f} s ({speedup:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
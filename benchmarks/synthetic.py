@@ -0,0 +1,165 @@
+"""
+Generador de ontologías sintéticas para los benchmarks.
+"""
+import argparse
+
+
+CLASS_TEMPLATE = """    <Class name="{name}">
+        <description>Clase sintética {name}
+{details}
+Inherits :class:`{base}`.
+
+:param name: The identifier for use in user interfaces, visualization, analysis, etc
+:type name: string, optional
+:param event_time: Time at which the event started
+:type event_time: datetime.datetime, optional
+:param target_ids: One or more IDs identifying the CyberObject(s) targeted in
+    the event
+:type target_ids: list, optional</description>
+        <Attributes>
+            <Attribute name="{lower}_id" type="integer" cardinality="1" primary_key="true" />
+            <Attribute name="name" type="string" cardinality="1" />
+            <Attribute name="event_time" type="string" cardinality="0..1" />
+            <Attribute name="target_ids" type="string" cardinality="1" />
+        </Attributes>
+    </Class>
+"""
+
+RELATION_TEMPLATE = ('        <Relation name="is_a" source="{source}" '
+                     'target="{target}" />\n')
+
+
+DETAIL_LINE = ("Detalle {i} de la documentación de la clase, como en los "
+               "docstrings largos de CyberDEM.\n")
+
+
+def write_synthetic_ontology(path: str, num_classes: int, doc_lines: int = 0):
+    """
+    Escribe una ontología sintética con estilo CyberDEM.
+    
+    Cada clase hereda (``is_a``) de la clase ``i // 2``, lo que produce
+    un árbol binario de ``num_classes - 1`` relaciones.
+    
+    Args:
+        path: Ruta del archivo XML de salida
+        num_classes: Número de clases a generar
+        doc_lines: Líneas extra en la descripción de cada clase
+    """
+    details = "".join(DETAIL_LINE.format(i=i) for i in range(doc_lines))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<?xml version='1.0' encoding='utf-8'?>\n<Ontology>\n")
+        for i in range(num_classes):
+            name = f"Class{i}"
+            f.write(CLASS_TEMPLATE.format(name=name, lower=name.lower(),
+                                          base=f"Class{i // 2}",
+                                          details=details))
+        f.write("    <Relations>\n")
+        for i in range(1, num_classes):
+            f.write(RELATION_TEMPLATE.format(source=f"Class{i}",
+                                             target=f"Class{i // 2}"))
+        f.write("    </Relations>\n</Ontology>\n")
+
+
+RDF_HEADER = """<?xml version="1.0" encoding="utf-8"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:rdfs="http://www.w3.org/2000/01/rdf-schema#"
+         xmlns:owl="http://www.w3.org/2002/07/owl#"
+         xml:base="http://example.org/synthetic">
+    <owl:DatatypeProperty rdf:about="#name">
+        <rdfs:range rdf:resource="http://www.w3.org/2001/XMLSchema#string"/>
+        <rdfs:comment>The identifier for use in user interfaces</rdfs:comment>
+    </owl:DatatypeProperty>
+    <owl:ObjectProperty rdf:about="#targets"/>
+"""
+
+RDF_CLASS_TEMPLATE = """    <owl:Class rdf:about="#{name}">
+        <rdfs:comment>Clase sintética {name}</rdfs:comment>
+        <rdfs:subClassOf rdf:resource="{base}"/>
+        <rdfs:subClassOf>
+            <owl:Restriction>
+                <owl:onProperty rdf:resource="#name"/>
+                <owl:cardinality>1</owl:cardinality>
+            </owl:Restriction>
+        </rdfs:subClassOf>
+        <rdfs:subClassOf>
+            <owl:Restriction>
+                <owl:onProperty rdf:resource="#targets"/>
+                <owl:maxQualifiedCardinality>1</owl:maxQualifiedCardinality>
+                <owl:onClass rdf:resource="#{target}"/>
+            </owl:Restriction>
+        </rdfs:subClassOf>
+    </owl:Class>
+    <owl:DatatypeProperty rdf:about="#{lower}_code">
+        <rdf:type rdf:resource="http://www.w3.org/2002/07/owl#FunctionalProperty"/>
+        <rdfs:domain rdf:resource="#{name}"/>
+        <rdfs:range rdf:resource="http://www.w3.org/2001/XMLSchema#integer"/>
+    </owl:DatatypeProperty>
+"""
+
+OWLXML_HEADER = """<?xml version="1.0" encoding="utf-8"?>
+<Ontology xmlns="http://www.w3.org/2002/07/owl#"
+          ontologyIRI="http://example.org/synthetic">
+    <Prefix name="xsd" IRI="http://www.w3.org/2001/XMLSchema#"/>
+    <Prefix name="rdfs" IRI="http://www.w3.org/2000/01/rdf-schema#"/>
+    <Declaration><DataProperty IRI="#name"/></Declaration>
+    <Declaration><ObjectProperty IRI="#targets"/></Declaration>
+    <DataPropertyRange><DataProperty IRI="#name"/><Datatype abbreviatedIRI="xsd:string"/></DataPropertyRange>
+    <AnnotationAssertion><AnnotationProperty abbreviatedIRI="rdfs:comment"/><IRI>#name</IRI><Literal>The identifier for use in user interfaces</Literal></AnnotationAssertion>
+"""
+
+OWLXML_CLASS_TEMPLATE = """    <Declaration><Class IRI="#{name}"/></Declaration>
+    <AnnotationAssertion><AnnotationProperty abbreviatedIRI="rdfs:comment"/><IRI>#{name}</IRI><Literal>Clase sintética {name}</Literal></AnnotationAssertion>
+    <SubClassOf><Class IRI="#{name}"/><Class IRI="{base}"/></SubClassOf>
+    <SubClassOf><Class IRI="#{name}"/><DataExactCardinality cardinality="1"><DataProperty IRI="#name"/></DataExactCardinality></SubClassOf>
+    <SubClassOf><Class IRI="#{name}"/><ObjectMaxCardinality cardinality="1"><ObjectProperty IRI="#targets"/><Class IRI="#{target}"/></ObjectMaxCardinality></SubClassOf>
+    <Declaration><DataProperty IRI="#{lower}_code"/></Declaration>
+    <FunctionalDataProperty><DataProperty IRI="#{lower}_code"/></FunctionalDataProperty>
+    <DataPropertyDomain><DataProperty IRI="#{lower}_code"/><Class IRI="#{name}"/></DataPropertyDomain>
+    <DataPropertyRange><DataProperty IRI="#{lower}_code"/><Datatype abbreviatedIRI="xsd:integer"/></DataPropertyRange>
+"""
+
+
+def write_synthetic_owl(path: str, num_classes: int, syntax: str = "rdfxml"):
+    """
+    Escribe una ontología OWL sintética en RDF/XML u OWL/XML.
+    
+    Ambas sintaxis describen la misma ontología: cada clase hereda de
+    ``i // 2`` (la primera de ``owl:Thing``), tiene exactamente un ``name``, un ``<clase>_code`` funcional
+    propio y como mucho un ``targets`` hacia la clase ``(7 * i) % n``.
+    
+    Args:
+        path: Ruta del archivo de salida
+        num_classes: Número de clases a generar
+        syntax: "rdfxml" u "owlxml"
+    """
+    if syntax == "rdfxml":
+        header, template, footer = RDF_HEADER, RDF_CLASS_TEMPLATE, "</rdf:RDF>\n"
+    elif syntax == "owlxml":
+        header, template, footer = OWLXML_HEADER, OWLXML_CLASS_TEMPLATE, "</Ontology>\n"
+    else:
+        raise ValueError(f"Sintaxis desconocida: {syntax!r}")
+    
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(header)
+        for i in range(num_classes):
+            name = f"Class{i}"
+            base = f"#Class{i // 2}" if i else "http://www.w3.org/2002/07/owl#Thing"
+            f.write(template.format(name=name, lower=name.lower(), base=base,
+                                    target=f"Class{(7 * i) % num_classes}"))
+        f.write(footer)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera una ontología sintética")
+    parser.add_argument("output", help="Archivo XML de salida")
+    parser.add_argument("-n", "--classes", type=int, default=10000,
+                        help="Número de clases (default: 10000)")
+    parser.add_argument("--doc-lines", type=int, default=0,
+                        help="Líneas extra por descripción de clase (default: 0)")
+    parser.add_argument("--owl", choices=["rdfxml", "owlxml"],
+                        help="Escribir OWL en la sintaxis indicada")
+    args = parser.parse_args()
+    if args.owl:
+        write_synthetic_owl(args.output, args.classes, args.owl)
+    else:
+        write_synthetic_ontology(args.output, args.classes, args.doc_lines)
@@ -9,12 +9,20 @@ Convierte ontologías XML a modelos SQLAlchemy y esquemas relacionales.
 __version__ = "1.0.0"
 
 from .parser import OntologyParser
+from .owl import OWLParser
+from .cache import OntologyCache
+from .columnar import ColumnarOntology
+from .extractor import PackageExtractor
 from .mapper import OntologyMapper
 from .codegen import SQLAlchemyGenerator
 from .visualizer import OntologyVisualizer
 
 __all__ = [
     "OntologyParser",
+    "OWLParser",
+    "OntologyCache",
+    "ColumnarOntology",
+    "PackageExtractor",
     "OntologyMapper", 
     "SQLAlchemyGenerator",
     "OntologyVisualizer"
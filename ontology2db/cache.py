@@ -0,0 +1,295 @@
+"""Módulo cache"""
+
+"""
+Caché en disco de ontologías parseadas.
+"""
+import gc
+import hashlib
+import os
+import pickle
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, List, Optional
+from .parser import Ontology, ParseSnapshot, PARSER_VERSION
+
+
+# Versión del formato binario de las entradas
+CACHE_FORMAT = 1
+
+_MAGIC = b"O2DBCACHE"
+_SUFFIX = ".o2db"
+_STAT_SUFFIX = ".stat"
+_IMPORTS_SUFFIX = ".imports"
+_SNAPSHOT_SUFFIX = ".snap"
+_HASH_CHUNK = 1 << 20
+
+
+def default_cache_dir() -> Path:
+    """Directorio de caché por defecto (respeta XDG_CACHE_HOME)."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "ontology2db"
+
+
+class OntologyCache:
+    """
+    Caché persistente de objetos Ontology indexada por hash de contenido.
+    
+    Cada entrada es un archivo con el grafo Class/Relation/Attribute en
+    pickle binario (cada objeto se serializa como la tupla de argumentos
+    de su constructor). Los accesos actualizan la fecha de
+    modificación del archivo, que se usa como orden LRU al desalojar
+    entradas cuando se supera ``max_bytes``.
+    """
+    
+    def __init__(self, cache_dir: Optional[str] = None,
+                 max_bytes: int = 512 * 1024 * 1024):
+        """
+        Inicializa la caché.
+        
+        Args:
+            cache_dir: Directorio de la caché (default: ~/.cache/ontology2db)
+            max_bytes: Tamaño máximo total de la caché en bytes
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.max_bytes = max_bytes
+    
+    def key_for(self, xml_file: str, salt: str = "") -> str:
+        """
+        Calcula la clave de un archivo: hash de su contenido más la versión
+        del parser y del formato de caché.
+        
+        El hash se recuerda junto al tamaño y la fecha de modificación del
+        archivo, de modo que un archivo sin tocar no se vuelve a leer.
+        
+        Args:
+            xml_file: Ruta al archivo XML
+            salt: Opciones del parser que alteran el resultado
+            
+        Returns:
+            Clave hexadecimal
+        """
+        prefix = f"{PARSER_VERSION}:{CACHE_FORMAT}:{salt}\0"
+        stat = os.stat(xml_file)
+        fingerprint = f"{prefix}{stat.st_size}:{stat.st_mtime_ns}"
+        stat_path = self._path_entry(xml_file, _STAT_SUFFIX)
+        try:
+            remembered, key = stat_path.read_text(encoding="utf-8").rsplit("\n", 1)
+            if remembered == fingerprint:
+                return key
+        except (OSError, ValueError):
+            pass
+        
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(prefix.encode("utf-8"))
+        with open(xml_file, "rb") as f:
+            while chunk := f.read(_HASH_CHUNK):
+                digest.update(chunk)
+        key = digest.hexdigest()
+        
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        stat_path.write_text(f"{fingerprint}\n{key}", encoding="utf-8")
+        return key
+    
+    def imports_for(self, xml_file: str,
+                    scan: Callable[[str], List[str]]) -> List[str]:
+        """
+        Módulos que importa un archivo, recordados junto a su tamaño y
+        fecha de modificación (como el hash de ``key_for``).
+        
+        Args:
+            xml_file: Ruta al archivo XML
+            scan: Función que busca las importaciones si no se recuerdan
+            
+        Returns:
+            Rutas absolutas de los módulos importados
+        """
+        stat = os.stat(xml_file)
+        fingerprint = f"{stat.st_size}:{stat.st_mtime_ns}"
+        memo = self._path_entry(xml_file, _IMPORTS_SUFFIX)
+        try:
+            remembered, *modules = memo.read_text(encoding="utf-8").split("\n")
+            if remembered == fingerprint:
+                return [module for module in modules if module]
+        except OSError:
+            pass
+        
+        modules = scan(xml_file)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        memo.write_text("\n".join([fingerprint, *modules]), encoding="utf-8")
+        return modules
+    
+    def get(self, key: str) -> Optional[Ontology]:
+        """
+        Retorna la ontología cacheada para ``key`` o None si no existe.
+        
+        Las entradas corruptas o de otra versión se descartan.
+        """
+        path = self._entry_path(key)
+        state = self._read(path)
+        if state is None:
+            return None
+        
+        classes, relations = state
+        ontology = Ontology(classes=classes, relations=relations)
+        
+        # Marcar como usada recientemente (orden LRU)
+        os.utime(path)
+        return ontology
+    
+    def put(self, key: str, ontology: Ontology):
+        """
+        Guarda una ontología en la caché y desaloja las entradas menos
+        usadas si se supera el tamaño máximo.
+        """
+        self._write(self._entry_path(key), (ontology.classes, ontology.relations))
+        self._evict()
+    
+    def get_snapshot(self, xml_file: str) -> Optional[ParseSnapshot]:
+        """
+        Retorna el snapshot del último parseo incremental de un archivo.
+        
+        A diferencia de las ontologías, los snapshots se indexan por la ruta
+        del archivo: su objetivo es comparar con la versión anterior.
+        """
+        path = self._path_entry(xml_file, _SNAPSHOT_SUFFIX)
+        state = self._read(path)
+        if state is None:
+            return None
+        
+        version, snapshot = state
+        if version != (PARSER_VERSION, CACHE_FORMAT):
+            return None
+        os.utime(path)
+        return snapshot
+    
+    def put_snapshot(self, xml_file: str, snapshot: ParseSnapshot):
+        """Guarda el snapshot del último parseo incremental de un archivo."""
+        self._write(self._path_entry(xml_file, _SNAPSHOT_SUFFIX),
+                    ((PARSER_VERSION, CACHE_FORMAT), snapshot))
+        self._evict()
+    
+    def clear(self):
+        """Elimina todas las entradas de la caché."""
+        for pattern in (f"*{_SUFFIX}", f"*{_STAT_SUFFIX}", f"*{_IMPORTS_SUFFIX}",
+                        f"*{_SNAPSHOT_SUFFIX}"):
+            for path in self.cache_dir.glob(pattern):
+                path.unlink(missing_ok=True)
+    
+    def _entry_path(self, key: str) -> Path:
+        """Ruta del archivo de una entrada."""
+        return self.cache_dir / f"{key}{_SUFFIX}"
+    
+    def _path_entry(self, xml_file: str, suffix: str) -> Path:
+        """Ruta de una entrada indexada por la ruta absoluta del XML."""
+        name = hashlib.blake2b(os.path.abspath(xml_file).encode("utf-8"),
+                               digest_size=20).hexdigest()
+        return self.cache_dir / f"{name}{suffix}"
+    
+    def _read(self, path: Path):
+        """Lee una entrada; retorna None si no existe o está corrupta."""
+        with _gc_paused():
+            try:
+                with open(path, "rb") as f:
+                    if f.read(len(_MAGIC)) != _MAGIC:
+                        raise ValueError("Cabecera de caché inválida")
+                    return pickle.load(f)
+            except FileNotFoundError:
+                return None
+            except Exception:
+                path.unlink(missing_ok=True)
+                return None
+    
+    def _write(self, path: Path, state):
+        """Escribe una entrada de forma atómica: nunca queda a medias."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_MAGIC)
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+    
+    def _evict(self):
+        """
+        Desaloja entradas por orden LRU hasta respetar ``max_bytes``.
+        
+        Las memorias ``.stat`` de ``key_for`` cuentan en el tamaño y se
+        borran con la entrada a la que apuntan (o si ya no existe), junto
+        con las ``.imports`` del mismo archivo. Las ``.imports`` sin
+        ``.stat`` (escritas antes de parsear, o de un módulo que no llegó a
+        parsearse) cuentan y se desalojan como entradas propias.
+        """
+        imports = {}
+        for path in self.cache_dir.glob(f"*{_IMPORTS_SUFFIX}"):
+            try:
+                imports[path.stem] = (path.stat(), path)
+            except FileNotFoundError:
+                continue
+        
+        memos = {}
+        total = 0
+        for path in self.cache_dir.glob(f"*{_STAT_SUFFIX}"):
+            try:
+                size = path.stat().st_size
+                key = path.read_text(encoding="utf-8").rsplit("\n", 1)[-1]
+            except (OSError, ValueError):
+                continue
+            memos.setdefault(key, []).append((size, path))
+            total += size
+            if path.stem in imports:
+                stat, memo = imports.pop(path.stem)
+                memos[key].append((stat.st_size, memo))
+                total += stat.st_size
+        
+        entries = []
+        paths = list(self.cache_dir.glob(f"*{_SUFFIX}"))
+        paths += self.cache_dir.glob(f"*{_SNAPSHOT_SUFFIX}")
+        for path in paths:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            key = path.name[:-len(_SUFFIX)] if path.suffix == _SUFFIX else None
+            entries.append((stat.st_mtime, stat.st_size, path, memos.pop(key, [])))
+            total += stat.st_size
+        for stat, path in imports.values():
+            entries.append((stat.st_mtime, stat.st_size, path, []))
+            total += stat.st_size
+        
+        # Memorias de entradas ya desalojadas
+        for orphans in memos.values():
+            for size, path in orphans:
+                path.unlink(missing_ok=True)
+                total -= size
+        
+        entries.sort(key=lambda entry: entry[:2])
+        for _, size, path, entry_memos in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            for memo_size, memo in entry_memos:
+                memo.unlink(missing_ok=True)
+                total -= memo_size
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Desactiva temporalmente el recolector cíclico.
+    
+    Reconstruir millones de objetos dispara colecciones completas
+    repetidas que no liberan nada; pausarlo reduce mucho el tiempo de
+    carga.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
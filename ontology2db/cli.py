@@ -7,18 +7,33 @@ import argparse
 import sys
 from pathlib import Path
 from .parser import OntologyParser
-from .mapper import OntologyMapper
+from .cache import OntologyCache
+from .columnar import ColumnarOntology
+from .owl import OWLParser, is_owl_file
+from .extractor import PackageExtractor
+from .mapper import (INHERITANCE_STRATEGIES, KEY_STRATEGIES, IndexPolicy,
+                     InheritancePolicy, OntologyMapper)
+from .column_types import TypeResolver
 from .codegen import SQLAlchemyGenerator
+from .ddl import PartitionPolicy
 from .visualizer import OntologyVisualizer
 
 
 def main():
     """Función principal del CLI."""
+    if len(sys.argv) > 1 and sys.argv[1] == 'extract':
+        extract_main(sys.argv[2:])
+        return
+    
     parser = argparse.ArgumentParser(
-        description='Convierte ontologías XML a modelos SQLAlchemy'
+        description='Convierte ontologías XML a modelos SQLAlchemy',
+        epilog='Para generar la ontología de un paquete Python: '
+               'ontology2db extract PAQUETE -o ontologia.xml'
     )
     
-    parser.add_argument('input', help='Archivo XML de entrada')
+    parser.add_argument('input',
+                       help='Archivo XML de entrada (puede estar comprimido con '
+                            'gzip, bz2 o xz; "-" para leer de stdin)')
     parser.add_argument('-o', '--output', default='models.py',
                        help='Archivo Python de salida (default: models.py)')
     parser.add_argument('-v', '--visualize', choices=['pyvis', 'matplotlib', 'both'],
@@ -27,36 +42,204 @@ def main():
                        help='Nombre base para archivos de visualización')
     parser.add_argument('--no-models', action='store_true',
                        help='No generar modelos, solo visualización')
+    parser.add_argument('--format', choices=['auto', 'xml', 'owl'], default='auto',
+                       help='Formato de entrada: XML propio u OWL (RDF/XML u OWL/XML); '
+                            'auto lo decide por la extensión (.owl, .rdf, .owx)')
+    parser.add_argument('--engine', choices=['auto', 'stdlib', 'lxml'], default='auto',
+                       help='Motor XML (default: auto, lxml si está instalado)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                       help='Procesos para parsear en paralelo (default: 1)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='No usar la caché en disco de ontologías parseadas')
+    parser.add_argument('--cache-dir',
+                       help='Directorio de la caché (default: ~/.cache/ontology2db)')
+    parser.add_argument('--cache-size', type=int, default=512,
+                       help='Tamaño máximo de la caché en MB (default: 512)')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Reparsear solo los elementos cambiados desde la última '
+                            'ejecución y mostrar los cambios')
+    parser.add_argument('--streaming', action='store_true',
+                       help='Parsear en streaming (memoria constante en archivos grandes)')
+    parser.add_argument('--no-imports', action='store_true',
+                       help='No cargar los módulos de <Import href> / xi:include')
+    parser.add_argument('--columnar', action='store_true',
+                       help='Parsear en streaming a la representación columnar '
+                            '(ontologías de millones de atributos; sin caché)')
+    parser.add_argument('--share-attributes', action='store_true',
+                       help='Compartir una instancia entre atributos idénticos '
+                            'de distintas clases')
+    parser.add_argument('--lazy-descriptions', action='store_true',
+                       help='Leer las descripciones del XML solo cuando se usan '
+                            '(menos memoria; desactiva la caché)')
+    parser.add_argument('--index', action='append', default=[], metavar='SPEC',
+                       help='Índice adicional: "columna" (en todas las tablas que la '
+                            'tengan), "Tabla:col1,col2" (compuesto) o '
+                            '"Tabla:col1,col2:predicado" (parcial). Repetible')
+    parser.add_argument('--no-indexes', action='store_true',
+                       help='No generar índices automáticos para las foreign keys')
+    parser.add_argument('--multivalued', choices=['json', 'child_table', 'array'],
+                       default='json',
+                       help='Atributos multivaluados: columna JSON, tabla hija o '
+                            'ARRAY de PostgreSQL (default: json)')
+    parser.add_argument('--string-length', action='append', default=[],
+                       metavar='ATRIBUTO=N',
+                       help='Longitud máxima de un atributo de texto (VARCHAR(N)). '
+                            'Repetible')
+    parser.add_argument('--inheritance', choices=list(INHERITANCE_STRATEGIES),
+                       default='none',
+                       help='Jerarquías is_a: relación uno a uno (none), tabla por '
+                            'clase con join a la del padre (joined), una tabla por '
+                            'jerarquía (single) o tablas completas sin joins '
+                            '(concrete) (default: none)')
+    parser.add_argument('--inheritance-for', action='append', default=[],
+                       metavar='RAIZ=ESTRATEGIA',
+                       help='Estrategia de la jerarquía con raíz RAIZ. Repetible')
+    parser.add_argument('--fold-one-to-one', type=int, nargs='?', const=1, default=0,
+                       metavar='ALTURA',
+                       help='Plegar en su dueña las tablas que solo se referencian '
+                            'desde una foreign key uno a uno, hasta ALTURA niveles '
+                            '(default sin valor: 1)')
+    parser.add_argument('--denormalization-report', metavar='FILE',
+                       help='Escribir el informe de clusters uno a uno y tablas plegadas')
+    parser.add_argument('--key-strategy', choices=list(KEY_STRATEGIES), default='integer',
+                       help='Clave primaria de las tablas: Integer (integer), BigInteger '
+                            'identity (identity), BigInteger con secuencia cacheada '
+                            '(sequence), UUID nativo (uuid), UUID en BINARY(16) '
+                            '(binary16) o el atributo <clase>_id de la ontología '
+                            '(ontology_id). Las foreign keys usan el mismo tipo '
+                            '(default: integer)')
+    parser.add_argument('--sequence-cache', type=int, default=100, metavar='N',
+                       help='Valores reservados por sesión con --key-strategy sequence '
+                            '(default: 100)')
+    parser.add_argument('--ddl-dir', metavar='DIR',
+                       help='Exportar el DDL (un .sql por tabla y schema.sql) a una '
+                            'carpeta con timestamp dentro de DIR')
+    parser.add_argument('--ddl-dialect', default='sqlite',
+                       help='Dialecto del DDL exportado: sqlite, postgresql, mysql... '
+                            '(default: sqlite)')
+    parser.add_argument('--partition', action='append', default=[], metavar='SPEC',
+                       help='Particionar por rango de tiempo (PostgreSQL): '
+                            '"Tabla:columna[:day|week|month|year]"; "*" para todas '
+                            'las tablas con la columna. Repetible')
     
     args = parser.parse_args()
     
     # Verificar que el archivo existe
-    input_path = Path(args.input)
-    if not input_path.exists():
-        print(f"Error: El archivo {args.input} no existe", file=sys.stderr)
-        sys.exit(1)
+    if args.input == '-':
+        source = sys.stdin.buffer
+    else:
+        input_path = Path(args.input)
+        if not input_path.exists():
+            print(f"Error: El archivo {args.input} no existe", file=sys.stderr)
+            sys.exit(1)
+        source = str(input_path)
     
     try:
         # Parsear ontología
         print(f"Parseando {args.input}...")
-        parser_obj = OntologyParser()
-        ontology = parser_obj.parse(str(input_path))
-        print(f"✓ Encontradas {len(ontology.classes)} clases y "
-              f"{len(ontology.relations)} relaciones")
+        cache = None
+        if not args.no_cache:
+            cache = OntologyCache(args.cache_dir,
+                                  max_bytes=args.cache_size * 1024 * 1024)
+        parser_obj = OntologyParser(engine=args.engine, cache=cache,
+                                    lazy_descriptions=args.lazy_descriptions,
+                                    share_attributes=args.share_attributes)
+        input_format = args.format
+        if input_format == 'auto':
+            input_format = 'owl' if is_owl_file(args.input) else 'xml'
         
-        # Generar modelos
-        if not args.no_models:
-            print(f"\nGenerando modelos SQLAlchemy...")
-            mapper = OntologyMapper()
+        if input_format == 'owl':
+            ontology = OWLParser(engine=args.engine).parse(source)
+        elif args.incremental:
+            # Los snapshots se guardan por ruta: con stdin no hay anterior
+            use_snapshot = cache is not None and source is not sys.stdin.buffer
+            previous = cache.get_snapshot(source) if use_snapshot else None
+            result = parser_obj.parse_incremental(source, previous)
+            ontology = result.ontology
+            if use_snapshot:
+                cache.put_snapshot(source, result.snapshot)
+        elif args.columnar:
+            # Los objetos de cada elemento se descartan al codificarlos
+            ontology = ColumnarOntology.from_items(parser_obj.iterparse(source))
+        else:
+            ontology = parser_obj.parse(source, streaming=args.streaming,
+                                        workers=args.jobs,
+                                        follow_imports=not args.no_imports)
+        if isinstance(ontology, ColumnarOntology):
+            num_classes, num_relations = ontology.num_classes, ontology.num_relations
+        else:
+            num_classes, num_relations = len(ontology.classes), len(ontology.relations)
+        print(f"✓ Encontradas {num_classes} clases y {num_relations} relaciones")
+        stats = parser_obj.stats
+        if stats is not None and stats.modules > 1:
+            print(f"  Módulos cargados: {stats.modules}")
+        if args.share_attributes and stats is not None:
+            print(f"  Atributos: {stats.attributes} "
+                  f"({stats.shared_attributes} compartidos, "
+                  f"{stats.unique_attributes} instancias)")
+        if args.incremental and input_format == 'xml':
+            changes = result.changes
+            print(f"  Cambios: {len(changes.added)} añadidos, "
+                  f"{len(changes.modified)} modificados, "
+                  f"{len(changes.removed)} eliminados")
+            for key in changes.modified:
+                print(f"    ~ {key}")
+        
+        # Generar modelos y DDL
+        if not args.no_models or args.ddl_dir:
+            if not args.no_models:
+                print(f"\nGenerando modelos SQLAlchemy...")
+            policy = IndexPolicy.disabled() if args.no_indexes else IndexPolicy()
+            for spec in args.index:
+                policy.add_spec(spec)
+            lengths = {}
+            for spec in args.string_length:
+                name, _, length = spec.partition('=')
+                if not length.isdigit():
+                    raise ValueError(f"--string-length espera ATRIBUTO=N: {spec!r}")
+                lengths[name] = int(length)
+            inheritance = InheritancePolicy(default=args.inheritance)
+            for spec in args.inheritance_for:
+                inheritance.add_spec(spec)
+            mapper = OntologyMapper(index_policy=policy,
+                                    type_resolver=TypeResolver(string_lengths=lengths),
+                                    multivalued=args.multivalued,
+                                    inheritance=inheritance,
+                                    fold_one_to_one=args.fold_one_to_one,
+                                    key_strategy=args.key_strategy,
+                                    sequence_cache=args.sequence_cache)
             schema = mapper.map(ontology)
+            report = mapper.denormalization
+            if args.fold_one_to_one and report.folded:
+                print(f"  Clusters uno a uno: {len(report.clusters)} "
+                      f"({sum(c.joins for c in report.clusters)} joins, "
+                      f"{report.joins_removed} eliminados)")
+            if args.denormalization_report:
+                Path(args.denormalization_report).write_text(report.format(),
+                                                             encoding='utf-8')
+                print(f"  Informe: {args.denormalization_report}")
             
             generator = SQLAlchemyGenerator()
-            generator.generate(schema, args.output)
-            print(f"✓ Modelos generados en: {args.output}")
+            if not args.no_models:
+                generator.generate(schema, args.output)
+                print(f"✓ Modelos generados en: {args.output}")
+            
+            if args.ddl_dir:
+                print(f"\nExportando DDL ({args.ddl_dialect})...")
+                partitions = None
+                if args.partition:
+                    partitions = PartitionPolicy()
+                    for spec in args.partition:
+                        partitions.add_spec(spec)
+                export_path = generator.export_ddl_to_files(
+                    schema, args.ddl_dir, dialect=args.ddl_dialect, partitions=partitions)
+                print(f"✓ DDL exportado en: {export_path}")
         
         # Generar visualización
         if args.visualize:
             print(f"\nGenerando visualización...")
+            if isinstance(ontology, ColumnarOntology):
+                ontology = ontology.to_ontology()
             visualizer = OntologyVisualizer(ontology)
             
             if args.visualize in ['pyvis', 'both']:
@@ -76,5 +259,42 @@ def main():
         sys.exit(1)
 
 
+def extract_main(argv):
+    """Subcomando ``extract``: ontología XML a partir de un paquete Python."""
+    parser = argparse.ArgumentParser(
+        prog='ontology2db extract',
+        description='Genera la ontología XML de un paquete Python '
+                    '(clases, herencia y referencias *_id)'
+    )
+    parser.add_argument('package',
+                       help='Directorio del paquete (o un archivo .py)')
+    parser.add_argument('-o', '--output', default='ontology.xml',
+                       help='Archivo XML de salida (default: ontology.xml)')
+    parser.add_argument('-j', '--jobs', type=int,
+                       help='Procesos para analizar los módulos (default: uno por CPU)')
+    
+    args = parser.parse_args(argv)
+    
+    if not Path(args.package).exists():
+        print(f"Error: El paquete {args.package} no existe", file=sys.stderr)
+        sys.exit(1)
+    
+    try:
+        print(f"Analizando paquete: {args.package}")
+        stats = PackageExtractor(workers=args.jobs).extract(args.package, args.output)
+        for path, error in stats.errors:
+            print(f"  Aviso: no se pudo analizar {path}: {error}", file=sys.stderr)
+        print(f"  Módulos: {stats.modules}")
+        print(f"  Clases: {stats.classes}")
+        print(f"  Relaciones: {stats.relations}")
+        if stats.unresolved_bases or stats.unresolved_references:
+            print(f"  Sin resolver (omitidas): {stats.unresolved_bases} bases, "
+                  f"{stats.unresolved_references} referencias *_id")
+        print(f"\n✓ Ontología generada: {args.output}")
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -3,13 +3,45 @@
 """
 Generador de código SQLAlchemy.
 """
-from typing import TextIO
-from .mapper import RelationalSchema, Table, Column
+import io
+import re
+from typing import Optional, Set, TextIO
+from .mapper import DISCRIMINATOR, RelationalSchema, Table, Column, Index, index_name
+from .ddl import (DDLPlan, PartitionPolicy, foreign_key_name, partition_function_sql,
+                  partition_sql, plan_ddl)
+
+
+# Longitud de los String sin longitud usados como clave en los dialectos
+# que exigen longitud en VARCHAR (MySQL, Oracle)
+KEY_STRING_LENGTH = 255
+
+# Nombres que puede usar el código generado, por módulo y en el orden en que
+# se importan (el header solo importa los que se usan)
+_GENERATED_IMPORTS = {
+    "sqlalchemy": (
+        "Column", "Integer", "String", "Text", "Float", "Boolean", "DateTime",
+        "Date", "Time", "SmallInteger", "Interval", "LargeBinary", "JSON",
+        "BigInteger", "Uuid", "BINARY", "Identity", "Sequence", "ForeignKey",
+        "Table", "UniqueConstraint", "Index", "text", "create_engine",
+    ),
+    "sqlalchemy.dialects.postgresql": ("ARRAY", "JSONB"),
+    "sqlalchemy.orm": ("declarative_base", "relationship", "Session"),
+}
+
+# Nombres importables (y el módulo uuid) dentro de una expresión generada
+_IMPORTABLE = re.compile(r"\b(uuid|{})\b".format(
+    "|".join(name for names in _GENERATED_IMPORTS.values() for name in names)))
 
 
 class SQLAlchemyGenerator:
     """Genera código Python con modelos SQLAlchemy."""
     
+    def __init__(self):
+        # Plan de creación del último esquema generado (FKs con use_alter)
+        self._plan = DDLPlan()
+        # Nombres usados por el código generado (ver _use)
+        self._used: Set[str] = set()
+    
     def generate(self, schema: RelationalSchema, output_file: str):
         """
         Genera código SQLAlchemy y lo escribe en un archivo.
@@ -18,68 +50,118 @@ class SQLAlchemyGenerator:
             schema: Esquema relacional
             output_file: Ruta del archivo de salida
         """
+        # Las tablas pueden haberse modificado fuera de add_table/add_column
+        schema.reindex()
+        # Las FKs que cierran ciclos se crean con ALTER TABLE (use_alter)
+        self._plan = plan_ddl(schema)
+        self._used = set()
+        
+        # El cuerpo va primero a memoria: el header depende de lo que use
+        body = io.StringIO()
+        self._write_base(body)
+        for table in schema.tables:
+            if table.is_association_table:
+                self._write_association_table(body, table)
+            else:
+                self._write_model(body, table, schema)
+                for subclass in table.subclasses:
+                    self._write_subclass(body, subclass)
+        self._write_footer(body)
+        
         with open(output_file, 'w', encoding='utf-8') as f:
             self._write_header(f)
-            self._write_base(f)
-            
-            for table in schema.tables:
-                if table.is_association_table:
-                    self._write_association_table(f, table)
-                else:
-                    self._write_model(f, table, schema)
-            
-            self._write_footer(f)
+            f.write(body.getvalue())
+    
+    def _use(self, code: str) -> str:
+        """Registra los nombres importables que usa ``code`` y lo retorna."""
+        self._used.update(_IMPORTABLE.findall(code))
+        return code
     
     def _write_header(self, f: TextIO):
-        """Escribe el header del archivo."""
+        """Escribe el header del archivo (solo con los imports usados)."""
         f.write('"""\n')
         f.write('Modelos generados automáticamente desde ontología.\n')
         f.write('"""\n')
-        f.write('from sqlalchemy import Column, Integer, String, Text, Float, '
-                'Boolean, DateTime, Date, Time\n')
-        f.write('from sqlalchemy import ForeignKey, Table, UniqueConstraint\n')
-        f.write('from sqlalchemy.orm import declarative_base, relationship\n')
-        f.write('from sqlalchemy import create_engine\n')
-        f.write('from sqlalchemy.orm import Session\n\n')
+        if 'uuid' in self._used:
+            f.write('import uuid\n\n')
+        for module, names in _GENERATED_IMPORTS.items():
+            names = [name for name in names if name in self._used]
+            if not names:
+                continue
+            line = f'from {module} import {", ".join(names)}'
+            if len(line) > 79:
+                line = f'from {module} import (\n'
+                current = '   '
+                for name in names:
+                    if len(current) + len(name) + 2 > 79:
+                        line += current.rstrip() + '\n'
+                        current = '   '
+                    current += f' {name},'
+                line += current + '\n)'
+            f.write(line + '\n')
+        f.write('\n')
     
     def _write_base(self, f: TextIO):
         """Escribe la definición de Base."""
+        self._used.add('declarative_base')
         f.write('Base = declarative_base()\n\n')
     
     def _write_association_table(self, f: TextIO, table: Table):
         """Escribe una tabla de asociación."""
         f.write(f'\n# Tabla de asociación: {table.name}\n')
+        self._used.update(('Table', 'Column'))
         f.write(f'{table.name} = Table(\n')
         f.write(f'    "{table.name}",\n')
         f.write('    Base.metadata,\n')
         
         for col in table.columns:
-            f.write(f'    Column("{col.name}", {col.type}')
+            f.write(f'    Column("{col.name}", {self._type_expr(col.type)}')
             if col.foreign_key:
-                f.write(f', ForeignKey("{col.foreign_key}")')
+                f.write(f', {self._foreign_key_expr(table, col)}')
             if col.primary_key:
                 f.write(', primary_key=True')
             f.write('),\n')
         
+        for index in table.indexes:
+            f.write(f'    {self._index_expr(index)},\n')
+        
         f.write(')\n\n')
     
     def _write_model(self, f: TextIO, table: Table, schema: RelationalSchema):
         """Escribe una clase modelo."""
-        f.write(f'\nclass {table.name}(Base):\n')
+        base = "Base"
+        if table.inheritance == "joined" and table.inherits is not None:
+            base = table.inherits
+        elif table.inheritance == "concrete" and table.inherits is not None:
+            f.write(f'\n# Herencia concreta: incluye las columnas de {table.inherits}')
+        f.write(f'\nclass {table.name}({base}):\n')
         
         if table.description:
             f.write(f'    """{table.description}"""\n')
         
-        f.write(f'    __tablename__ = "{table.name}"\n\n')
+        f.write(f'    __tablename__ = "{table.name}"\n')
+        if table.indexes:
+            f.write('    __table_args__ = (\n')
+            for index in table.indexes:
+                f.write(f'        {self._index_expr(index)},\n')
+            f.write('    )\n')
+        f.write('\n')
         
-        # Escribir columnas
+        # Escribir columnas (las de tablas uno a uno plegadas, por grupos)
+        groups = {group.columns[0]: group for group in table.embedded if group.columns}
+        self._used.add('Column')
         for col in table.columns:
-            f.write(f'    {col.name} = Column({col.type}')
+            group = groups.get(col.name)
+            if group is not None:
+                f.write(f'    # {group.name} (antes {group.foreign_key} -> {group.name}.id)\n')
+            f.write(f'    {col.name} = Column({self._type_expr(col.type, col)}')
             
+            if col.foreign_key:
+                f.write(f', {self._foreign_key_expr(table, col)}')
+            if col.generator is not None:
+                f.write(f', {self._generator_expr(col)}')
             if col.primary_key:
                 f.write(', primary_key=True')
-            if col.foreign_key:
-                f.write(f', ForeignKey("{col.foreign_key}")')
             if not col.nullable and not col.primary_key:
                 f.write(', nullable=False')
             if col.unique:
@@ -87,49 +169,118 @@ class SQLAlchemyGenerator:
             
             f.write(')\n')
         
+        # Herencia polimórfica (joined y single)
+        if table.inheritance in ("joined", "single"):
+            if table.inherits is None:
+                f.write(f'\n    __mapper_args__ = {{"polymorphic_on": {DISCRIMINATOR}, '
+                        f'"polymorphic_identity": "{table.name}"}}\n')
+            else:
+                f.write(f'\n    __mapper_args__ = {{"polymorphic_identity": "{table.name}"}}\n')
+        
         # Escribir relationships
         self._write_relationships(f, table, schema)
         
+        pk = [col.name for col in table.columns if col.primary_key] or ['id']
+        fields = ", ".join(f"{name}={{self.{name}}}" for name in pk)
         f.write(f'\n    def __repr__(self):\n')
-        f.write(f'        return f"<{table.name}(id={{self.id}})>"\n\n')
+        f.write(f'        return f"<{table.name}({fields})>"\n\n')
+    
+    def _write_subclass(self, f: TextIO, table: Table):
+        """Escribe una subclase sin tabla propia (herencia single)."""
+        f.write(f'\nclass {table.name}({table.inherits}):\n')
+        if table.description:
+            f.write(f'    """{table.description}"""\n')
+        f.write(f'    __mapper_args__ = {{"polymorphic_identity": "{table.name}"}}\n\n')
     
     def _write_relationships(self, f: TextIO, table: Table, 
                             schema: RelationalSchema):
         """Escribe las relaciones del modelo."""
-        # Buscar foreign keys en esta tabla
+        # Buscar foreign keys en esta tabla (en las tablas hijas, la de la PK)
         for col in table.columns:
-            if col.foreign_key and not col.primary_key:
+            if col.foreign_key and (not col.primary_key or table.owner is not None):
                 ref_table = col.foreign_key.split('.')[0]
+                self._used.add('relationship')
                 rel_name = ref_table.lower()
                 f.write(f'    {rel_name} = relationship("{ref_table}", '
                        f'back_populates="{table.name.lower()}s")\n')
         
-        # Buscar referencias desde otras tablas
-        for other_table in schema.tables:
-            if other_table.name != table.name and not other_table.is_association_table:
-                for col in other_table.columns:
-                    if col.foreign_key == f"{table.name}.id":
-                        f.write(f'    {other_table.name.lower()}s = relationship('
-                               f'"{other_table.name}", '
-                               f'back_populates="{table.name.lower()}")\n')
+        # Referencias desde otras tablas
+        fk_target = f"{table.name}.id"
+        for other_table, col in schema.references_to(table.name):
+            # La PK de una subclase joined no es una relación
+            if col.primary_key and other_table.owner is None:
+                continue
+            if (other_table.name != table.name and not other_table.is_association_table
+                    and col.foreign_key == fk_target):
+                self._used.add('relationship')
+                f.write(f'    {other_table.name.lower()}s = relationship('
+                       f'"{other_table.name}", '
+                       f'back_populates="{table.name.lower()}")\n')
         
-        # Buscar tablas de asociación
-        for assoc_table in schema.tables:
-            if assoc_table.is_association_table and table.name in assoc_table.name:
-                parts = assoc_table.name.split('_')
-                if parts[0] == table.name:
-                    other = parts[1]
-                    f.write(f'    {other.lower()}s = relationship('
-                           f'"{other}", secondary="{assoc_table.name}", '
-                           f'back_populates="{table.name.lower()}s")\n')
-                elif parts[1] == table.name:
-                    other = parts[0]
-                    f.write(f'    {other.lower()}s = relationship('
-                           f'"{other}", secondary="{assoc_table.name}", '
-                           f'back_populates="{table.name.lower()}s")\n')
+        # Tablas de asociación
+        for assoc_table, other in schema.associations_of(table.name):
+            self._used.add('relationship')
+            f.write(f'    {other.lower()}s = relationship('
+                   f'"{other}", secondary="{assoc_table.name}", '
+                   f'back_populates="{table.name.lower()}s")\n')
+    
+    def _index_expr(self, index: Index) -> str:
+        """Expresión ``Index(...)`` de un índice."""
+        args = [f'"{index.name}"'] + [f'"{col}"' for col in index.columns]
+        if index.unique:
+            args.append('unique=True')
+        if index.where:
+            # Índice parcial en los dialectos que lo soportan
+            where = repr(index.where)
+            args.append(f'postgresql_where=text({where})')
+            args.append(f'sqlite_where=text({where})')
+        if index.using:
+            args.append(f'postgresql_using="{index.using}"')
+        expr = f'Index({", ".join(args)})'
+        if index.dialect:
+            expr += f'.ddl_if(dialect="{index.dialect}")'
+        return self._use(expr)
+    
+    def _foreign_key_expr(self, table: Table, col: Column) -> str:
+        """Expresión ``ForeignKey(...)``, con nombre y use_alter si cierra un ciclo."""
+        self._used.add('ForeignKey')
+        if self._plan.is_deferred(table, col):
+            return (f'ForeignKey("{col.foreign_key}", use_alter=True, '
+                    f'name="{foreign_key_name(table, col)}")')
+        return f'ForeignKey("{col.foreign_key}")'
+    
+    def _type_expr(self, type_str: str, col: Optional[Column] = None) -> str:
+        """Expresión del tipo de una columna (JSONB y ARRAY solo en PostgreSQL)."""
+        if type_str == 'JSONB':
+            expr = 'JSON().with_variant(JSONB(), "postgresql")'
+        elif type_str.startswith('ARRAY('):
+            expr = f'JSON().with_variant({type_str}, "postgresql")'
+        elif type_str == 'BINARY(16)':
+            # PostgreSQL no tiene BINARY: bytea
+            expr = 'BINARY(16).with_variant(LargeBinary(), "postgresql")'
+        elif type_str == 'BigInteger' and col is not None and col.generator is not None:
+            # SQLite solo autoincrementa INTEGER PRIMARY KEY
+            expr = 'BigInteger().with_variant(Integer(), "sqlite")'
+        else:
+            expr = type_str
+        return self._use(expr)
+    
+    def _generator_expr(self, col: Column) -> str:
+        """Argumento de Column que genera los valores de una clave."""
+        generator = col.generator
+        if generator.kind == 'identity':
+            expr = 'Identity()'
+        elif generator.kind == 'sequence':
+            expr = f'Sequence("{generator.sequence}", cache={generator.cache})'
+        elif col.type == 'BINARY(16)':
+            expr = 'default=lambda: uuid.uuid4().bytes'
+        else:
+            expr = 'default=uuid.uuid4'
+        return self._use(expr)
     
     def _write_footer(self, f: TextIO):
         """Escribe funciones auxiliares."""
+        self._used.update(('create_engine', 'Session'))
         f.write('\n\ndef create_database(db_url: str = "sqlite:///ontology.db"):\n')
         f.write('    """Crea la base de datos con todas las tablas."""\n')
         f.write('    engine = create_engine(db_url, echo=True)\n')
@@ -145,30 +296,63 @@ class SQLAlchemyGenerator:
         f.write('    for table in Base.metadata.sorted_tables:\n')
         f.write('        print(f"\\n-- Table: {table.name}")\n')
         f.write('        print(CreateTable(table).compile(engine))\n')
-    def export_ddl_to_files(self, schema: RelationalSchema, output_dir: str):
+    def export_ddl_to_files(self, schema: RelationalSchema, output_dir: str,
+                            dialect: str = "sqlite",
+                            partitions: Optional[PartitionPolicy] = None):
         """
         Exporta cada tabla a un archivo .sql individual.
         
+        Además escribe ``schema.sql`` con todo el esquema en orden de
+        creación, aplicable de una vez. En los dialectos con ALTER TABLE
+        las foreign keys que forman ciclos se crean al final con
+        ``ALTER TABLE ... ADD CONSTRAINT`` (también en
+        ``deferred_foreign_keys.sql``).
+        
+        Con ``partitions`` (solo PostgreSQL) las tablas elegidas se
+        declaran ``PARTITION BY RANGE`` sobre su columna de fecha, con una
+        partición DEFAULT y un índice BRIN local por partición; la PK y las
+        restricciones UNIQUE incluyen la clave de partición y las foreign
+        keys hacia ellas se omiten (PostgreSQL exige una clave única
+        referenciable). ``partitions.sql`` crea la función de particiones
+        y las particiones iniciales.
+        
         Args:
             schema: Esquema relacional
             output_dir: Directorio base donde crear carpeta con timestamp
+            dialect: Dialecto SQL del DDL ("sqlite", "postgresql", "mysql"...)
+            partitions: Tablas particionadas por rango de tiempo
         """
         from datetime import datetime
         from pathlib import Path
-        from sqlalchemy import create_engine, MetaData, Table as SQLATable, Column as SQLAColumn
+        from sqlalchemy import MetaData, Table as SQLATable, Column as SQLAColumn
         from sqlalchemy import Integer, String, Text, Float, Boolean, DateTime as SQLADateTime, Date, Time
-        from sqlalchemy import ForeignKey
-        from sqlalchemy.schema import CreateTable
+        from sqlalchemy import SmallInteger, Interval, LargeBinary, JSON
+        from sqlalchemy import BigInteger, Uuid, BINARY, Identity, Sequence
+        from sqlalchemy.dialects import registry
+        from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+        from sqlalchemy import ForeignKey, Index as SQLAIndex, UniqueConstraint, text
+        from sqlalchemy.exc import CompileError
+        from sqlalchemy.schema import AddConstraint, CreateIndex, CreateSequence, CreateTable
         
         # Crear carpeta con timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         export_path = Path(output_dir) / timestamp
         export_path.mkdir(parents=True, exist_ok=True)
         
-        # Motor temporal para compilar DDL
-        engine = create_engine("sqlite:///:memory:")
+        # Dialecto para compilar el DDL (sin conectarse a ninguna base)
+        sql_dialect = registry.load(dialect)()
         metadata = MetaData()
         
+        partitioned = partitions.resolve(schema) if partitions is not None else {}
+        if partitioned and sql_dialect.name != "postgresql":
+            raise ValueError("El particionado por rango solo está disponible "
+                             "con dialect='postgresql'")
+        
+        # Orden de creación; sin ALTER TABLE las FKs van siempre en línea
+        plan = plan_ddl(schema)
+        if not sql_dialect.supports_alter:
+            plan.deferred.clear()
+        
         # Mapeo de tipos
         type_map = {
             'Integer': Integer,
@@ -178,79 +362,172 @@ class SQLAlchemyGenerator:
             'Boolean': Boolean,
             'DateTime': SQLADateTime,
             'Date': Date,
-            'Time': Time
+            'Time': Time,
+            'SmallInteger': SmallInteger,
+            'Interval': Interval,
+            'LargeBinary': LargeBinary,
+            'JSON': JSON,
+            'BigInteger': BigInteger,
+            'Uuid': Uuid,
+            'BINARY': BINARY
         }
         
-        # PASO 1: Crear todas las tablas en metadata primero (sin DDL todavía)
-        sqla_tables = {}
-        for table in schema.tables:
+        def column_type(type_str):
+            """Tipo SQLAlchemy de una expresión como ``String(64)``."""
+            if type_str == 'JSONB':
+                return JSON().with_variant(JSONB(), 'postgresql')
+            name, _, arg = type_str.partition('(')
+            arg = arg[:-1]
+            if name == 'ARRAY':
+                return JSON().with_variant(ARRAY(column_type(arg)), 'postgresql')
+            if name == 'BINARY':
+                # PostgreSQL no tiene BINARY: bytea
+                return BINARY(int(arg)).with_variant(LargeBinary(), 'postgresql')
+            col_type = type_map.get(name, String)
+            return col_type(int(arg)) if arg else col_type
+        
+        # MySQL y Oracle exigen longitud en VARCHAR: los String sin longitud
+        # pasan a Text, salvo en claves e índices (que no admiten TEXT sin
+        # longitud de prefijo), donde se usa String(KEY_STRING_LENGTH).
+        # SQLAlchemy compila VARCHAR2 sin longitud en Oracle sin quejarse
+        needs_length = sql_dialect.name == 'oracle'
+        try:
+            String().compile(dialect=sql_dialect)
+        except CompileError:
+            needs_length = True
+        
+        def compile_ddl(statements):
+            return "".join(f"{str(stmt.compile(dialect=sql_dialect)).rstrip()};\n\n"
+                           for stmt in statements)
+        
+        # PASO 1: Crear todas las tablas en metadata, en orden de creación
+        files = []
+        deferred = []
+        for table in plan.tables:
+            spec = partitioned.get(table.name)
+            pk = [col.name for col in table.columns if col.primary_key]
+            notes = []
+            constraints = []
             columns = []
+            statements = []
+            keyed = {name for index in table.indexes for name in index.columns}
+            if spec is not None:
+                keyed.add(spec.column)
             for col in table.columns:
-                col_type = type_map.get(col.type, String)
+                col_type = column_type(col.type)
+                if needs_length and col.type == 'String':
+                    if col.primary_key or col.foreign_key or col.unique or col.name in keyed:
+                        col_type = String(KEY_STRING_LENGTH)
+                    else:
+                        col_type = Text()
                 col_args = []
                 col_kwargs = {}
                 
-                if col.foreign_key:
-                    # Agregar FK pero sin validar todavía
-                    col_args.append(ForeignKey(col.foreign_key))
+                # Generación de la clave; sin secuencias, como identity
+                generator = col.generator
+                if generator is not None and generator.kind != 'uuid':
+                    # SQLite solo autoincrementa INTEGER PRIMARY KEY
+                    col_type = BigInteger().with_variant(Integer(), 'sqlite')
+                    if generator.kind == 'sequence' and sql_dialect.supports_sequences:
+                        sequence = Sequence(generator.sequence, cache=generator.cache,
+                                            metadata=metadata)
+                        col_kwargs['server_default'] = sequence.next_value()
+                        statements.append(CreateSequence(sequence))
+                    else:
+                        col_args.append(Identity())
+                elif generator is not None and sql_dialect.name == 'postgresql':
+                    if col.type == 'Uuid':
+                        col_kwargs['server_default'] = text('gen_random_uuid()')
                 
-                if col.primary_key:
+                ref_table = (col.foreign_key or '').rpartition('.')[0]
+                if ref_table in partitioned:
+                    notes.append(f"-- {col.name}: sin FOREIGN KEY a {ref_table} "
+                                 f"(tabla particionada)\n")
+                elif col.foreign_key:
+                    if plan.is_deferred(table, col):
+                        fk = ForeignKey(col.foreign_key, use_alter=True,
+                                        name=foreign_key_name(table, col))
+                        deferred.append(fk)
+                    else:
+                        fk = ForeignKey(col.foreign_key)
+                    col_args.append(fk)
+                
+                if col.primary_key or (spec is not None and col.name == spec.column):
+                    # La clave de partición forma parte de la PK
                     col_kwargs['primary_key'] = True
+                    if (spec is not None and pk == [col.name] and col_type is Integer
+                            and generator is None):
+                        col_kwargs['autoincrement'] = True
                 if not col.nullable and not col.primary_key:
                     col_kwargs['nullable'] = False
-                if col.unique:
+                if col.unique and spec is not None and col.name != spec.column:
+                    constraints.append(UniqueConstraint(col.name, spec.column))
+                    notes.append(f"-- {col.name}: UNIQUE por periodo "
+                                 f"(con {spec.column}, clave de partición)\n")
+                elif col.unique:
                     col_kwargs['unique'] = True
                 
                 columns.append(SQLAColumn(col.name, col_type, *col_args, **col_kwargs))
             
-            sqla_tables[table.name] = SQLATable(table.name, metadata, *columns)
-        
-        # PASO 2: Ordenar tablas por dependencias
-        def get_table_order():
-            """Ordena tablas para que las independientes vayan primero."""
-            ordered = []
-            processed = set()
-            
-            def has_unprocessed_deps(tbl):
-                """Verifica si tiene dependencias no procesadas."""
-                for col in tbl.columns:
-                    if col.foreign_key:
-                        ref_table = col.foreign_key.split('.')[0]
-                        if ref_table not in processed and ref_table != tbl.name:
-                            return True
-                return False
-            
-            # Agregar tablas sin dependencias primero
-            changed = True
-            while changed and len(ordered) < len(schema.tables):
-                changed = False
-                for table in schema.tables:
-                    if table.name not in processed:
-                        if not has_unprocessed_deps(table):
-                            ordered.append(table)
-                            processed.add(table.name)
-                            changed = True
-            
-            # Agregar las restantes (referencias circulares)
-            for table in schema.tables:
-                if table.name not in processed:
-                    ordered.append(table)
-            
-            return ordered
-        
-        sorted_tables = get_table_order()
+            table_kwargs = {}
+            if spec is not None:
+                key = sql_dialect.identifier_preparer.quote(spec.column)
+                table_kwargs['postgresql_partition_by'] = f"RANGE ({key})"
+            sqla_table = SQLATable(table.name, metadata, *columns, *constraints,
+                                   **table_kwargs)
+            statements.append(CreateTable(sqla_table))
+            indexes = [index for index in table.indexes
+                       if not index.dialect or index.dialect == sql_dialect.name]
+            if spec is not None and not any(index.columns[:1] == [spec.column]
+                                            for index in indexes):
+                # Rangos dentro de cada partición; BRIN es mínimo en datos
+                # que llegan en orden de tiempo
+                indexes.append(Index(name=index_name(table.name, [spec.column]),
+                                     columns=[spec.column], using="brin"))
+            for index in indexes:
+                index_columns = list(index.columns)
+                if spec is not None and index.unique and spec.column not in index_columns:
+                    index_columns.append(spec.column)
+                kwargs = {'unique': index.unique}
+                if index.where:
+                    kwargs['postgresql_where'] = kwargs['sqlite_where'] = text(index.where)
+                if index.using:
+                    kwargs['postgresql_using'] = index.using
+                statements.append(CreateIndex(SQLAIndex(
+                    index.name, *(sqla_table.c[col] for col in index_columns), **kwargs)))
+            # Tablas uno a uno plegadas en esta y cambios por el particionado
+            header = "".join(f"-- {group.name} plegada en {table.name}: "
+                             f"{', '.join(group.columns)}\n" for group in table.embedded)
+            header += "".join(notes)
+            trailer = ""
+            if spec is not None:
+                header += (f"-- Particionada por rango de {spec.column} "
+                           f"({spec.interval}); particiones en partitions.sql\n")
+                trailer = partition_sql(table.name, spec)[0]
+            files.append((table.name.lower(), header, statements, trailer))
         
-        # PASO 3: Generar DDL para cada tabla en orden
-        for table in sorted_tables:
-            sqla_table = sqla_tables[table.name]
-            
-            # Generar DDL
-            ddl = str(CreateTable(sqla_table).compile(engine))
-            
-            # Guardar en archivo
-            table_name = table.name.lower()
+        # PASO 2: Un archivo por tabla (la tabla y sus índices)
+        full_ddl = []
+        for table_name, header, statements, trailer in files:
+            ddl = header + compile_ddl(statements) + trailer
+            full_ddl.append(ddl)
             sql_file = export_path / f"{table_name}.sql"
             sql_file.write_text(ddl, encoding='utf-8')
             print(f"     ✓ {table_name}.sql")
         
-        return export_path
\ No newline at end of file
+        # PASO 3: FKs diferidas y esquema completo
+        if deferred:
+            ddl = compile_ddl(AddConstraint(fk.constraint) for fk in deferred)
+            full_ddl.append(ddl)
+            (export_path / "deferred_foreign_keys.sql").write_text(ddl, encoding='utf-8')
+            print(f"     ✓ deferred_foreign_keys.sql ({len(deferred)} foreign keys)")
+        if partitioned:
+            ddl = partition_function_sql() + "".join(
+                partition_sql(name, spec)[1] for name, spec in partitioned.items())
+            full_ddl.append(ddl)
+            (export_path / "partitions.sql").write_text(ddl, encoding='utf-8')
+            print(f"     ✓ partitions.sql ({len(partitioned)} tablas particionadas)")
+        (export_path / "schema.sql").write_text("".join(full_ddl), encoding='utf-8')
+        print("     ✓ schema.sql")
+        
+        return export_path
@@ -0,0 +1,153 @@
+"""Módulo column_types"""
+
+"""
+Resolución de tipos de columna.
+
+Combina el tipo del XML con el ``:type`` del docstring Sphinx de la clase
+para elegir el tipo nativo más compacto en lugar de ``String`` para todo:
+Interval para duraciones, LargeBinary para blobs, SmallInteger para
+enumeraciones, JSON para listas y diccionarios, Uuid para UUID y
+``String(n)`` cuando se conoce la longitud.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+
+# Tipos de la ontología (XML o ``:type``) -> tipos SQLAlchemy
+TYPE_MAPPING = {
+    "string": "String",
+    "str": "String",
+    "text": "Text",
+    "int": "Integer",
+    "integer": "Integer",
+    "float": "Float",
+    "double": "Float",
+    "bool": "Boolean",
+    "boolean": "Boolean",
+    "datetime": "DateTime",
+    "date": "Date",
+    "time": "Time",
+    "datetime.datetime": "DateTime",
+    "datetime.date": "Date",
+    "datetime.time": "Time",
+    "timedelta": "Interval",
+    "datetime.timedelta": "Interval",
+    "duration": "Interval",
+    "interval": "Interval",
+    "blob": "LargeBinary",
+    "bytes": "LargeBinary",
+    "binary": "LargeBinary",
+    "enum": "SmallInteger",
+    "enumeration": "SmallInteger",
+    "dict": "JSON",
+    "dictionary": "JSON",
+    "list": "JSON",
+    "json": "JSON",
+    "uuid": "Uuid",
+    "uuid.uuid": "Uuid",
+}
+
+# Tipos del XML que no dicen nada: se prefiere el ``:type`` del docstring
+GENERIC_TYPES = ("string", "str")
+
+# "string(64)", "varchar(64)"
+_BOUNDED_STRING = re.compile(r"^(?:string|str|varchar|char)\s*\(\s*(\d+)\s*\)$")
+
+# Sufijos que no cambian el tipo: ", optional", " or None"
+_OPTIONAL_SUFFIX = re.compile(r"(?:\s*,\s*optional|\s+or\s+none)\s*$")
+
+# Colecciones (incluidas "list of strings", "list of values from the ...")
+_COLLECTION = re.compile(r"^(?:list|tuple|set|dict|dictionary)\b")
+
+# Listas, con el tipo de sus elementos si se indica ("list of strings")
+_LIST = re.compile(r"^(?:list|tuple|set)\b(?:\s+of\s+(.+))?$")
+
+
+@dataclass
+class TypeResolver:
+    """
+    Elige el tipo SQLAlchemy de cada atributo.
+    
+    El tipo del XML manda salvo que sea genérico (``string``, el que escriben
+    los conversores por defecto); en ese caso se usa el ``:type`` del
+    docstring si se reconoce. Las cadenas llevan longitud si el tipo la
+    indica (``string(64)``) o si está en ``string_lengths``.
+    """
+    # Longitud máxima por nombre de atributo
+    string_lengths: Dict[str, int] = field(default_factory=dict)
+    # Tipo de las enumeraciones (``value from the :class:`...Type```)
+    enum_type: str = "SmallInteger"
+    
+    def resolve(self, type_str: str, declared_type: Optional[str] = None,
+                name: Optional[str] = None) -> str:
+        """
+        Tipo SQLAlchemy (expresión, p. ej. ``String(64)``) de un atributo.
+        
+        Args:
+            type_str: Tipo del atributo en el XML
+            declared_type: Tipo ``:type`` del docstring, si lo hay
+            name: Nombre del atributo (para ``string_lengths``)
+        """
+        xml_type = type_str.strip().lower()
+        resolved = None
+        length = None
+        if xml_type not in GENERIC_TYPES:
+            resolved, length = self._lookup(xml_type)
+        if resolved is None and declared_type:
+            resolved, length = self._declared(declared_type)
+        if resolved is None:
+            resolved = "String"
+        
+        if resolved == "String":
+            if length is None and name is not None:
+                length = self.string_lengths.get(name)
+            if length is not None:
+                return f"String({length})"
+        return resolved
+    
+    def is_list(self, declared_type: Optional[str]) -> bool:
+        """True si el ``:type`` declara una lista (atributo multivaluado)."""
+        return bool(declared_type) and _LIST.match(self._normalize(declared_type)) is not None
+    
+    def element_type(self, type_str: str, declared_type: Optional[str] = None,
+                     name: Optional[str] = None) -> str:
+        """
+        Tipo de cada elemento de un atributo multivaluado.
+        
+        Sale de ``list of X`` si el ``:type`` lo indica y si no del tipo
+        del XML (que en los atributos multivaluados es el de un elemento).
+        """
+        match = _LIST.match(self._normalize(declared_type)) if declared_type else None
+        if match and match.group(1):
+            # "strings" -> "string", "values from ..." -> "value from ..."
+            word, _, rest = match.group(1).partition(" ")
+            if word.endswith("ies"):
+                word = word[:-3] + "y"
+            elif word.endswith("s"):
+                word = word[:-1]
+            element = self.resolve("string", f"{word} {rest}".strip(), name)
+            if element != "String" or word in GENERIC_TYPES:
+                return element
+        return self.resolve(type_str, None, name)
+    
+    def _normalize(self, declared_type: str) -> str:
+        """``:type`` en minúsculas y sin ", optional"."""
+        return _OPTIONAL_SUFFIX.sub("", str(declared_type).strip().lower())
+    
+    def _lookup(self, type_str: str):
+        """(tipo, longitud) de un nombre de tipo; (None, None) si no se conoce."""
+        match = _BOUNDED_STRING.match(type_str)
+        if match:
+            return "String", int(match.group(1))
+        return TYPE_MAPPING.get(type_str), None
+    
+    def _declared(self, declared_type: str):
+        """(tipo, longitud) de un ``:type`` de docstring Sphinx."""
+        text = self._normalize(declared_type)
+        if _COLLECTION.match(text):
+            return "JSON", None
+        # "value from the :class:`~cyberdem.enumerations.ReconType`"
+        if text.startswith("value from") or ".enumerations." in text:
+            return self.enum_type, None
+        return self._lookup(text)
@@ -0,0 +1,376 @@
+"""Módulo columnar"""
+
+"""
+Representación columnar (struct-of-arrays) de ontologías muy grandes.
+
+En lugar de un objeto por clase, atributo y relación, cada campo se guarda
+en un ``array`` de enteros: las cadenas (nombres, tipos, cardinalidades)
+se codifican como índices en una tabla de símbolos, las descripciones en
+una tabla de textos aparte y los atributos de cada clase son un rango de
+filas contiguas.
+
+``classes`` y ``relations`` recorren las filas como vistas con la misma
+interfaz que Class, Relation y Attribute, creadas al pedirlas. El mapper
+no las usa: trabaja directamente sobre los arrays de códigos y resuelve
+cada combinación distinta de símbolos una sola vez.
+"""
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .parser import Attribute, Class, Ontology, Relation, parse_cardinality
+
+
+def _codes() -> array:
+    return array("i")
+
+
+def _offsets() -> array:
+    return array("q", [0])
+
+
+@dataclass
+class AttributeColumns:
+    """
+    Filas de atributos (o de propiedades de relaciones) en columnas.
+    
+    Las filas del elemento ``i`` son ``offsets[i]:offsets[i + 1]``;
+    ``name``, ``type``, ``cardinality`` y ``declared_type`` son códigos de
+    símbolo (-1 en ``declared_type`` si no hay ``:type``) y
+    ``description`` códigos de texto (-1 si no hay descripción).
+    """
+    offsets: array = field(default_factory=_offsets)
+    name: array = field(default_factory=_codes)
+    type: array = field(default_factory=_codes)
+    cardinality: array = field(default_factory=_codes)
+    declared_type: array = field(default_factory=_codes)
+    description: array = field(default_factory=_codes)
+    
+    def __len__(self) -> int:
+        return len(self.name)
+    
+    def rows(self, index: int) -> range:
+        """Filas que pertenecen al elemento ``index``."""
+        return range(self.offsets[index], self.offsets[index + 1])
+    
+    def nbytes(self) -> int:
+        """Bytes ocupados por los arrays (sin los textos de las tablas)."""
+        return sum(column.itemsize * len(column) for column in
+                   (self.offsets, self.name, self.type, self.cardinality,
+                    self.declared_type, self.description))
+
+
+@dataclass
+class ColumnarOntology:
+    """
+    Ontología en columnas para ontologías de millones de atributos.
+    
+    Es equivalente a Ontology (``from_ontology``/``to_ontology``) y
+    OntologyMapper la mapea leyendo sus arrays, sin crear vistas de
+    fila. Las relaciones guardan el nombre de sus extremos y, en
+    ``relation_source``/``relation_target``, el índice de la clase
+    correspondiente (-1 si no existe).
+    """
+    # Tabla de símbolos: cada cadena distinta una sola vez
+    symbols: List[str] = field(default_factory=list)
+    # Descripciones distintas (las LazyDescription no se comparan: cada una
+    # ocupa su propia entrada para no leerla del archivo)
+    texts: list = field(default_factory=list)
+    
+    # Clases
+    class_id: array = field(default_factory=_codes)
+    class_name: array = field(default_factory=_codes)
+    class_description: array = field(default_factory=_codes)
+    attributes: AttributeColumns = field(default_factory=AttributeColumns)
+    
+    # Relaciones
+    relation_name: array = field(default_factory=_codes)
+    relation_type: array = field(default_factory=_codes)
+    relation_source_name: array = field(default_factory=_codes)
+    relation_target_name: array = field(default_factory=_codes)
+    relation_source: array = field(default_factory=_codes)
+    relation_target: array = field(default_factory=_codes)
+    source_cardinality: array = field(default_factory=_codes)
+    target_cardinality: array = field(default_factory=_codes)
+    relation_description: array = field(default_factory=_codes)
+    properties: AttributeColumns = field(default_factory=AttributeColumns)
+    
+    _symbol_index: Dict[str, int] = field(default_factory=dict, repr=False,
+                                          compare=False)
+    _text_index: Dict[str, int] = field(default_factory=dict, repr=False,
+                                        compare=False)
+    
+    @property
+    def num_classes(self) -> int:
+        return len(self.class_name)
+    
+    @property
+    def num_relations(self) -> int:
+        return len(self.relation_name)
+    
+    @property
+    def classes(self) -> "RowSequence":
+        """Clases como vistas ClassRow (se crean al accederlas)."""
+        return RowSequence(self.num_classes, self.class_row)
+    
+    @property
+    def relations(self) -> "RowSequence":
+        """Relaciones como vistas RelationRow (se crean al accederlas)."""
+        return RowSequence(self.num_relations, self.relation_row)
+    
+    @classmethod
+    def from_ontology(cls, ontology: Ontology) -> "ColumnarOntology":
+        """Convierte una Ontology del modelo de objetos."""
+        return cls.from_items(chain(ontology.classes, ontology.relations))
+    
+    @classmethod
+    def from_items(cls, items: Iterable[Union[Class, Relation]]) -> "ColumnarOntology":
+        """
+        Construye la ontología a partir de clases y relaciones sueltas.
+        
+        Con ``OntologyParser.iterparse`` como fuente los objetos solo viven
+        mientras se codifican, de modo que nunca se tiene el modelo de
+        objetos completo en memoria.
+        """
+        columnar = cls()
+        for item in items:
+            if isinstance(item, Class):
+                columnar._append_class(item)
+            else:
+                columnar._append_relation(item)
+        columnar._link_relations()
+        return columnar
+    
+    def to_ontology(self) -> Ontology:
+        """Reconstruye la Ontology del modelo de objetos."""
+        ontology = Ontology()
+        for row in self.classes:
+            ontology.classes.append(Class(
+                id=row.id,
+                name=row.name,
+                description=row.description,
+                attributes=[self._attribute_object(attr) for attr in row.attributes],
+            ))
+        for row in self.relations:
+            ontology.relations.append(Relation(
+                name=row.name,
+                source=row.source,
+                target=row.target,
+                type=row.type,
+                source_cardinality=row.source_cardinality,
+                target_cardinality=row.target_cardinality,
+                description=row.description,
+                properties=[self._attribute_object(prop) for prop in row.properties],
+            ))
+        return ontology
+    
+    def class_row(self, index: int) -> "ClassRow":
+        """Vista de la clase ``index``."""
+        return ClassRow(
+            self.symbols[self.class_id[index]],
+            self.symbols[self.class_name[index]],
+            self.text(self.class_description[index]),
+            self._attribute_rows(self.attributes, index),
+        )
+    
+    def relation_row(self, index: int) -> "RelationRow":
+        """Vista de la relación ``index``."""
+        symbols = self.symbols
+        source_cardinality = symbols[self.source_cardinality[index]]
+        target_cardinality = symbols[self.target_cardinality[index]]
+        return RelationRow(
+            symbols[self.relation_name[index]],
+            symbols[self.relation_source_name[index]],
+            symbols[self.relation_target_name[index]],
+            symbols[self.relation_type[index]],
+            source_cardinality,
+            target_cardinality,
+            self.text(self.relation_description[index]),
+            self._attribute_rows(self.properties, index),
+            parse_cardinality(source_cardinality),
+            parse_cardinality(target_cardinality),
+        )
+    
+    def symbol_code(self, value: str) -> int:
+        """Código de símbolo de ``value`` (-1 si no aparece)."""
+        return self._symbol_index.get(value, -1)
+    
+    def text(self, code: int):
+        """Descripción de un código de texto (None si es -1)."""
+        return None if code < 0 else self.texts[code]
+    
+    def nbytes(self) -> int:
+        """Bytes ocupados por los arrays (sin los textos de las tablas)."""
+        columns = (self.class_id, self.class_name, self.class_description,
+                   self.relation_name, self.relation_type,
+                   self.relation_source_name, self.relation_target_name,
+                   self.relation_source, self.relation_target,
+                   self.source_cardinality, self.target_cardinality,
+                   self.relation_description)
+        return (sum(column.itemsize * len(column) for column in columns)
+                + self.attributes.nbytes() + self.properties.nbytes())
+    
+    def _code(self, value: str) -> int:
+        """Código de símbolo de ``value`` (lo añade si es nuevo)."""
+        code = self._symbol_index.get(value)
+        if code is None:
+            code = len(self.symbols)
+            self._symbol_index[value] = code
+            self.symbols.append(value)
+        return code
+    
+    def _text_code(self, value) -> int:
+        """Código de texto de una descripción (-1 si es None)."""
+        if value is None:
+            return -1
+        if value.__class__ is not str:
+            # LazyDescription: compararla obligaría a leerla
+            self.texts.append(value)
+            return len(self.texts) - 1
+        code = self._text_index.get(value)
+        if code is None:
+            code = len(self.texts)
+            self._text_index[value] = code
+            self.texts.append(value)
+        return code
+    
+    def _append_class(self, cls: Class):
+        self.class_id.append(self._code(cls.id))
+        self.class_name.append(self._code(cls.name))
+        self.class_description.append(self._text_code(cls.description))
+        self._append_attributes(self.attributes, cls.attributes)
+    
+    def _append_relation(self, rel: Relation):
+        code = self._code
+        self.relation_name.append(code(rel.name))
+        self.relation_type.append(code(rel.type))
+        self.relation_source_name.append(code(rel.source))
+        self.relation_target_name.append(code(rel.target))
+        self.source_cardinality.append(code(rel.source_cardinality))
+        self.target_cardinality.append(code(rel.target_cardinality))
+        self.relation_description.append(self._text_code(rel.description))
+        self._append_attributes(self.properties, rel.properties)
+    
+    def _append_attributes(self, columns: AttributeColumns,
+                           attributes: List[Attribute]):
+        code = self._code
+        for attr in attributes:
+            columns.name.append(code(attr.name))
+            columns.type.append(code(attr.type))
+            columns.cardinality.append(code(attr.cardinality))
+            declared = attr.declared_type
+            columns.declared_type.append(-1 if declared is None else code(str(declared)))
+            columns.description.append(self._text_code(attr.description))
+        columns.offsets.append(len(columns.name))
+    
+    def _link_relations(self):
+        """Resuelve el índice de clase de los extremos de cada relación."""
+        # Código de símbolo del nombre -> primera clase con ese nombre
+        class_of: Dict[int, int] = {}
+        for index, name in enumerate(self.class_name):
+            class_of.setdefault(name, index)
+        self.relation_source = array(
+            "i", (class_of.get(name, -1) for name in self.relation_source_name))
+        self.relation_target = array(
+            "i", (class_of.get(name, -1) for name in self.relation_target_name))
+    
+    def _attribute_rows(self, columns: AttributeColumns,
+                        index: int) -> List["AttributeRow"]:
+        symbols = self.symbols
+        rows = []
+        for row in columns.rows(index):
+            cardinality = symbols[columns.cardinality[row]]
+            declared = columns.declared_type[row]
+            rows.append(AttributeRow(
+                symbols[columns.name[row]],
+                symbols[columns.type[row]],
+                cardinality,
+                self.text(columns.description[row]),
+                None if declared < 0 else symbols[declared],
+                parse_cardinality(cardinality),
+            ))
+        return rows
+    
+    @staticmethod
+    def _attribute_object(row: "AttributeRow") -> Attribute:
+        return Attribute(name=row.name, type=row.type, cardinality=row.cardinality,
+                         description=row.description, declared_type=row.declared_type)
+
+
+class RowSequence(Sequence):
+    """Secuencia de solo lectura que crea la vista de cada fila al pedirla."""
+    
+    def __init__(self, length: int, row: Callable[[int], object]):
+        self._length = length
+        self._row = row
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        return self._row(index)
+    
+    def __iter__(self):
+        return map(self._row, range(self._length))
+
+
+class AttributeRow:
+    """Fila de AttributeColumns con la interfaz de lectura de Attribute."""
+    __slots__ = ("name", "type", "cardinality", "description", "declared_type",
+                 "bounds")
+    
+    def __init__(self, name: str, type: str, cardinality: str,
+                 description: Optional[str], declared_type: Optional[str],
+                 bounds: Tuple[int, int]):
+        self.name = name
+        self.type = type
+        self.cardinality = cardinality
+        self.description = description
+        self.declared_type = declared_type
+        self.bounds = bounds
+    
+    is_required = Attribute.is_required
+    is_multiple = Attribute.is_multiple
+
+
+class ClassRow:
+    """Clase de una ColumnarOntology con la interfaz de lectura de Class."""
+    __slots__ = ("id", "name", "description", "attributes")
+    
+    def __init__(self, id: str, name: str, description: Optional[str],
+                 attributes: List[AttributeRow]):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.attributes = attributes
+
+
+class RelationRow:
+    """Relación de una ColumnarOntology con la interfaz de lectura de Relation."""
+    __slots__ = ("name", "source", "target", "type", "source_cardinality",
+                 "target_cardinality", "description", "properties",
+                 "source_bounds", "target_bounds")
+    
+    def __init__(self, name: str, source: str, target: str, type: str,
+                 source_cardinality: str, target_cardinality: str,
+                 description: Optional[str], properties: List[AttributeRow],
+                 source_bounds: Tuple[int, int], target_bounds: Tuple[int, int]):
+        self.name = name
+        self.source = source
+        self.target = target
+        self.type = type
+        self.source_cardinality = source_cardinality
+        self.target_cardinality = target_cardinality
+        self.description = description
+        self.properties = properties
+        self.source_bounds = source_bounds
+        self.target_bounds = target_bounds
+    
+    is_many_to_many = Relation.is_many_to_many
+    is_one_to_many = Relation.is_one_to_many
@@ -0,0 +1,282 @@
+"""Módulo ddl"""
+
+"""
+Orden de creación de las tablas de un esquema.
+
+Las tablas se ordenan para que cada una se cree después de las tablas a las
+que referencia. Las foreign keys que forman ciclos no se pueden crear en
+línea: se difieren a ``ALTER TABLE ... ADD CONSTRAINT`` tras crear todas
+las tablas.
+
+También define el particionado por rango de tiempo de PostgreSQL: qué
+tablas se particionan y la función que crea sus particiones.
+"""
+import heapq
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+from .mapper import Column, RelationalSchema, Table, constraint_name
+
+
+@dataclass
+class DDLPlan:
+    """Orden de creación de las tablas y foreign keys diferidas."""
+    tables: List[Table] = field(default_factory=list)
+    # (tabla, columna) de las foreign keys que cierran un ciclo
+    deferred: Set[Tuple[str, str]] = field(default_factory=set)
+    
+    def is_deferred(self, table: Table, column: Column) -> bool:
+        """True si la foreign key de ``column`` se crea con ALTER TABLE."""
+        return (table.name, column.name) in self.deferred
+
+
+def plan_ddl(schema: RelationalSchema) -> DDLPlan:
+    """
+    Ordena las tablas en tiempo lineal (salvo el heap de desempate).
+    
+    Agrupa las tablas en componentes fuertemente conexas (Tarjan) y ordena
+    el grafo de componentes con Kahn, dando preferencia al orden original
+    del esquema. Dentro de un ciclo las tablas siguen el orden del esquema
+    y se difieren las foreign keys hacia tablas que aún no existen. Las
+    referencias a la propia tabla no se difieren.
+    """
+    tables = schema.tables
+    position = {}
+    for i, table in enumerate(tables):
+        position.setdefault(table.name, i)
+    
+    # (columna, tabla referenciada) de cada tabla, solo tablas del esquema
+    references: List[List[Tuple[Column, int]]] = []
+    for table in tables:
+        refs = []
+        for col in table.columns:
+            if col.foreign_key:
+                target = position.get(col.foreign_key.rpartition('.')[0])
+                if target is not None:
+                    refs.append((col, target))
+        references.append(refs)
+    edges = [[target for _, target in refs] for refs in references]
+    
+    component = _strongly_connected(edges)
+    count = max(component, default=-1) + 1
+    
+    # Grafo de componentes: dependencias pendientes y dependientes
+    members: List[List[int]] = [[] for _ in range(count)]
+    pending = [0] * count
+    dependents: List[Set[int]] = [set() for _ in range(count)]
+    for node, refs in enumerate(edges):
+        members[component[node]].append(node)
+        for target in refs:
+            source_comp, target_comp = component[node], component[target]
+            if source_comp != target_comp and source_comp not in dependents[target_comp]:
+                dependents[target_comp].add(source_comp)
+                pending[source_comp] += 1
+    
+    # Kahn con heap: entre las listas, la componente que antes aparece
+    ready = [(members[c][0], c) for c in range(count) if pending[c] == 0]
+    heapq.heapify(ready)
+    order: List[int] = []
+    while ready:
+        _, comp = heapq.heappop(ready)
+        order.extend(members[comp])
+        for dependent in dependents[comp]:
+            pending[dependent] -= 1
+            if pending[dependent] == 0:
+                heapq.heappush(ready, (members[dependent][0], dependent))
+    
+    plan = DDLPlan(tables=[tables[i] for i in order])
+    created = [0] * len(tables)
+    for rank, node in enumerate(order):
+        created[node] = rank
+    for node in order:
+        for col, target in references[node]:
+            if target != node and created[target] > created[node]:
+                plan.deferred.add((tables[node].name, col.name))
+    return plan
+
+
+def foreign_key_name(table: Table, column: Column) -> str:
+    """Nombre de la constraint de una foreign key diferida."""
+    return constraint_name("fk", table.name, [column.name])
+
+
+# Tamaño de cada partición (date_trunc e interval de PostgreSQL)
+PARTITION_INTERVALS = ("day", "week", "month", "year")
+
+# Tipos de columna válidos como clave de partición
+PARTITION_TYPES = ("DateTime", "Date")
+
+# Función que crea las particiones de un rango (en partitions.sql)
+PARTITION_FUNCTION = "ontology2db_create_partitions"
+
+
+@dataclass
+class PartitionSpec:
+    """Particionado por rango de una tabla sobre una columna de fecha."""
+    column: str
+    interval: str = "month"
+    # Particiones creadas al aplicar el DDL, desde el periodo actual
+    premake: int = 3
+
+
+@dataclass
+class PartitionPolicy:
+    """
+    Tablas particionadas por rango de tiempo (solo PostgreSQL).
+    
+    ``tables`` asocia un nombre de tabla, o ``*`` para todas las que
+    tengan la columna, a su particionado.
+    """
+    tables: Dict[str, PartitionSpec] = field(default_factory=dict)
+    
+    def add_spec(self, spec: str):
+        """
+        Añade un particionado escrito como en el CLI.
+        
+        ``Tabla:columna[:intervalo]``; varias tablas separadas por comas y
+        ``*`` para todas las que tengan la columna.
+        """
+        tables, sep, rest = spec.partition(':')
+        column, _, interval = rest.partition(':')
+        interval = interval.strip() or "month"
+        if not sep or not column.strip() or not tables.strip():
+            raise ValueError(f"Particionado mal especificado: {spec!r}")
+        if interval not in PARTITION_INTERVALS:
+            raise ValueError(f"Intervalo de partición desconocido: {interval}. "
+                             f"Usa uno de: {', '.join(PARTITION_INTERVALS)}")
+        for table in tables.split(','):
+            if table.strip():
+                self.tables[table.strip()] = PartitionSpec(column.strip(), interval)
+    
+    def resolve(self, schema: RelationalSchema) -> Dict[str, PartitionSpec]:
+        """
+        Particionado de cada tabla del esquema.
+        
+        Raises:
+            ValueError: Si una tabla no existe o la columna no es de fecha
+        """
+        resolved: Dict[str, PartitionSpec] = {}
+        wildcard = self.tables.get("*")
+        if wildcard is not None:
+            for table in schema.tables:
+                if not table.is_association_table and any(
+                        col.name == wildcard.column for col in table.columns):
+                    resolved[table.name] = wildcard
+            if not resolved:
+                raise ValueError(f"Ninguna tabla tiene la columna {wildcard.column}")
+        for name, spec in self.tables.items():
+            if name == "*":
+                continue
+            if schema.get_table(name) is None:
+                raise ValueError(f"Particionado de una tabla inexistente: {name}")
+            resolved[name] = spec
+        for name, spec in resolved.items():
+            col = next((c for c in schema.get_table(name).columns
+                        if c.name == spec.column), None)
+            if col is None:
+                raise ValueError(f"La tabla {name} no tiene la columna {spec.column}")
+            if col.type not in PARTITION_TYPES:
+                raise ValueError(f"{name}.{spec.column} es {col.type}: el "
+                                 f"particionado necesita {' o '.join(PARTITION_TYPES)}")
+        return resolved
+
+
+def partition_function_sql() -> str:
+    """
+    Función PL/pgSQL que crea las particiones de ``parent`` en un rango.
+    
+    Cada partición cubre un ``step`` y se llama ``<tabla>_p<AAAAMMDD>``;
+    las que ya existen se saltan. Hay que crear las particiones antes de
+    que lleguen sus filas: lo que no cabe en ninguna va a la partición
+    DEFAULT, que impide crear después la partición de ese rango.
+    """
+    return f"""CREATE OR REPLACE FUNCTION {PARTITION_FUNCTION}(
+	parent text, start timestamp, stop timestamp, step interval
+) RETURNS integer AS $$
+DECLARE
+	bound timestamp := start;
+	created integer := 0;
+	partition_name text;
+BEGIN
+	WHILE bound < stop LOOP
+		partition_name := parent || '_p' || to_char(bound, 'YYYYMMDD');
+		IF to_regclass(quote_ident(partition_name)) IS NULL THEN
+			EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+			               partition_name, parent, bound, bound + step);
+			created := created + 1;
+		END IF;
+		bound := bound + step;
+	END LOOP;
+	RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+"""
+
+
+def partition_sql(table: str, spec: PartitionSpec) -> Tuple[str, str]:
+    """
+    SQL de las particiones de una tabla: (partición DEFAULT, iniciales).
+    
+    Las iniciales cubren ``premake`` periodos desde el actual, calculado
+    al aplicar el DDL.
+    """
+    quoted = '"' + table.replace('"', '""') + '"'
+    default = '"' + f"{table}_default".replace('"', '""') + '"'
+    literal = "'" + table.replace("'", "''") + "'"
+    start = f"date_trunc('{spec.interval}', now())::timestamp"
+    step = f"interval '1 {spec.interval}'"
+    return (f"CREATE TABLE {default} PARTITION OF {quoted} DEFAULT;\n\n",
+            f"SELECT {PARTITION_FUNCTION}({literal}, {start}, "
+            f"{start} + {spec.premake} * {step}, {step});\n\n")
+
+
+def _strongly_connected(edges: List[List[int]]) -> List[int]:
+    """
+    Componente fuertemente conexa de cada nodo (Tarjan iterativo).
+    
+    Sin recursión, para esquemas de decenas de miles de tablas.
+    """
+    n = len(edges)
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    component = [-1] * n
+    stack: List[int] = []
+    counter = 0
+    components = 0
+    
+    for root in range(n):
+        if index[root] >= 0:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, iter(edges[root]))]
+        while work:
+            node, neighbours = work[-1]
+            for target in neighbours:
+                if index[target] < 0:
+                    index[target] = low[target] = counter
+                    counter += 1
+                    stack.append(target)
+                    on_stack[target] = True
+                    work.append((target, iter(edges[target])))
+                    break
+                if on_stack[target]:
+                    low[node] = min(low[node], index[target])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component[member] = components
+                        if member == node:
+                            break
+                    components += 1
+    return component
@@ -0,0 +1,235 @@
+"""Módulo denormalize"""
+
+"""
+Análisis y plegado de relaciones uno a uno.
+
+Una tabla que solo se referencia desde una foreign key UNIQUE de otra
+(``Degrade.cpuloadeffect_id -> CPULoadEffect.id``) es parte de su dueña:
+leer el objeto completo cuesta una búsqueda más por tabla. El análisis
+agrupa esas tablas en clusters con raíz en la tabla que las referencia y
+el plegado las incrusta en su dueña como grupos de columnas.
+"""
+from dataclasses import dataclass, field
+from itertools import groupby
+from typing import Dict, List, Optional, Set, Tuple
+
+from .mapper import Column, EmbeddedGroup, RelationalSchema, Table
+
+
+@dataclass
+class OneToOneLink:
+    """Foreign key UNIQUE ``parent.column`` hacia una tabla de un solo uso."""
+    parent: str
+    child: str
+    column: str
+    nullable: bool = False
+
+
+@dataclass
+class OneToOneCluster:
+    """Árbol de tablas uno a uno con raíz en una tabla que no depende de otra."""
+    root: str
+    links: List[OneToOneLink] = field(default_factory=list)
+    # Longitud de la cadena más larga de foreign keys desde la raíz
+    depth: int = 0
+    
+    @property
+    def joins(self) -> int:
+        """Joins para leer un objeto completo (una búsqueda más cada uno)."""
+        return len(self.links)
+
+
+@dataclass
+class FoldedTable:
+    """Tabla plegada en otra y columnas que aporta."""
+    table: str
+    into: str
+    columns: List[str] = field(default_factory=list)
+
+
+@dataclass
+class DenormalizationReport:
+    """Clusters uno a uno encontrados y tablas plegadas."""
+    clusters: List[OneToOneCluster] = field(default_factory=list)
+    folded: List[FoldedTable] = field(default_factory=list)
+    # (tabla, motivo) de las que no se pudieron plegar
+    skipped: List[Tuple[str, str]] = field(default_factory=list)
+    
+    @property
+    def joins_removed(self) -> int:
+        return len(self.folded)
+    
+    def format(self) -> str:
+        """Informe en texto, un cluster por línea."""
+        folded = {item.table: item for item in self.folded}
+        lines = [f"Clusters uno a uno: {len(self.clusters)} "
+                 f"({sum(c.joins for c in self.clusters)} joins, "
+                 f"{self.joins_removed} eliminados)"]
+        for cluster in self.clusters:
+            remaining = sum(1 for link in cluster.links if link.child not in folded)
+            lines.append(f"  {cluster.root}: {cluster.joins + 1} tablas, profundidad "
+                         f"{cluster.depth}, búsquedas por lectura "
+                         f"{cluster.joins + 1} -> {remaining + 1}")
+            for link in cluster.links:
+                item = folded.get(link.child)
+                action = (f"plegada en {item.into} ({len(item.columns)} columnas)"
+                          if item is not None else "sin plegar")
+                lines.append(f"    {link.parent}.{link.column} -> {link.child}: {action}")
+        for table, reason in self.skipped:
+            lines.append(f"  Sin plegar {table}: {reason}")
+        return "\n".join(lines) + "\n"
+
+
+def find_one_to_one_clusters(schema: RelationalSchema) -> List[OneToOneCluster]:
+    """
+    Clusters de tablas enlazadas por foreign keys uno a uno de un solo uso.
+    
+    Una tabla depende de otra si la única referencia que recibe es una
+    foreign key UNIQUE desde ella y no tiene asociaciones, tablas hijas ni
+    herencia. Las tablas de ciclos de dependencias no forman cluster.
+    """
+    links: Dict[str, List[OneToOneLink]] = {}
+    dependent = set()
+    for table in schema.tables:
+        if not _is_plain(table):
+            continue
+        for col in table.columns:
+            if not col.unique or col.primary_key or not col.foreign_key:
+                continue
+            child_name, _, ref_col = col.foreign_key.rpartition('.')
+            child = schema.get_table(child_name)
+            if (child is None or child is table or ref_col != "id"
+                    or not _is_plain(child) or child.subclasses
+                    or schema.associations_of(child_name)
+                    or len(schema.references_to(child_name)) != 1):
+                continue
+            links.setdefault(table.name, []).append(OneToOneLink(
+                parent=table.name, child=child_name, column=col.name,
+                nullable=col.nullable))
+            dependent.add(child_name)
+    
+    clusters = []
+    for table in schema.tables:
+        if table.name not in links or table.name in dependent:
+            continue
+        cluster = OneToOneCluster(root=table.name)
+        pending = [(table.name, 1)]
+        while pending:
+            name, depth = pending.pop()
+            for link in reversed(links.get(name, [])):
+                cluster.links.append(link)
+                cluster.depth = max(cluster.depth, depth)
+                pending.append((link.child, depth + 1))
+        clusters.append(cluster)
+    return clusters
+
+
+def fold_one_to_one(schema: RelationalSchema, max_depth: int = 1,
+                    clusters: Optional[List[OneToOneCluster]] = None
+                    ) -> DenormalizationReport:
+    """
+    Incrusta las tablas uno a uno en la tabla que las referencia.
+    
+    Se pliega cada tabla cuya cadena de dependientes no supera
+    ``max_depth`` (1: solo las que no tienen dependientes), de las hojas
+    hacia la raíz. Las columnas de la tabla plegada ocupan el lugar de la
+    foreign key con el nombre de la tabla como prefijo (salvo que ya lo
+    lleven) y son nullable si la relación era opcional.
+    
+    Args:
+        schema: Esquema a modificar
+        max_depth: Altura máxima de los subárboles plegados
+        clusters: Clusters ya calculados (default: find_one_to_one_clusters)
+    
+    Returns:
+        DenormalizationReport con los clusters y las tablas plegadas
+    """
+    if clusters is None:
+        clusters = find_one_to_one_clusters(schema)
+    report = DenormalizationReport(clusters=clusters)
+    
+    removed = set()
+    for cluster in clusters:
+        # Altura de cada tabla (1 las hojas); los enlaces de una tabla van
+        # juntos y antes que los de sus dependientes
+        height: Dict[str, int] = {}
+        for link in reversed(cluster.links):
+            height.setdefault(link.child, 1)
+            height[link.parent] = max(height.get(link.parent, 1),
+                                      height[link.child] + 1)
+        # De las hojas a la raíz, todas las dependientes de cada tabla a la vez
+        for name, links in groupby(reversed(cluster.links), key=lambda link: link.parent):
+            parent = schema.get_table(name)
+            taken = {col.name for col in parent.columns}
+            embedded: Dict[str, Tuple[OneToOneLink, List[Column]]] = {}
+            for link in links:
+                if height[link.child] > max_depth:
+                    continue
+                columns = _embedded_columns(schema.get_table(link.child), link, taken)
+                if columns is None:
+                    report.skipped.append((link.child, f"columnas repetidas en {name}"))
+                    continue
+                embedded[link.column] = (link, columns)
+            if not embedded:
+                continue
+            
+            # Las columnas de cada tabla plegada ocupan el lugar de su foreign key
+            columns = []
+            for col in parent.columns:
+                if col.name not in embedded:
+                    columns.append(col)
+                    continue
+                link, group = embedded[col.name]
+                child = schema.get_table(link.child)
+                columns.extend(group)
+                parent.embedded.append(EmbeddedGroup(
+                    name=child.name,
+                    foreign_key=link.column,
+                    columns=[c.name for c in group],
+                    description=child.description
+                ))
+                removed.add(child.name)
+                report.folded.append(FoldedTable(
+                    table=child.name, into=parent.name,
+                    columns=[c.name for c in group]))
+            parent.columns = columns
+    
+    if removed:
+        schema.tables = [table for table in schema.tables if table.name not in removed]
+        schema.reindex()
+    return report
+
+
+def _is_plain(table: Table) -> bool:
+    """Tabla de una clase sin herencia (ni de asociación ni hija)."""
+    return (not table.is_association_table and table.owner is None
+            and table.inheritance is None)
+
+
+def _embedded_columns(child: Table, link: OneToOneLink,
+                      taken: Set[str]) -> Optional[List[Column]]:
+    """
+    Columnas de ``child`` renombradas para su dueña; None si chocan.
+    
+    ``taken`` son los nombres de las columnas de la dueña, que se
+    actualizan. Las columnas se modifican en su sitio: ``child``
+    desaparece del esquema.
+    """
+    prefix = f"{child.name.lower()}_"
+    taken.discard(link.column)
+    columns = [col for col in child.columns if not col.primary_key]
+    names = []
+    for col in columns:
+        name = col.name if col.name.startswith(prefix) else prefix + col.name
+        if name in taken:
+            name = prefix + col.name
+        if name in taken:
+            taken.add(link.column)
+            taken.difference_update(names)
+            return None
+        taken.add(name)
+        names.append(name)
+    for col, name in zip(columns, names):
+        col.name = name
+        col.nullable = col.nullable or link.nullable
+    return columns
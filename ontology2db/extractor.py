@@ -0,0 +1,445 @@
+"""Módulo extractor"""
+
+"""
+Extractor de ontologías a partir de paquetes Python.
+
+Recorre un paquete completo, analiza cada módulo con ``ast`` (en paralelo)
+y escribe la ontología en el formato XML de OntologyParser: una clase por
+cada ``class`` del paquete, sus argumentos de ``__init__`` como atributos,
+relaciones ``is_a`` por herencia y ``references`` por argumentos ``*_id``.
+Las clases base y los ``*_id`` se resuelven entre módulos con un índice de
+símbolos, de modo que nunca se generan relaciones hacia clases inexistentes.
+"""
+import ast
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+
+# Argumentos de __init__ que no son atributos
+_IGNORED_ARGS = ("self", "cls", "id", "args", "kwargs")
+
+# Anotaciones de tipo -> vocabulario de tipos de la ontología
+ANNOTATION_TYPES = {
+    "str": "string",
+    "int": "integer",
+    "float": "float",
+    "bool": "boolean",
+    "datetime": "datetime",
+    "date": "date",
+    "time": "time",
+}
+
+# Módulos por tarea enviada a cada proceso del pool
+_MODULES_PER_TASK = 8
+
+
+@dataclass
+class ClassInfo:
+    """Clase encontrada en un módulo."""
+    name: str
+    # Expresiones de las clases base tal como se escriben ("Base", "mod.Base")
+    bases: List[str] = field(default_factory=list)
+    docstring: Optional[str] = None
+    # (nombre, tipo) de los argumentos de __init__
+    init_args: List[Tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class ModuleInfo:
+    """Resumen de un módulo: sus clases y los nombres que importa."""
+    name: str
+    path: str
+    classes: List[ClassInfo] = field(default_factory=list)
+    # Nombre local -> nombre cualificado importado ("Base" -> "pkg.base.Base")
+    imports: Dict[str, str] = field(default_factory=dict)
+    # Módulos importados con ``from x import *``
+    star_imports: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+@dataclass
+class ExtractionStats:
+    """Resultado de una extracción."""
+    modules: int = 0
+    classes: int = 0
+    relations: int = 0
+    # Bases y ``*_id`` que no corresponden a ninguna clase del paquete
+    unresolved_bases: int = 0
+    unresolved_references: int = 0
+    # (ruta, mensaje) de los módulos que no se pudieron analizar
+    errors: List[Tuple[str, str]] = field(default_factory=list)
+
+
+class SymbolIndex:
+    """
+    Índice de las clases del paquete por nombre cualificado.
+    
+    Resuelve un nombre tal como aparece en un módulo siguiendo sus imports,
+    incluidas las reexportaciones (``from .events import Event`` en un
+    ``__init__``) y los ``import *``.
+    """
+    
+    def __init__(self, modules: List[ModuleInfo]):
+        self.modules: Dict[str, ModuleInfo] = {m.name: m for m in modules}
+        self.classes: Dict[str, ClassInfo] = {}
+        # Nombre normalizado (minúsculas, sin "_") -> nombres cualificados
+        self._by_key: Dict[str, List[str]] = {}
+        for module in modules:
+            for cls in module.classes:
+                qualname = f"{module.name}.{cls.name}"
+                self.classes.setdefault(qualname, cls)
+                self._by_key.setdefault(_key(cls.name), []).append(qualname)
+    
+    def resolve(self, module: ModuleInfo, expr: str) -> Optional[str]:
+        """Nombre cualificado de la clase ``expr`` vista desde ``module``."""
+        head, _, rest = expr.partition(".")
+        if not rest and f"{module.name}.{head}" in self.classes:
+            return f"{module.name}.{head}"
+        if head in module.imports:
+            target = module.imports[head] + ("." + rest if rest else "")
+            return self._lookup(target, depth=0)
+        for star in module.star_imports:
+            found = self._lookup(f"{star}.{expr}", depth=0)
+            if found is not None:
+                return found
+        return self._lookup(expr, depth=0) if rest else None
+    
+    def _lookup(self, qualname: str, depth: int) -> Optional[str]:
+        """Sigue reexportaciones hasta la definición de la clase."""
+        if qualname in self.classes:
+            return qualname
+        module_name, _, name = qualname.rpartition(".")
+        module = self.modules.get(module_name)
+        if module is None or depth > 16:
+            return None
+        if name in module.imports:
+            return self._lookup(module.imports[name], depth + 1)
+        for star in module.star_imports:
+            found = self._lookup(f"{star}.{name}", depth + 1)
+            if found is not None:
+                return found
+        return None
+    
+    def resolve_reference(self, module: ModuleInfo, arg: str) -> Optional[str]:
+        """
+        Clase a la que apunta un argumento ``*_id``.
+        
+        Prueba el nombre completo y luego quitando palabras por la izquierda
+        (``related_event_id`` -> ``RelatedEvent``, ``Event``), comparando sin
+        mayúsculas ni guiones bajos. Ante varias clases con el mismo nombre
+        prefiere la del propio módulo, luego una importada en él, y si no
+        hay una única candidata no resuelve.
+        """
+        words = [word for word in arg[:-3].split("_") if word]
+        for start in range(len(words)):
+            candidates = self._by_key.get("".join(words[start:]).lower())
+            if not candidates:
+                continue
+            if len(candidates) == 1:
+                return candidates[0]
+            local = [c for c in candidates if c.rpartition(".")[0] == module.name]
+            if local:
+                return local[0]
+            imported = [c for c in candidates if c in module.imports.values()]
+            if len(imported) == 1:
+                return imported[0]
+            return None
+        return None
+
+
+class OntologyXMLWriter:
+    """
+    Escritor incremental del XML de ontologías.
+    
+    Cada clase y relación se escribe en cuanto se recibe, con el mismo
+    formato (indentación de 4 espacios) que producía ``ET.indent``.
+    Las relaciones deben escribirse después de todas las clases.
+    
+    Se escribe en un archivo temporal junto al destino que solo lo
+    reemplaza si el bloque ``with`` termina sin errores: nunca queda un
+    XML truncado (ni se pierde el anterior).
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._file = None
+        self._in_relations = False
+    
+    def __enter__(self) -> "OntologyXMLWriter":
+        self._file = open(self._tmp_path, "w", encoding="utf-8")
+        self._file.write("<?xml version='1.0' encoding='utf-8'?>\n<Ontology>\n")
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                if self._in_relations:
+                    self._file.write("    </Relations>\n")
+                self._file.write("</Ontology>\n")
+            self._file.close()
+            if exc_type is None:
+                os.replace(self._tmp_path, self.path)
+        finally:
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+    
+    def write_class(self, name: str, description: Optional[str],
+                    attributes: List[Dict[str, str]]):
+        """Escribe una clase con su descripción y sus atributos."""
+        write = self._file.write
+        write(f"    <Class name={_attr(name)}>\n")
+        if description is not None:
+            write(f"        <description>{escape(description)}</description>\n")
+        if attributes:
+            write("        <Attributes>\n")
+            for attrs in attributes:
+                fields = " ".join(f"{key}={_attr(value)}" for key, value in attrs.items())
+                write(f"            <Attribute {fields} />\n")
+            write("        </Attributes>\n")
+        else:
+            write("        <Attributes />\n")
+        write("    </Class>\n")
+    
+    def write_relation(self, name: str, source: str, target: str):
+        """Escribe una relación (abre la sección Relations la primera vez)."""
+        if not self._in_relations:
+            self._file.write("    <Relations>\n")
+            self._in_relations = True
+        self._file.write(f"        <Relation name={_attr(name)} source={_attr(source)} "
+                         f"target={_attr(target)} />\n")
+
+
+class PackageExtractor:
+    """Extrae la ontología de un paquete Python completo."""
+    
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Inicializa el extractor.
+        
+        Args:
+            workers: Procesos para analizar los módulos (None = uno por CPU,
+                1 = sin pool)
+        """
+        self.workers = workers or os.cpu_count() or 1
+    
+    def extract(self, package_dir: str, output: str) -> ExtractionStats:
+        """
+        Extrae la ontología de un paquete y la escribe en ``output``.
+        
+        Args:
+            package_dir: Directorio del paquete (o un único archivo .py)
+            output: Ruta del XML de salida
+        
+        Returns:
+            ExtractionStats con el resumen de la extracción
+        """
+        package_dir = os.path.abspath(package_dir)
+        package_name = os.path.splitext(os.path.basename(package_dir))[0]
+        if package_name == "__init__":
+            package_dir = os.path.dirname(package_dir)
+            package_name = os.path.basename(package_dir)
+        files = list(_walk_package(package_dir))
+        modules = self._scan(files)
+        
+        stats = ExtractionStats(modules=len(modules))
+        stats.errors = [(m.path, m.error) for m in modules if m.error]
+        index = SymbolIndex(modules)
+        names = _output_names(index)
+        
+        relations = []
+        with OntologyXMLWriter(output) as writer:
+            for module in modules:
+                for cls in module.classes:
+                    qualname = f"{module.name}.{cls.name}"
+                    if index.classes.get(qualname) is not cls:
+                        continue
+                    source = names[qualname]
+                    attributes = self._attributes(cls)
+                    description = cls.docstring or f"{package_name} {cls.name}"
+                    writer.write_class(source, description, attributes)
+                    stats.classes += 1
+                    
+                    for base in cls.bases:
+                        target = index.resolve(module, base)
+                        if target is not None:
+                            relations.append(("is_a", source, names[target]))
+                        elif base not in ("object", "dict"):
+                            stats.unresolved_bases += 1
+                    
+                    pk_name = attributes[0]["name"]
+                    for arg, _ in cls.init_args:
+                        if arg.endswith("_id") and arg != pk_name:
+                            target = index.resolve_reference(module, arg)
+                            if target is not None:
+                                relations.append(("references", source, names[target]))
+                            else:
+                                stats.unresolved_references += 1
+            
+            for relation in relations:
+                writer.write_relation(*relation)
+        stats.relations = len(relations)
+        return stats
+    
+    def _scan(self, files: List[Tuple[str, str]]) -> List[ModuleInfo]:
+        """Analiza los módulos, en paralelo si hay suficientes."""
+        paths = [path for path, _ in files]
+        names = [name for _, name in files]
+        if self.workers > 1 and len(files) > self.workers:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                return list(executor.map(scan_module, paths, names,
+                                         chunksize=_MODULES_PER_TASK))
+        return list(map(scan_module, paths, names))
+    
+    def _attributes(self, cls: ClassInfo) -> List[Dict[str, str]]:
+        """Atributos de la clase: PK propia más los argumentos de __init__."""
+        pk_name = f"{cls.name.lower()}_id"
+        attributes = [{"name": pk_name, "type": "integer", "cardinality": "1",
+                       "primary_key": "true"}]
+        seen = {pk_name}
+        for name, type_name in cls.init_args:
+            if name not in seen:
+                seen.add(name)
+                attributes.append({"name": name, "type": type_name,
+                                   "cardinality": "1"})
+        return attributes
+
+
+def extract_package(package_dir: str, output: str,
+                    workers: Optional[int] = None) -> ExtractionStats:
+    """Atajo de ``PackageExtractor(workers).extract(package_dir, output)``."""
+    return PackageExtractor(workers).extract(package_dir, output)
+
+
+def scan_module(path: str, module_name: str) -> ModuleInfo:
+    """
+    Analiza un módulo con ``ast`` (se ejecuta en los procesos del pool).
+    
+    Solo retorna un resumen serializable: el árbol sintáctico nunca sale
+    del proceso.
+    """
+    module = ModuleInfo(name=module_name, path=path)
+    try:
+        with open(path, "rb") as f:
+            tree = ast.parse(f.read(), filename=path)
+    except (SyntaxError, ValueError, OSError) as e:
+        module.error = str(e)
+        return module
+    
+    package = module_name if path.endswith("__init__.py") else module_name.rpartition(".")[0]
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            module.classes.append(_class_info(node))
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    module.imports[alias.asname] = alias.name
+                else:
+                    head = alias.name.partition(".")[0]
+                    module.imports[head] = head
+        elif isinstance(node, ast.ImportFrom):
+            source = _absolute_module(package, node.module, node.level)
+            for alias in node.names:
+                if alias.name == "*":
+                    module.star_imports.append(source)
+                else:
+                    module.imports[alias.asname or alias.name] = f"{source}.{alias.name}"
+    return module
+
+
+def _class_info(node: ast.ClassDef) -> ClassInfo:
+    cls = ClassInfo(
+        name=node.name,
+        bases=[expr for expr in map(_dotted_name, node.bases) if expr],
+        docstring=(ast.get_docstring(node) or "").strip() or None,
+    )
+    for item in node.body:
+        if isinstance(item, ast.FunctionDef) and item.name == "__init__":
+            args = item.args
+            for arg in args.posonlyargs + args.args + args.kwonlyargs:
+                if arg.arg not in _IGNORED_ARGS:
+                    cls.init_args.append((arg.arg, _annotation_type(arg.annotation)))
+    return cls
+
+
+def _dotted_name(expr: ast.expr) -> Optional[str]:
+    """``Base`` o ``mod.Base`` de una expresión de clase base."""
+    if isinstance(expr, ast.Name):
+        return expr.id
+    if isinstance(expr, ast.Attribute):
+        head = _dotted_name(expr.value)
+        return f"{head}.{expr.attr}" if head else None
+    return None
+
+
+def _annotation_type(annotation: Optional[ast.expr]) -> str:
+    """Tipo de la ontología según la anotación (``string`` por defecto)."""
+    if isinstance(annotation, ast.Subscript):
+        # Optional[int] -> int
+        if _dotted_name(annotation.value) in ("Optional", "typing.Optional"):
+            annotation = annotation.slice
+    name = _dotted_name(annotation) if annotation is not None else None
+    if name is None:
+        return "string"
+    return ANNOTATION_TYPES.get(name.rpartition(".")[2], "string")
+
+
+def _absolute_module(package: str, module: Optional[str], level: int) -> str:
+    """Nombre absoluto del módulo de un ``from ... import``."""
+    if level == 0:
+        return module or ""
+    parts = package.split(".") if package else []
+    if level > 1:
+        parts = parts[:len(parts) - (level - 1)]
+    if module:
+        parts.append(module)
+    return ".".join(parts)
+
+
+def _walk_package(package_dir: str):
+    """Genera (ruta, nombre de módulo) de cada .py del paquete, en orden."""
+    if os.path.isfile(package_dir):
+        yield package_dir, os.path.splitext(os.path.basename(package_dir))[0]
+        return
+    root = os.path.dirname(package_dir)
+    for dirpath, dirnames, filenames in os.walk(package_dir):
+        dirnames[:] = sorted(d for d in dirnames
+                             if not d.startswith(".") and d != "__pycache__")
+        for filename in sorted(filenames):
+            if not filename.endswith(".py"):
+                continue
+            path = os.path.join(dirpath, filename)
+            parts = os.path.relpath(path, root)[:-3].split(os.sep)
+            if parts[-1] == "__init__":
+                parts.pop()
+            yield path, ".".join(parts)
+
+
+def _output_names(index: SymbolIndex) -> Dict[str, str]:
+    """
+    Nombre de cada clase en el XML: su nombre simple, o cualificado con el
+    módulo (``mod_Clase``) si hay varias clases con ese nombre.
+    """
+    counts: Dict[str, int] = {}
+    for qualname in index.classes:
+        simple = qualname.rpartition(".")[2]
+        counts[simple] = counts.get(simple, 0) + 1
+    names = {}
+    for qualname in index.classes:
+        simple = qualname.rpartition(".")[2]
+        names[qualname] = simple if counts[simple] == 1 else qualname.replace(".", "_")
+    return names
+
+
+def _key(name: str) -> str:
+    """Clave de comparación de nombres: minúsculas y sin guiones bajos."""
+    return name.replace("_", "").lower()
+
+
+def _attr(value: str) -> str:
+    """Valor de atributo XML entre comillas, escapado como ElementTree."""
+    return '"' + escape(value, {'"': "&quot;", "\n": "&#10;",
+                                "\r": "&#13;", "\t": "&#09;"}) + '"'
@@ -3,9 +3,24 @@
 """
 Mapper que convierte ontologías a esquemas relacionales.
 """
-from dataclasses import dataclass, field
-from typing import List, Optional, Dict
-from .parser import Ontology, Class, Relation, Attribute
+import hashlib
+from dataclasses import dataclass, field, replace
+from itertools import chain
+from typing import List, Optional, Dict, Set, Tuple, Union
+from .parser import (Ontology, Class, Relation, Attribute, description_text,
+                     parse_cardinality)
+from .columnar import ColumnarOntology
+from .column_types import TYPE_MAPPING, TypeResolver
+
+
+@dataclass
+class KeyGenerator:
+    """Cómo se generan los valores de una clave primaria sustituta."""
+    # "identity", "sequence" o "uuid"
+    kind: str
+    # Secuencia y valores que reserva cada sesión (kind "sequence")
+    sequence: Optional[str] = None
+    cache: int = 1
 
 
 @dataclass
@@ -17,6 +32,30 @@ class Column:
     primary_key: bool = False
     foreign_key: Optional[str] = None
     unique: bool = False
+    generator: Optional[KeyGenerator] = None
+
+
+@dataclass
+class Index:
+    """Representa un índice (compuesto si tiene varias columnas)."""
+    name: str
+    columns: List[str]
+    unique: bool = False
+    # Predicado SQL de un índice parcial ("status = 'open'")
+    where: Optional[str] = None
+    # Método de acceso ("gin") y dialecto al que se limita el índice
+    using: Optional[str] = None
+    dialect: Optional[str] = None
+
+
+@dataclass
+class EmbeddedGroup:
+    """Columnas de una tabla uno a uno plegada en su dueña."""
+    name: str
+    # Foreign key a la que sustituyen
+    foreign_key: str
+    columns: List[str] = field(default_factory=list)
+    description: Optional[str] = None
 
 
 @dataclass
@@ -26,66 +65,470 @@ class Table:
     columns: List[Column] = field(default_factory=list)
     is_association_table: bool = False
     description: Optional[str] = None
+    indexes: List[Index] = field(default_factory=list)
+    # (source, target) de las tablas de asociación
+    endpoints: Optional[Tuple[str, str]] = None
+    # Clase dueña de una tabla hija de valores multivaluados
+    owner: Optional[str] = None
+    # Estrategia de la jerarquía is_a de la clase y clase padre
+    inheritance: Optional[str] = None
+    inherits: Optional[str] = None
+    # Subclases reunidas en esta tabla (herencia single), en preorden
+    subclasses: List["Table"] = field(default_factory=list)
+    # Tablas uno a uno plegadas en esta
+    embedded: List[EmbeddedGroup] = field(default_factory=list)
+    
+    def association_endpoints(self) -> Optional[Tuple[str, str]]:
+        """Extremos de una tabla de asociación (del nombre si no se guardaron)."""
+        if not self.is_association_table:
+            return None
+        if self.endpoints is not None:
+            return self.endpoints
+        parts = self.name.split('_')
+        return (parts[0], parts[1]) if len(parts) > 1 else None
 
 
 @dataclass
 class RelationalSchema:
-    """Esquema relacional completo."""
+    """
+    Esquema relacional completo.
+    
+    Mantiene índices de tablas por nombre, de foreign keys por tabla
+    referenciada y de tablas de asociación por extremo. Las tablas añadidas
+    directamente a ``tables`` se indexan en la siguiente consulta; si se
+    modifican columnas o tablas fuera de ``add_table``/``add_column`` hay
+    que llamar a ``reindex``.
+    """
     tables: List[Table] = field(default_factory=list)
     
+    _by_name: Dict[str, Table] = field(default_factory=dict, repr=False,
+                                       compare=False)
+    _indexed: int = field(default=0, repr=False, compare=False)
+    # Se construyen al consultarlos, en el orden de tablas y columnas
+    _references: Optional[Dict[str, List[Tuple[Table, Column]]]] = field(
+        default=None, repr=False, compare=False)
+    _associations: Optional[Dict[str, List[Tuple[Table, str]]]] = field(
+        default=None, repr=False, compare=False)
+    
+    def add_table(self, table: Table):
+        """Agrega una tabla al esquema."""
+        self.tables.append(table)
+        self._index_tables()
+        self._references = self._associations = None
+    
+    def add_column(self, table: Table, column: Column):
+        """Agrega una columna a una tabla del esquema."""
+        table.columns.append(column)
+        if column.foreign_key:
+            self._references = None
+    
     def get_table(self, name: str) -> Optional[Table]:
-        """Obtiene una tabla por nombre."""
-        for table in self.tables:
-            if table.name == name:
-                return table
-        return None
+        """Obtiene una tabla por nombre (la primera si hay varias)."""
+        self._index_tables()
+        return self._by_name.get(name)
+    
+    def references_to(self, name: str) -> List[Tuple[Table, Column]]:
+        """(tabla, columna) de las foreign keys que referencian a ``name``."""
+        self._index_tables()
+        if self._references is None:
+            self._references = {}
+            for table in self.tables:
+                for col in table.columns:
+                    if col.foreign_key:
+                        ref_table = col.foreign_key.rpartition('.')[0]
+                        self._references.setdefault(ref_table, []).append((table, col))
+        return self._references.get(name, [])
+    
+    def associations_of(self, name: str) -> List[Tuple[Table, str]]:
+        """(tabla de asociación, otro extremo) de las asociaciones de ``name``."""
+        self._index_tables()
+        if self._associations is None:
+            self._associations = {}
+            for table in self.tables:
+                endpoints = table.association_endpoints()
+                if endpoints is None:
+                    continue
+                source, target = endpoints
+                self._associations.setdefault(source, []).append((table, target))
+                if target != source:
+                    self._associations.setdefault(target, []).append((table, source))
+        return self._associations.get(name, [])
+    
+    def reindex(self):
+        """Reconstruye los índices tras modificar ``tables`` directamente."""
+        self._by_name = {}
+        self._indexed = 0
+        self._references = self._associations = None
+        self._index_tables()
+    
+    def _index_tables(self):
+        """Indexa por nombre las tablas añadidas desde la última consulta."""
+        if self._indexed == len(self.tables):
+            return
+        if self._indexed > len(self.tables):
+            self._by_name = {}
+            self._indexed = 0
+        for table in self.tables[self._indexed:]:
+            self._by_name.setdefault(table.name, table)
+        self._indexed = len(self.tables)
+        self._references = self._associations = None
+
+
+@dataclass
+class IndexPolicy:
+    """
+    Qué índices genera OntologyMapper.
+    
+    Por defecto indexa las foreign keys no únicas, los dos extremos de las
+    tablas de asociación, los valores de los atributos multivaluados y el
+    discriminador de las jerarquías en una sola tabla. ``hot_attributes``
+    son columnas indexadas en cualquier tabla que las tenga
+    (``event_time``) y ``extra`` índices compuestos o parciales por tabla.
+    """
+    foreign_keys: bool = True
+    association_tables: bool = True
+    # Búsquedas por valor en atributos multivaluados (GIN o índice del valor)
+    multivalued: bool = True
+    # Filtro por subclase en la herencia single
+    discriminators: bool = True
+    hot_attributes: List[str] = field(default_factory=list)
+    extra: Dict[str, List[Index]] = field(default_factory=dict)
+    
+    @classmethod
+    def disabled(cls) -> "IndexPolicy":
+        """Política que no genera ningún índice."""
+        return cls(foreign_keys=False, association_tables=False, multivalued=False,
+                   discriminators=False)
+    
+    def add_spec(self, spec: str):
+        """
+        Añade un índice escrito como en el CLI.
+        
+        ``columna`` declara un atributo caliente; ``Tabla:col1,col2`` un
+        índice (compuesto) sobre una tabla y ``Tabla:col1,col2:predicado``
+        un índice parcial.
+        """
+        table, sep, rest = spec.partition(':')
+        if not sep:
+            self.hot_attributes.append(spec.strip())
+            return
+        columns, _, where = rest.partition(':')
+        columns = [c.strip() for c in columns.split(',') if c.strip()]
+        if not table.strip() or not columns:
+            raise ValueError(f"Índice mal especificado: {spec!r}")
+        table = table.strip()
+        self.extra.setdefault(table, []).append(
+            Index(name=index_name(table, columns), columns=columns,
+                  where=where.strip() or None))
+
+
+# Estrategias para atributos multivaluados
+MULTIVALUED_STRATEGIES = ("json", "child_table", "array")
+
+# Estrategias de clave primaria de las tablas de clases
+KEY_STRATEGIES = ("integer", "identity", "sequence", "uuid", "binary16", "ontology_id")
+
+# Tipo de la clave de cada estrategia (ontology_id: el del atributo)
+KEY_TYPES = {
+    "integer": "Integer",
+    "identity": "BigInteger",
+    "sequence": "BigInteger",
+    "uuid": "Uuid",
+    "binary16": "BINARY(16)",
+}
+
+# Estrategias de herencia para las jerarquías is_a
+INHERITANCE_STRATEGIES = ("none", "joined", "single", "concrete")
+
+# Columna con el nombre de la clase de cada fila (herencia joined y single)
+DISCRIMINATOR = "discriminator"
+
+
+@dataclass
+class InheritancePolicy:
+    """
+    Cómo se mapea cada jerarquía de relaciones ``is_a``.
+    
+    ``none`` mapea ``is_a`` como cualquier relación uno a uno; ``joined``
+    crea una tabla por clase cuya PK es foreign key de la del padre, con un
+    discriminador en la raíz; ``single`` reúne la jerarquía en la tabla de
+    la raíz (sin joins) y ``concrete`` da a cada clase una tabla completa
+    con las columnas heredadas (sin joins ni discriminador).
+    ``hierarchies`` fija la estrategia de una jerarquía por su clase raíz.
+    """
+    default: str = "none"
+    hierarchies: Dict[str, str] = field(default_factory=dict)
+    
+    def __post_init__(self):
+        for strategy in chain([self.default], self.hierarchies.values()):
+            _check_inheritance(strategy)
+    
+    def add_spec(self, spec: str):
+        """Añade una estrategia escrita como en el CLI: ``Raiz=estrategia``."""
+        root, sep, strategy = spec.partition('=')
+        if not sep or not root.strip():
+            raise ValueError(f"Herencia mal especificada: {spec!r}")
+        self.hierarchies[root.strip()] = _check_inheritance(strategy.strip())
+    
+    def strategy(self, root: str) -> str:
+        """Estrategia de la jerarquía con raíz ``root``."""
+        return self.hierarchies.get(root, self.default)
+
+
+def _check_inheritance(strategy: str) -> str:
+    if strategy not in INHERITANCE_STRATEGIES:
+        raise ValueError(f"Estrategia de herencia desconocida: {strategy}. "
+                         f"Usa una de: {', '.join(INHERITANCE_STRATEGIES)}")
+    return strategy
+
+
+def is_collection_type(type_str: str) -> bool:
+    """True si el tipo es una columna JSONB o ARRAY de valores."""
+    return type_str == "JSONB" or type_str.startswith("ARRAY(")
+
+
+def index_name(table: str, columns: List[str]) -> str:
+    """Nombre ``ix_tabla_columnas`` acortado a 63 caracteres (PostgreSQL)."""
+    return constraint_name("ix", table, columns)
+
+
+def constraint_name(prefix: str, table: str, columns: List[str]) -> str:
+    """Nombre ``prefijo_tabla_columnas`` acortado a 63 caracteres (PostgreSQL)."""
+    name = f"{prefix}_{table}_{'_'.join(columns)}".lower()
+    if len(name) > 63:
+        digest = hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]
+        name = f"{name[:54]}_{digest}"
+    return name
 
 
 class OntologyMapper:
     """Mapea ontologías a esquemas relacionales."""
     
-    TYPE_MAPPING = {
-        "string": "String",
-        "text": "Text",
-        "int": "Integer",
-        "integer": "Integer",
-        "float": "Float",
-        "double": "Float",
-        "bool": "Boolean",
-        "boolean": "Boolean",
-        "datetime": "DateTime",
-        "date": "Date",
-        "time": "Time"
-    }
-    
-    def map(self, ontology: Ontology) -> RelationalSchema:
+    TYPE_MAPPING = TYPE_MAPPING
+    
+    def __init__(self, index_policy: Optional[IndexPolicy] = None,
+                 type_resolver: Optional[TypeResolver] = None,
+                 multivalued: str = "json",
+                 inheritance: Optional[InheritancePolicy] = None,
+                 fold_one_to_one: int = 0,
+                 key_strategy: str = "integer",
+                 sequence_cache: int = 100):
+        """
+        Inicializa el mapper.
+        
+        Args:
+            index_policy: Índices a generar (default: IndexPolicy())
+            type_resolver: Resolución de tipos de columna (default: TypeResolver())
+            multivalued: Estrategia para los atributos multivaluados (cardinalidad
+                máxima > 1 o ``:type`` lista): "json" (columna JSON, JSONB en
+                PostgreSQL), "child_table" (tabla hija con FK y posición) o
+                "array" (ARRAY nativo en PostgreSQL, JSON en el resto)
+            inheritance: Estrategia de cada jerarquía is_a
+                (default: InheritancePolicy(), relaciones uno a uno)
+            fold_one_to_one: Altura máxima de los árboles de tablas uno a uno
+                que se pliegan en su dueña (0: solo analizarlos). El informe
+                queda en ``denormalization``
+            key_strategy: Clave primaria de las tablas de clases: "integer",
+                "identity" (BigInteger GENERATED AS IDENTITY), "sequence"
+                (BigInteger con secuencia cacheada), "uuid" (UUID nativo),
+                "binary16" (UUID en BINARY(16)) u "ontology_id" (el atributo
+                ``<clase>_id`` de la ontología pasa a ser la PK). Las foreign
+                keys toman el tipo de la clave que referencian
+            sequence_cache: Valores de la secuencia que reserva cada sesión
+                (key_strategy "sequence"), para inserciones masivas
+        """
+        if multivalued not in MULTIVALUED_STRATEGIES:
+            raise ValueError(f"Estrategia multivaluada desconocida: {multivalued}. "
+                             f"Usa una de: {', '.join(MULTIVALUED_STRATEGIES)}")
+        if key_strategy not in KEY_STRATEGIES:
+            raise ValueError(f"Estrategia de clave desconocida: {key_strategy}. "
+                             f"Usa una de: {', '.join(KEY_STRATEGIES)}")
+        self.index_policy = index_policy if index_policy is not None else IndexPolicy()
+        self.type_resolver = type_resolver if type_resolver is not None else TypeResolver()
+        self.multivalued = multivalued
+        self.inheritance = inheritance if inheritance is not None else InheritancePolicy()
+        self.fold_one_to_one = fold_one_to_one
+        self.key_strategy = key_strategy
+        self.sequence_cache = sequence_cache
+        # Informe de clusters uno a uno del último esquema mapeado
+        self.denormalization = None
+        # Tipos ya resueltos por (tipo XML, :type, nombre) y :type de lista
+        self._types: Dict[Tuple, str] = {}
+        self._lists: Dict[Optional[str], bool] = {}
+    
+    def map(self, ontology: Union[Ontology, ColumnarOntology]) -> RelationalSchema:
         """
         Convierte una ontología a un esquema relacional.
         
         Args:
-            ontology: Objeto Ontology a convertir
+            ontology: Objeto Ontology o ColumnarOntology a convertir
             
         Returns:
             RelationalSchema con tablas y columnas
         """
         schema = RelationalSchema()
+        # El resolver puede haber cambiado desde el último mapeo
+        self._types.clear()
+        self._lists.clear()
+        
+        if isinstance(ontology, ColumnarOntology):
+            parents = self._map_columnar(ontology, schema)
+        else:
+            parents = self._map_objects(ontology, schema)
         
-        # Mapear clases a tablas
-        for cls in ontology.classes:
+        self._apply_inheritance(schema, parents)
+        self._denormalize(schema)
+        self._apply_keys(schema)
+        self._add_indexes(schema)
+        return schema
+    
+    def _map_objects(self, ontology: Ontology,
+                     schema: RelationalSchema) -> Dict[str, str]:
+        """
+        Mapea las clases y relaciones de una Ontology al esquema.
+        
+        Returns:
+            Padre de cada clase que hereda (ver ``_inheritance_parents``)
+        """
+        classes = ontology.classes
+        relations = ontology.relations
+        parents = self._inheritance_parents(
+            [cls.name for cls in classes],
+            [(rel.source, rel.target) for rel in relations if rel.name == "is_a"])
+        
+        # Mapear clases a tablas (y sus tablas hijas de valores)
+        for cls in classes:
             table = self._map_class_to_table(cls)
-            schema.tables.append(table)
+            schema.add_table(table)
+            if self.multivalued == "child_table":
+                for attr in cls.attributes:
+                    if self._is_multivalued(attr.bounds[1], attr.declared_type):
+                        schema.add_table(self._child_table(
+                            cls.name, attr.name, self._element_type(attr)))
         
-        # Mapear relaciones
-        for rel in ontology.relations:
+        # Mapear relaciones (salvo las is_a que mapea la herencia)
+        for rel in relations:
+            if rel.name == "is_a" and parents.get(rel.source) == rel.target:
+                continue
             self._map_relation(rel, schema, ontology)
+        return parents
+    
+    def _map_columnar(self, ontology: ColumnarOntology,
+                      schema: RelationalSchema) -> Dict[str, str]:
+        """
+        Mapea una ColumnarOntology leyendo directamente sus arrays.
         
-        return schema
+        No crea vistas de fila: los nombres salen de la tabla de símbolos y
+        el tipo, la nulabilidad y el carácter multivaluado de cada atributo
+        se resuelven una sola vez por combinación distinta de códigos
+        (nombre, tipo, cardinalidad, ``:type``). El resultado es el mismo
+        que el de ``_map_objects`` sobre ``ontology.to_ontology()``.
+        
+        Returns:
+            Padre de cada clase que hereda (ver ``_inheritance_parents``)
+        """
+        symbols = ontology.symbols
+        names = [symbols[code] for code in ontology.class_name]
+        relation_name = ontology.relation_name
+        source_name = ontology.relation_source_name
+        target_name = ontology.relation_target_name
+        is_a = ontology.symbol_code("is_a")
+        parents = self._inheritance_parents(
+            names,
+            [(symbols[source_name[index]], symbols[target_name[index]])
+             for index, code in enumerate(relation_name) if code == is_a])
+        
+        # Clases: una columna por fila de atributo, sin objetos intermedios
+        attributes = ontology.attributes
+        signatures: Dict[Tuple[int, int, int, int], Tuple] = {}
+        for index, name in enumerate(names):
+            table = Table(
+                name=name,
+                description=description_text(
+                    ontology.text(ontology.class_description[index]))
+            )
+            table.columns.append(Column(
+                name="id",
+                type="Integer",
+                nullable=False,
+                primary_key=True
+            ))
+            children = []
+            for row in attributes.rows(index):
+                key = (attributes.name[row], attributes.type[row],
+                       attributes.cardinality[row], attributes.declared_type[row])
+                signature = signatures.get(key)
+                if signature is None:
+                    signature = signatures[key] = self._columnar_attribute(symbols, *key)
+                attr_name, type_str, nullable, element_type = signature
+                if element_type is not None:
+                    children.append(self._child_table(name, attr_name, element_type))
+                else:
+                    table.columns.append(Column(name=attr_name, type=type_str,
+                                                nullable=nullable))
+            schema.add_table(table)
+            for child in children:
+                schema.add_table(child)
+        
+        # Relaciones (salvo las is_a que mapea la herencia)
+        bounds = {code: parse_cardinality(symbols[code]) for code in
+                  set(ontology.source_cardinality) | set(ontology.target_cardinality)}
+        properties = ontology.properties
+        for index, code in enumerate(relation_name):
+            source = symbols[source_name[index]]
+            target = symbols[target_name[index]]
+            if code == is_a and parents.get(source) == target:
+                continue
+            source_bounds = bounds[ontology.source_cardinality[index]]
+            target_bounds = bounds[ontology.target_cardinality[index]]
+            if source_bounds[1] > 1 and target_bounds[1] > 1:
+                table = self._association_table(
+                    source, target,
+                    description_text(ontology.text(ontology.relation_description[index])))
+                for row in properties.rows(index):
+                    prop_name = symbols[properties.name[row]]
+                    declared = properties.declared_type[row]
+                    table.columns.append(Column(
+                        name=prop_name,
+                        type=self._resolve_type(symbols[properties.type[row]],
+                                                None if declared < 0 else symbols[declared],
+                                                prop_name),
+                        nullable=parse_cardinality(
+                            symbols[properties.cardinality[row]])[0] == 0
+                    ))
+                schema.add_table(table)
+            else:
+                unique = not (source_bounds[1] == 1 and target_bounds[1] > 1)
+                self._foreign_key(schema, source, target, source_bounds[0] == 0, unique)
+        return parents
+    
+    def _columnar_attribute(self, symbols: List[str], name: int, type_code: int,
+                            cardinality: int, declared: int) -> Tuple:
+        """
+        Columna de un atributo de ColumnarOntology a partir de sus códigos.
+        
+        Returns:
+            (nombre, tipo, nullable, tipo de elemento). El tipo de elemento
+            solo se indica si el atributo va a una tabla hija (estrategia
+            ``child_table``); entonces el tipo de columna es None
+        """
+        name = symbols[name]
+        type_str = symbols[type_code]
+        declared_type = None if declared < 0 else symbols[declared]
+        low, high = parse_cardinality(symbols[cardinality])
+        if not self._is_multivalued(high, declared_type):
+            return name, self._resolve_type(type_str, declared_type, name), low == 0, None
+        element_type = self.type_resolver.element_type(type_str, declared_type, name)
+        if self.multivalued == "child_table":
+            return name, None, low == 0, element_type
+        column = self._multivalued_column(name, element_type, low >= 1)
+        return name, column.type, column.nullable, None
     
     def _map_class_to_table(self, cls: Class) -> Table:
         """Convierte una clase a una tabla."""
         table = Table(
             name=cls.name,
-            description=cls.description
+            description=description_text(cls.description)
         )
         
         # Agregar primary key
@@ -98,13 +541,16 @@ class OntologyMapper:
         
         # Mapear atributos a columnas
         for attr in cls.attributes:
-            if not attr.is_multiple():  # Solo atributos simples
+            if not self._is_multivalued(attr.bounds[1], attr.declared_type):
                 column = Column(
                     name=attr.name,
-                    type=self._map_type(attr.type),
+                    type=self._column_type(attr),
                     nullable=not attr.is_required()
                 )
                 table.columns.append(column)
+            elif self.multivalued != "child_table":
+                table.columns.append(self._multivalued_column(
+                    attr.name, self._element_type(attr), attr.is_required()))
         
         return table
     
@@ -123,55 +569,445 @@ class OntologyMapper:
     
     def _create_association_table(self, rel: Relation, schema: RelationalSchema):
         """Crea una tabla de asociación para relaciones many-to-many."""
-        table_name = f"{rel.source}_{rel.target}"
+        table = self._association_table(rel.source, rel.target,
+                                        description_text(rel.description))
         
+        # Agregar propiedades de la relación
+        for prop in rel.properties:
+            table.columns.append(Column(
+                name=prop.name,
+                type=self._column_type(prop),
+                nullable=not prop.is_required()
+            ))
+        
+        schema.add_table(table)
+    
+    def _association_table(self, source: str, target: str,
+                           description: Optional[str]) -> Table:
+        """Tabla de asociación ``Origen_Destino`` con sus dos foreign keys."""
         table = Table(
-            name=table_name,
+            name=f"{source}_{target}",
             is_association_table=True,
-            description=rel.description
+            description=description,
+            endpoints=(source, target)
         )
         
         # Columnas de foreign keys
         table.columns.append(Column(
-            name=f"{rel.source.lower()}_id",
+            name=f"{source.lower()}_id",
             type="Integer",
             nullable=False,
-            foreign_key=f"{rel.source}.id",
+            foreign_key=f"{source}.id",
             primary_key=True
         ))
         
         table.columns.append(Column(
-            name=f"{rel.target.lower()}_id",
+            name=f"{target.lower()}_id",
             type="Integer",
             nullable=False,
-            foreign_key=f"{rel.target}.id",
+            foreign_key=f"{target}.id",
             primary_key=True
         ))
-        
-        # Agregar propiedades de la relación
-        for prop in rel.properties:
-            table.columns.append(Column(
-                name=prop.name,
-                type=self._map_type(prop.type),
-                nullable=not prop.is_required()
-            ))
-        
-        schema.tables.append(table)
+        return table
     
     def _add_foreign_key(self, rel: Relation, schema: RelationalSchema, 
                         unique: bool = False):
         """Agrega una foreign key a la tabla target."""
-        target_table = schema.get_table(rel.target)
+        self._foreign_key(schema, rel.source, rel.target,
+                          rel.source_bounds[0] == 0, unique)
+    
+    def _foreign_key(self, schema: RelationalSchema, source: str, target: str,
+                     nullable: bool, unique: bool):
+        """Agrega a la tabla ``target`` la foreign key hacia ``source``."""
+        target_table = schema.get_table(target)
         if target_table:
             fk_column = Column(
-                name=f"{rel.source.lower()}_id",
+                name=f"{source.lower()}_id",
                 type="Integer",
-                nullable="0" in rel.source_cardinality,
-                foreign_key=f"{rel.source}.id",
+                nullable=nullable,
+                foreign_key=f"{source}.id",
                 unique=unique
             )
-            target_table.columns.append(fk_column)
+            schema.add_column(target_table, fk_column)
+    
+    def _add_indexes(self, schema: RelationalSchema):
+        """Añade a cada tabla los índices de la política."""
+        policy = self.index_policy
+        hot = set(policy.hot_attributes)
+        for table in schema.tables:
+            if table.is_association_table and not policy.association_tables:
+                continue
+            seen = {(tuple(index.columns), index.where) for index in table.indexes}
+            fk_policy = (policy.association_tables if table.is_association_table
+                         else policy.foreign_keys)
+            # La PK ya indexa su primera columna y UNIQUE crea su propio índice
+            pk = [col.name for col in table.columns if col.primary_key]
+            for col in table.columns:
+                wanted = (col.foreign_key and fk_policy) or col.name in hot
+                if wanted and not col.unique and pk[:1] != [col.name]:
+                    self._add_index(table, Index(
+                        name=index_name(table.name, [col.name]),
+                        columns=[col.name]), seen)
+                elif policy.multivalued and is_collection_type(col.type):
+                    # Pertenencia (@>, ANY) con GIN, solo en PostgreSQL
+                    self._add_index(table, Index(
+                        name=index_name(table.name, [col.name]),
+                        columns=[col.name], using="gin", dialect="postgresql"), seen)
+            
+            if (policy.discriminators and table.inheritance == "single"
+                    and table.inherits is None):
+                # Consultas por subclase: WHERE discriminator IN (...)
+                self._add_index(table, Index(
+                    name=index_name(table.name, [DISCRIMINATOR]),
+                    columns=[DISCRIMINATOR]), seen)
+            
+            if table.owner is not None and policy.multivalued:
+                # "¿Qué dueños contienen este valor?"
+                columns = ["value", pk[0]]
+                self._add_index(table, Index(name=index_name(table.name, columns),
+                                             columns=columns), seen)
+        
+        for table_name, indexes in policy.extra.items():
+            table = schema.get_table(table_name)
+            if table is None:
+                raise ValueError(f"Índice sobre una tabla inexistente: {table_name}")
+            names = {col.name for col in table.columns}
+            seen = {(tuple(index.columns), index.where) for index in table.indexes}
+            for index in indexes:
+                missing = [c for c in index.columns if c not in names]
+                if missing:
+                    raise ValueError(f"Índice {index.name}: la tabla {table_name} "
+                                     f"no tiene las columnas {', '.join(missing)}")
+                self._add_index(table, index, seen)
+    
+    def _inheritance_parents(self, classes: List[str],
+                             edges: List[Tuple[str, str]]) -> Dict[str, str]:
+        """
+        Padre de cada clase de las jerarquías con estrategia distinta de none.
+        
+        Cada clase hereda de su primer ``is_a`` hacia otra clase de la
+        ontología; los demás (herencia múltiple) y los que cerrarían un
+        ciclo se mapean como relaciones normales.
+        """
+        known = set(classes)
+        for root in self.inheritance.hierarchies:
+            if root not in known:
+                raise ValueError(f"Jerarquía de una clase inexistente: {root}")
+        
+        parents: Dict[str, str] = {}
+        for child, parent in edges:
+            if child in parents or child not in known or parent not in known:
+                continue
+            ancestor = parent
+            while ancestor != child and ancestor in parents:
+                ancestor = parents[ancestor]
+            if ancestor != child:
+                parents[child] = parent
+        
+        for root in self.inheritance.hierarchies:
+            if root in parents:
+                raise ValueError(f"{root} no es la raíz de su jerarquía "
+                                 f"(hereda de {parents[root]})")
+        
+        roots: Dict[str, str] = {}
+        for name in parents:
+            path = []
+            ancestor = name
+            while ancestor in parents and ancestor not in roots:
+                path.append(ancestor)
+                ancestor = parents[ancestor]
+            root = roots.get(ancestor, ancestor)
+            for member in path:
+                roots[member] = root
+        return {name: parent for name, parent in parents.items()
+                if self.inheritance.strategy(roots[name]) != "none"}
+    
+    def _apply_inheritance(self, schema: RelationalSchema, parents: Dict[str, str]):
+        """Aplica a cada jerarquía is_a su estrategia de herencia."""
+        if not parents:
+            return
+        children: Dict[str, List[str]] = {}
+        for table in schema.tables:
+            if (table.name in parents and table.owner is None
+                    and not table.is_association_table):
+                children.setdefault(parents[table.name], []).append(table.name)
+        roots = [table.name for table in schema.tables
+                 if table.name in children and table.name not in parents
+                 and table.owner is None and not table.is_association_table]
+        
+        folded: Dict[str, str] = {}
+        for root in roots:
+            # Preorden: cada clase detrás de su padre
+            members = []
+            pending = [root]
+            while pending:
+                name = pending.pop()
+                members.append(name)
+                pending.extend(reversed(children.get(name, [])))
+            strategy = self.inheritance.strategy(root)
+            tables = [schema.get_table(name) for name in members]
+            for table in tables:
+                table.inheritance = strategy
+                table.inherits = parents.get(table.name)
+            if strategy == "joined":
+                self._add_discriminator(tables[0], members)
+                for table in tables[1:]:
+                    # La PK de la subclase es la fila de su padre
+                    pk = next(col for col in table.columns if col.primary_key)
+                    pk.foreign_key = f"{table.inherits}.id"
+            elif strategy == "single":
+                self._add_discriminator(tables[0], members)
+                existing = {col.name: col for col in tables[0].columns}
+                for table in tables[1:]:
+                    self._fold_into(tables[0], table, existing)
+                    folded[table.name] = root
+            else:
+                self._inherit_columns(schema, tables)
+        
+        if folded:
+            self._redirect_folded(schema, folded)
+        self._order_subclasses(schema)
+    
+    def _denormalize(self, schema: RelationalSchema):
+        """Analiza (y pliega si se pidió) las tablas uno a uno."""
+        from .denormalize import (DenormalizationReport, find_one_to_one_clusters,
+                                  fold_one_to_one)
+        clusters = find_one_to_one_clusters(schema)
+        if self.fold_one_to_one > 0:
+            self.denormalization = fold_one_to_one(schema, self.fold_one_to_one, clusters)
+        else:
+            self.denormalization = DenormalizationReport(clusters=clusters)
+    
+    def _apply_keys(self, schema: RelationalSchema):
+        """
+        Aplica la estrategia de clave a las PK ``id`` y a sus foreign keys.
+        
+        Con ``ontology_id`` la columna ``<clase>_id`` (obligatoria) se
+        elimina y su tipo pasa a la PK, que conserva el nombre ``id``; las
+        tablas sin ese atributo mantienen la clave Integer. Las PK que son
+        foreign key (subclases joined) toman el tipo de su padre.
+        """
+        if self.key_strategy == "integer":
+            return
+        for table in schema.tables:
+            if table.is_association_table or table.owner is not None:
+                continue
+            pk = next((col for col in table.columns
+                       if col.primary_key and col.name == "id"), None)
+            if pk is None or pk.foreign_key:
+                continue
+            if self.key_strategy == "ontology_id":
+                name = f"{table.name.lower()}_id"
+                attr = next((col for col in table.columns if col.name == name
+                             and not col.nullable and not col.foreign_key), None)
+                if attr is not None:
+                    pk.type = attr.type
+                    table.columns.remove(attr)
+                continue
+            pk.type = KEY_TYPES[self.key_strategy]
+            if self.key_strategy == "identity":
+                pk.generator = KeyGenerator(kind="identity")
+            elif self.key_strategy == "sequence":
+                pk.generator = KeyGenerator(
+                    kind="sequence",
+                    sequence=constraint_name("seq", table.name, ["id"]),
+                    cache=self.sequence_cache)
+            else:
+                # uuid y binary16: UUID v4 generado al crear la fila
+                pk.generator = KeyGenerator(kind="uuid")
+        
+        # Tipo de cada columna referenciada, siguiendo las PK que son FK
+        columns = {}
+        for table in schema.tables:
+            for col in table.columns:
+                if col.primary_key:
+                    columns[f"{table.name}.{col.name}"] = col
+        for table in schema.tables:
+            for col in table.columns:
+                target = columns.get(col.foreign_key) if col.foreign_key else None
+                seen = set()
+                while target is not None and target.foreign_key and id(target) not in seen:
+                    seen.add(id(target))
+                    target = columns.get(target.foreign_key)
+                if target is not None:
+                    col.type = target.type
+    
+    def _add_discriminator(self, root: Table, members: List[str]):
+        """Columna con el nombre de la clase de cada fila, tras la PK."""
+        if any(col.name == DISCRIMINATOR for col in root.columns):
+            raise ValueError(f"La tabla {root.name} ya tiene una columna {DISCRIMINATOR}")
+        length = max(len(name) for name in members)
+        root.columns.insert(1, Column(
+            name=DISCRIMINATOR,
+            type=f"String({length})",
+            nullable=False
+        ))
+    
+    def _fold_into(self, root: Table, table: Table, existing: Dict[str, Column]):
+        """
+        Mueve las columnas de una subclase a la tabla de la raíz (single).
+        
+        Son nullable porque las filas de otras clases no las tienen. Las
+        columnas iguales de distintas subclases se comparten y las que
+        chocan con otra de distinto tipo llevan el nombre de la clase.
+        ``existing`` son las columnas de la raíz por nombre.
+        """
+        for col in table.columns:
+            if col.primary_key:
+                continue
+            same = existing.get(col.name)
+            if same is not None:
+                if (same.type, same.foreign_key) == (col.type, col.foreign_key):
+                    continue
+                col = replace(col, name=f"{table.name.lower()}_{col.name}")
+                if col.name in existing:
+                    raise ValueError(f"Columna repetida al reunir {table.name} "
+                                     f"en {root.name}: {col.name}")
+            col.nullable = True
+            existing[col.name] = col
+            root.columns.append(col)
+        root.subclasses.append(Table(
+            name=table.name,
+            description=table.description,
+            inheritance="single",
+            inherits=table.inherits
+        ))
+    
+    def _redirect_folded(self, schema: RelationalSchema, folded: Dict[str, str]):
+        """Quita las tablas reunidas y apunta sus referencias a la raíz."""
+        schema.tables = [table for table in schema.tables
+                         if table.name not in folded or table.owner is not None
+                         or table.is_association_table]
+        for table in schema.tables:
+            for col in table.columns:
+                if col.foreign_key:
+                    ref_table, _, ref_col = col.foreign_key.rpartition('.')
+                    if ref_table in folded:
+                        col.foreign_key = f"{folded[ref_table]}.{ref_col}"
+            if table.owner in folded:
+                table.owner = folded[table.owner]
+            endpoints = table.association_endpoints()
+            if endpoints is not None:
+                table.endpoints = tuple(folded.get(name, name) for name in endpoints)
+    
+    def _inherit_columns(self, schema: RelationalSchema, tables: List[Table]):
+        """
+        Copia en cada subclase las columnas de su padre (concrete).
+        
+        Las tablas siguen el preorden, así que el padre ya tiene las de sus
+        antecesores. Una columna propia con el mismo nombre sustituye a la
+        heredada; las tablas hijas de valores también se duplican.
+        """
+        owned: Dict[str, List[Table]] = {}
+        for table in schema.tables:
+            if table.owner is not None:
+                owned.setdefault(table.owner, []).append(table)
+        by_name = {table.name: table for table in tables}
+        for table in tables[1:]:
+            parent = by_name[table.inherits]
+            own = {col.name for col in table.columns}
+            inherited = [replace(col) for col in parent.columns
+                         if not col.primary_key and col.name not in own]
+            table.columns[1:1] = inherited
+            for child in owned.get(parent.name, []):
+                attr = child.name[len(parent.name) + 1:]
+                value = next(col for col in child.columns if col.name == "value")
+                copy = self._child_table(table.name, attr, value.type)
+                if schema.get_table(copy.name) is None:
+                    owned.setdefault(table.name, []).append(copy)
+                    schema.add_table(copy)
+    
+    def _order_subclasses(self, schema: RelationalSchema):
+        """Pone cada subclase joined detrás de su padre (clases de Python)."""
+        placed: Set[str] = set()
+        waiting: Dict[str, List[Table]] = {}
+        ordered: List[Table] = []
+        for table in schema.tables:
+            if (table.inheritance == "joined" and table.inherits is not None
+                    and table.inherits not in placed):
+                waiting.setdefault(table.inherits, []).append(table)
+                continue
+            pending = [table]
+            while pending:
+                current = pending.pop()
+                ordered.append(current)
+                placed.add(current.name)
+                pending.extend(reversed(waiting.pop(current.name, [])))
+        schema.tables = ordered
+        schema.reindex()
+    
+    def _add_index(self, table: Table, index: Index, seen: Set[Tuple]):
+        """
+        Agrega un índice salvo que ya exista uno equivalente.
+        
+        ``seen`` son las claves (columnas, predicado) de los índices de la
+        tabla, para no recorrerlos en cada alta.
+        """
+        key = (tuple(index.columns), index.where)
+        if key not in seen:
+            seen.add(key)
+            table.indexes.append(index)
+    
+    def _is_multivalued(self, high: int, declared_type: Optional[str]) -> bool:
+        """Multivaluado: cardinalidad máxima > 1 o ``:type`` de lista."""
+        if high > 1:
+            return True
+        is_list = self._lists.get(declared_type)
+        if is_list is None:
+            is_list = self._lists[declared_type] = self.type_resolver.is_list(declared_type)
+        return is_list
+    
+    def _element_type(self, attr: Attribute) -> str:
+        return self.type_resolver.element_type(attr.type, attr.declared_type, attr.name)
+    
+    def _multivalued_column(self, name: str, element_type: str,
+                            required: bool) -> Column:
+        """Columna JSON o ARRAY con todos los valores de un atributo."""
+        type_str = f"ARRAY({element_type})" if self.multivalued == "array" else "JSONB"
+        return Column(name=name, type=type_str, nullable=not required)
+    
+    def _child_table(self, owner: str, name: str, element_type: str) -> Table:
+        """
+        Tabla hija ``Clase_atributo`` con un valor por fila.
+        
+        La PK (dueño, posición) conserva el orden de la lista y sirve para
+        leer los valores de un dueño; el índice por valor lo añade la
+        política de índices.
+        """
+        table = Table(
+            name=f"{owner}_{name}",
+            description=f"Valores de {owner}.{name}",
+            owner=owner
+        )
+        table.columns.append(Column(
+            name=f"{owner.lower()}_id",
+            type="Integer",
+            nullable=False,
+            foreign_key=f"{owner}.id",
+            primary_key=True
+        ))
+        table.columns.append(Column(
+            name="position",
+            type="Integer",
+            nullable=False,
+            primary_key=True
+        ))
+        table.columns.append(Column(
+            name="value",
+            type=element_type,
+            nullable=False
+        ))
+        return table
+    
+    def _column_type(self, attr: Attribute) -> str:
+        """Tipo SQLAlchemy de un atributo (XML, ``:type`` y longitud)."""
+        return self._resolve_type(attr.type, attr.declared_type, attr.name)
     
-    def _map_type(self, type_str: str) -> str:
-        """Mapea tipos de la ontología a tipos SQLAlchemy."""
-        return self.TYPE_MAPPING.get(type_str.lower(), "String")
\ No newline at end of file
+    def _resolve_type(self, type_str: str, declared_type: Optional[str],
+                      name: str) -> str:
+        """Tipo SQLAlchemy de un tipo XML, su ``:type`` y su nombre (memoizado)."""
+        key = (type_str, declared_type, name)
+        resolved = self._types.get(key)
+        if resolved is None:
+            resolved = self._types[key] = self.type_resolver.resolve(*key)
+        return resolved
\ No newline at end of file
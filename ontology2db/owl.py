@@ -0,0 +1,635 @@
+"""Módulo owl"""
+
+"""
+Parser de ontologías OWL en sintaxis RDF/XML u OWL/XML.
+
+Convierte clases, propiedades de datos, propiedades de objeto y
+restricciones de cardinalidad al mismo modelo que OntologyParser
+(Class/Attribute/Relation), de modo que el resto del pipeline no cambia.
+"""
+import logging
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin
+
+from .parser import (Attribute, Class, Ontology, Relation, Source, UNBOUNDED,
+                     ENGINES, LET, _open_source, format_cardinality,
+                     parse_cardinality)
+
+
+logger = logging.getLogger(__name__)
+
+RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+RDFS = "http://www.w3.org/2000/01/rdf-schema#"
+OWL = "http://www.w3.org/2002/07/owl#"
+XSD = "http://www.w3.org/2001/XMLSchema#"
+XML_BASE = "{http://www.w3.org/XML/1998/namespace}base"
+
+# Atributos RDF/XML ya expandidos por el parser XML
+_ABOUT = f"{{{RDF}}}about"
+_ID = f"{{{RDF}}}ID"
+_RESOURCE = f"{{{RDF}}}resource"
+
+_CLASS_TYPES = (OWL + "Class", RDFS + "Class")
+_PROPERTY_KINDS = {
+    OWL + "DatatypeProperty": "data",
+    OWL + "ObjectProperty": "object",
+    OWL + "FunctionalProperty": None,
+    OWL + "InverseFunctionalProperty": "object",
+}
+
+# Tipos XSD -> vocabulario de tipos de la ontología (ver OntologyMapper)
+XSD_TYPES = {
+    "string": "string", "normalizedString": "string", "token": "string",
+    "language": "string", "Name": "string", "NCName": "string",
+    "anyURI": "string",
+    "boolean": "boolean",
+    "int": "integer", "integer": "integer", "long": "integer",
+    "short": "integer", "byte": "integer", "nonNegativeInteger": "integer",
+    "positiveInteger": "integer", "nonPositiveInteger": "integer",
+    "negativeInteger": "integer", "unsignedInt": "integer",
+    "unsignedLong": "integer", "unsignedShort": "integer",
+    "unsignedByte": "integer",
+    "decimal": "float", "float": "float", "double": "float",
+    "dateTime": "datetime", "dateTimeStamp": "datetime",
+    "date": "date", "time": "time",
+    "hexBinary": "blob", "base64Binary": "blob",
+}
+
+# Extensiones de archivo de OWL (ver is_owl_file)
+OWL_SUFFIXES = (".owl", ".rdf", ".owx")
+_COMPRESSED_SUFFIXES = (".gz", ".bz2", ".xz")
+
+# Literales genéricos de RDF que también son tipos de datos
+_LITERAL_TYPES = (RDFS + "Literal", RDF + "PlainLiteral", RDF + "langString")
+
+
+@dataclass
+class _Property:
+    """Propiedad OWL tal como se va declarando a lo largo del documento."""
+    kind: Optional[str] = None  # "data", "object" o None (aún no se sabe)
+    domains: List[str] = field(default_factory=list)
+    ranges: List[str] = field(default_factory=list)
+    functional: bool = False
+    inverse_functional: bool = False
+
+
+@dataclass
+class _Restriction:
+    """Restricción de cardinalidad de una propiedad sobre una clase."""
+    low: int = 0
+    high: int = UNBOUNDED
+    # Clase o tipo de datos de ``onClass``/``someValuesFrom``...
+    target: Optional[str] = None
+
+
+class OWLParser:
+    """
+    Parser de ontologías OWL (RDF/XML y OWL/XML) en streaming.
+    
+    Recorre el documento en una sola pasada y procesa cada nodo de primer
+    nivel (clase, propiedad o axioma) en cuanto se cierra, liberándolo a
+    continuación. Solo se retiene un resumen por entidad (dominios, rangos,
+    restricciones, comentarios), no el árbol XML, y el modelo se construye
+    al final:
+    
+    - ``owl:Class`` -> Class (``rdfs:comment`` como descripción)
+    - Propiedad de datos con dominio o restricción sobre una clase ->
+      Attribute de esa clase, con el tipo XSD traducido (ver XSD_TYPES)
+    - Propiedad de objeto -> Relation de cada dominio a cada rango
+    - ``rdfs:subClassOf`` de una clase con nombre -> Relation ``is_a``
+    - Restricciones de cardinalidad (``min``/``max``/exactas, cualificadas
+      o no, y ``someValuesFrom`` como mínimo 1) y propiedades funcionales
+      -> cardinalidades
+    
+    Las entidades de espacios de nombres distintos con el mismo nombre
+    local se distinguen anteponiendo el prefijo del espacio de nombres
+    (``food_Pizza``, ``menu_Pizza``). Las propiedades sin dominio (o con
+    dominio ``owl:Thing``) y sin restricciones sobre una clase no tienen
+    dónde mapearse: se ignoran con un aviso en el log.
+    
+    Los ``owl:imports`` no se siguen: nunca se accede a la red.
+    """
+    
+    def __init__(self, engine: str = "auto", data_cardinality: str = "0..1"):
+        """
+        Inicializa el parser.
+        
+        Args:
+            engine: Motor XML a usar: "stdlib", "lxml" o "auto" (ver
+                OntologyParser)
+            data_cardinality: Cardinalidad de las propiedades de datos sin
+                restricciones (OWL no la limita; por defecto se toman como
+                atributos opcionales de un solo valor)
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Motor desconocido: {engine!r} "
+                             f"(opciones: {', '.join(ENGINES)})")
+        if engine == "lxml" and LET is None:
+            raise ImportError("Instala lxml: pip install lxml")
+        use_lxml = engine == "lxml" or (engine == "auto" and LET is not None)
+        self.engine = "lxml" if use_lxml else "stdlib"
+        self.data_bounds = parse_cardinality(data_cardinality)
+    
+    def parse(self, source: Source) -> Ontology:
+        """
+        Parsea un documento OWL y retorna un objeto Ontology.
+        
+        Args:
+            source: Ruta al archivo (plano o comprimido) o flujo binario
+        
+        Returns:
+            Objeto Ontology con clases y relaciones
+        """
+        self._reset()
+        with _open_source(source) as stream:
+            if self.engine == "lxml":
+                events = LET.iterparse(stream, events=("start-ns", "start", "end"),
+                                       huge_tree=True)
+            else:
+                events = ET.iterparse(stream, events=("start-ns", "start", "end"))
+            
+            depth = 0
+            root = None
+            handle = None
+            for event, elem in events:
+                if event == "start-ns":
+                    # Prefijos de RDF/XML, para desambiguar nombres locales
+                    prefix, uri = elem
+                    self._prefixes.setdefault(prefix, uri)
+                    continue
+                if event == "start":
+                    if depth == 0:
+                        root = elem
+                        handle = self._start_document(elem)
+                    depth += 1
+                    continue
+                
+                depth -= 1
+                if depth == 1:
+                    handle(elem)
+                    elem.clear()
+                    root.remove(elem)
+        
+        ontology = self._build()
+        # El resumen no se retiene entre parseos
+        self._reset()
+        return ontology
+    
+    def _reset(self):
+        self._base = ""
+        self._prefixes: Dict[str, str] = {}
+        # Clases por IRI, en orden de aparición
+        self._classes: Dict[str, None] = {}
+        self._comments: Dict[str, str] = {}
+        self._properties: Dict[str, _Property] = {}
+        self._subclasses: List[Tuple[str, str]] = []
+        # Propiedades usadas por cada clase (dominio o restricción), en orden
+        self._uses: Dict[str, Dict[str, None]] = {}
+        self._restrictions: Dict[Tuple[str, str], _Restriction] = {}
+        # Nombre de tabla/columna/relación de cada IRI (ver _build)
+        self._names: Dict[str, str] = {}
+    
+    def _start_document(self, root):
+        """Detecta la sintaxis por el elemento raíz y retorna su manejador."""
+        self._base = root.get(XML_BASE) or root.get("ontologyIRI") or ""
+        if root.tag == f"{{{RDF}}}RDF":
+            return self._rdf_node
+        if root.tag == f"{{{OWL}}}Ontology":
+            return self._owlxml_axiom
+        raise ValueError(f"Formato OWL no reconocido (raíz {root.tag!r}); "
+                         f"se espera rdf:RDF u OWL/XML")
+    
+    def _resolve(self, reference: str) -> str:
+        """IRI absoluto de una referencia relativa a ``xml:base``."""
+        if not self._base or "://" in reference or reference.startswith("urn:"):
+            return reference
+        if reference.startswith("#"):
+            return urldefrag(self._base)[0] + reference
+        return urljoin(self._base, reference)
+    
+    def _declare_class(self, iri: str):
+        if iri != OWL + "Thing":
+            self._classes.setdefault(iri, None)
+    
+    def _property(self, iri: str, kind: Optional[str] = None) -> _Property:
+        prop = self._properties.get(iri)
+        if prop is None:
+            prop = self._properties[iri] = _Property()
+        if kind is not None:
+            prop.kind = kind
+        return prop
+    
+    def _use(self, cls: str, prop: str):
+        if cls != OWL + "Thing":
+            self._declare_class(cls)
+            self._uses.setdefault(cls, {})[prop] = None
+    
+    def _restrict(self, cls: str, prop: str, low: int = 0,
+                  high: int = UNBOUNDED, target: Optional[str] = None):
+        """Acumula una restricción: varias se combinan por intersección."""
+        if cls == OWL + "Thing":
+            return
+        self._use(cls, prop)
+        restriction = self._restrictions.setdefault((cls, prop), _Restriction())
+        restriction.low = max(restriction.low, low)
+        restriction.high = min(restriction.high, high)
+        if target is not None:
+            restriction.target = target
+    
+    def _rdf_ref(self, elem) -> Optional[str]:
+        """IRI de ``rdf:resource``, ``rdf:about`` o ``rdf:ID``."""
+        reference = elem.get(_RESOURCE) or elem.get(_ABOUT)
+        if reference is None and elem.get(_ID):
+            reference = "#" + elem.get(_ID)
+        return self._resolve(reference) if reference is not None else None
+    
+    def _rdf_node(self, elem):
+        """Nodo de primer nivel de rdf:RDF (clase, propiedad u otro)."""
+        iri = self._rdf_ref(elem)
+        if iri is None:
+            return
+        
+        types = set()
+        if elem.tag != f"{{{RDF}}}Description":
+            types.add(_tag_iri(elem.tag))
+        for child in elem:
+            if child.tag == f"{{{RDF}}}type" and child.get(_RESOURCE):
+                types.add(self._resolve(child.get(_RESOURCE)))
+        
+        if types.intersection(_CLASS_TYPES):
+            self._rdf_class(iri, elem)
+        elif types.intersection(_PROPERTY_KINDS):
+            self._rdf_property(iri, elem, types)
+    
+    def _rdf_class(self, iri: str, elem):
+        self._declare_class(iri)
+        for child in elem:
+            tag = _tag_iri(child.tag)
+            if tag == RDFS + "subClassOf":
+                parent = self._rdf_ref(child)
+                if parent is not None:
+                    self._subclass(iri, parent)
+                for restriction in child.iter(f"{{{OWL}}}Restriction"):
+                    self._rdf_restriction(iri, restriction)
+            elif tag == RDFS + "comment" and child.text:
+                self._comments.setdefault(iri, child.text.strip())
+    
+    def _rdf_property(self, iri: str, elem, types: set):
+        kind = None
+        for type_iri in types:
+            kind = _PROPERTY_KINDS.get(type_iri) or kind
+        prop = self._property(iri, kind)
+        prop.functional |= OWL + "FunctionalProperty" in types
+        prop.inverse_functional |= OWL + "InverseFunctionalProperty" in types
+        
+        for child in elem:
+            tag = _tag_iri(child.tag)
+            if tag in (RDFS + "domain", RDFS + "range"):
+                targets = self._rdf_class_refs(child)
+                if tag == RDFS + "domain":
+                    prop.domains.extend(targets)
+                    for domain in targets:
+                        self._use(domain, iri)
+                else:
+                    prop.ranges.extend(targets)
+            elif tag == RDFS + "comment" and child.text:
+                self._comments.setdefault(iri, child.text.strip())
+    
+    def _rdf_class_refs(self, elem) -> List[str]:
+        """Clases de un dominio/rango: referencia directa o ``owl:unionOf``."""
+        reference = self._rdf_ref(elem)
+        if reference is not None:
+            return [reference]
+        refs = []
+        for union in elem.iter(f"{{{OWL}}}unionOf"):
+            for member in union:
+                member_ref = self._rdf_ref(member)
+                if member_ref is not None:
+                    refs.append(member_ref)
+        return refs
+    
+    def _rdf_restriction(self, cls: str, node):
+        prop = None
+        low, high = 0, UNBOUNDED
+        target = None
+        for child in node:
+            local = _tag_iri(child.tag)[len(OWL):] if child.tag.startswith(f"{{{OWL}}}") else ""
+            if local == "onProperty":
+                prop = self._rdf_ref(child)
+            elif local in ("cardinality", "qualifiedCardinality"):
+                low = high = int(child.text)
+            elif local in ("minCardinality", "minQualifiedCardinality"):
+                low = int(child.text)
+            elif local in ("maxCardinality", "maxQualifiedCardinality"):
+                high = int(child.text)
+            elif local == "someValuesFrom":
+                low = max(low, 1)
+                target = self._rdf_ref(child)
+            elif local in ("allValuesFrom", "onClass", "onDataRange"):
+                target = self._rdf_ref(child)
+        if prop is not None:
+            self._restrict(cls, prop, low, high, target)
+    
+    def _subclass(self, child: str, parent: str):
+        self._declare_class(child)
+        if parent != OWL + "Thing":
+            self._declare_class(parent)
+            self._subclasses.append((child, parent))
+    
+    def _owl_ref(self, elem) -> Optional[str]:
+        """IRI de una entidad OWL/XML (``IRI`` o ``abbreviatedIRI``)."""
+        iri = elem.get("IRI")
+        if iri is not None:
+            return self._resolve(iri)
+        abbreviated = elem.get("abbreviatedIRI")
+        if abbreviated is None:
+            # <IRI> / <AbbreviatedIRI> como texto (sujeto de anotaciones)
+            if elem.tag == f"{{{OWL}}}IRI" and elem.text:
+                return self._resolve(elem.text.strip())
+            if elem.tag == f"{{{OWL}}}AbbreviatedIRI" and elem.text:
+                abbreviated = elem.text.strip()
+            else:
+                return None
+        prefix, _, local = abbreviated.partition(":")
+        return self._prefixes.get(prefix, prefix + ":") + local
+    
+    def _owlxml_axiom(self, elem):
+        """Axioma de primer nivel de un documento OWL/XML."""
+        if not elem.tag.startswith(f"{{{OWL}}}"):
+            return
+        axiom = elem.tag[len(OWL) + 2:]
+        args = list(elem)
+        
+        if axiom == "Prefix":
+            self._prefixes[elem.get("name", "")] = elem.get("IRI", "")
+        elif axiom == "Declaration" and args:
+            entity = _local(args[0].tag)
+            iri = self._owl_ref(args[0])
+            if entity == "Class":
+                self._declare_class(iri)
+            elif entity == "DataProperty":
+                self._property(iri, "data")
+            elif entity == "ObjectProperty":
+                self._property(iri, "object")
+        elif axiom == "SubClassOf" and len(args) == 2:
+            if _local(args[0].tag) == "Class":
+                self._owlxml_superclass(self._owl_ref(args[0]), args[1])
+        elif axiom in ("DataPropertyDomain", "ObjectPropertyDomain") and len(args) == 2:
+            prop_iri = self._owl_ref(args[0])
+            prop = self._property(prop_iri, "data" if axiom[0] == "D" else "object")
+            for domain in self._owlxml_classes(args[1]):
+                prop.domains.append(domain)
+                self._use(domain, prop_iri)
+        elif axiom in ("DataPropertyRange", "ObjectPropertyRange") and len(args) == 2:
+            prop = self._property(self._owl_ref(args[0]),
+                                  "data" if axiom[0] == "D" else "object")
+            prop.ranges.extend(self._owlxml_classes(args[1]))
+        elif axiom in ("FunctionalDataProperty", "FunctionalObjectProperty") and args:
+            prop = self._property(self._owl_ref(args[0]),
+                                  "data" if "Data" in axiom else "object")
+            prop.functional = True
+        elif axiom == "InverseFunctionalObjectProperty" and args:
+            self._property(self._owl_ref(args[0]), "object").inverse_functional = True
+        elif axiom == "AnnotationAssertion" and len(args) == 3:
+            if (self._owl_ref(args[0]) == RDFS + "comment"
+                    and args[2].text):
+                subject = self._owl_ref(args[1])
+                if subject is not None:
+                    self._comments.setdefault(subject, args[2].text.strip())
+    
+    def _owlxml_classes(self, elem) -> List[str]:
+        """Clases o tipo de datos de una expresión (con ``ObjectUnionOf``)."""
+        if _local(elem.tag) in ("ObjectUnionOf", "DataUnionOf"):
+            return [ref for ref in map(self._owl_ref, elem) if ref is not None]
+        ref = self._owl_ref(elem)
+        return [ref] if ref is not None else []
+    
+    def _owlxml_superclass(self, cls: str, expr):
+        kind = _local(expr.tag)
+        if kind == "Class":
+            self._subclass(cls, self._owl_ref(expr))
+            return
+        if kind == "ObjectIntersectionOf":
+            for member in expr:
+                self._owlxml_superclass(cls, member)
+            return
+        
+        args = list(expr)
+        if not args or not kind.startswith(("Object", "Data")):
+            return
+        is_data = kind.startswith("Data")
+        prop = self._owl_ref(args[0])
+        if prop is None:
+            return
+        self._property(prop, "data" if is_data else "object")
+        target = self._owl_ref(args[1]) if len(args) > 1 else None
+        
+        restriction = kind[4 if is_data else 6:]
+        if restriction.endswith("Cardinality"):
+            count = int(expr.get("cardinality", "0"))
+            if restriction == "ExactCardinality":
+                self._restrict(cls, prop, count, count, target)
+            elif restriction == "MinCardinality":
+                self._restrict(cls, prop, low=count, target=target)
+            elif restriction == "MaxCardinality":
+                self._restrict(cls, prop, high=count, target=target)
+        elif restriction == "SomeValuesFrom":
+            self._restrict(cls, prop, low=1, target=target)
+        elif restriction == "AllValuesFrom":
+            self._restrict(cls, prop, target=target)
+    
+    def _build(self) -> Ontology:
+        """Construye la ontología a partir del resumen acumulado."""
+        self._warn_unused_properties()
+        self._names = _unique_names(self._properties, self._prefixes)
+        
+        # Primero atributos y relaciones: los rangos de las propiedades de
+        # objeto pueden declarar clases que no aparecieron como owl:Class
+        attributes: Dict[str, List[Attribute]] = {}
+        relations = []
+        for cls_iri, props in self._uses.items():
+            for prop_iri in props:
+                prop = self._property(prop_iri)
+                restriction = self._restrictions.get((cls_iri, prop_iri))
+                if self._is_data_property(prop, restriction):
+                    attributes.setdefault(cls_iri, []).append(
+                        self._attribute(prop_iri, prop, restriction))
+                else:
+                    relations.extend(
+                        self._relations(cls_iri, prop_iri, prop, restriction))
+        
+        # Las clases se nombran al final, cuando ya se conocen todas
+        class_names = _unique_names(self._classes, self._prefixes)
+        ontology = Ontology()
+        for iri in self._classes:
+            ontology.classes.append(Class(
+                id=iri,
+                name=class_names[iri],
+                description=self._comments.get(iri),
+                attributes=attributes.get(iri, []),
+            ))
+        
+        for child, parent in self._subclasses:
+            ontology.relations.append(Relation(
+                name="is_a",
+                source=class_names[child],
+                target=class_names[parent],
+            ))
+        for relation in relations:
+            relation.source = class_names[relation.source]
+            relation.target = class_names[relation.target]
+        ontology.relations.extend(relations)
+        return ontology
+    
+    def _warn_unused_properties(self):
+        """Avisa de las propiedades que no se mapean a ninguna clase."""
+        used = set()
+        for props in self._uses.values():
+            used.update(props)
+        for iri, prop in self._properties.items():
+            if iri in used:
+                continue
+            if OWL + "Thing" in prop.domains:
+                reason = "su dominio es owl:Thing"
+            else:
+                reason = "no tiene dominio ni restricciones sobre una clase"
+            logger.warning("Propiedad ignorada: %s (%s)", iri, reason)
+    
+    def _is_data_property(self, prop: _Property,
+                          restriction: Optional[_Restriction]) -> bool:
+        if prop.kind is not None:
+            return prop.kind == "data"
+        ranges = list(prop.ranges)
+        if restriction is not None and restriction.target:
+            ranges.append(restriction.target)
+        return all(map(_is_datatype, ranges))
+    
+    def _bounds(self, prop: _Property, restriction: Optional[_Restriction],
+                default: Tuple[int, int]) -> Tuple[int, int]:
+        low, high = default if restriction is None else (restriction.low,
+                                                         restriction.high)
+        if prop.functional:
+            high = min(high, 1)
+        return min(low, high), high
+    
+    def _attribute(self, prop_iri: str, prop: _Property,
+                   restriction: Optional[_Restriction]) -> Attribute:
+        datatype = restriction.target if restriction and restriction.target else None
+        if datatype is None and prop.ranges:
+            datatype = prop.ranges[0]
+        return Attribute(
+            name=self._names[prop_iri],
+            type=XSD_TYPES.get(_local_name(datatype), "string") if datatype else "string",
+            cardinality=format_cardinality(self._bounds(prop, restriction,
+                                                        self.data_bounds)),
+            description=self._comments.get(prop_iri),
+        )
+    
+    def _relations(self, cls_iri: str, prop_iri: str, prop: _Property,
+                   restriction: Optional[_Restriction]) -> List[Relation]:
+        if restriction is not None and restriction.target:
+            targets = [restriction.target]
+        else:
+            targets = prop.ranges
+        target_cardinality = format_cardinality(
+            self._bounds(prop, restriction, (0, UNBOUNDED)))
+        source_cardinality = "0..1" if prop.inverse_functional else "*"
+        
+        relations = []
+        for target in targets:
+            if target == OWL + "Thing" or _is_datatype(target):
+                continue
+            self._declare_class(target)
+            # Origen y destino son IRIs hasta que _build nombra las clases
+            relations.append(Relation(
+                name=self._names[prop_iri],
+                source=cls_iri,
+                target=target,
+                source_cardinality=source_cardinality,
+                target_cardinality=target_cardinality,
+                description=self._comments.get(prop_iri),
+            ))
+        return relations
+
+
+def is_owl_file(path: str) -> bool:
+    """Verifica por la extensión (ignorando la de compresión) si es OWL."""
+    path = path.lower()
+    for suffix in _COMPRESSED_SUFFIXES:
+        if path.endswith(suffix):
+            path = path[:-len(suffix)]
+            break
+    return path.endswith(OWL_SUFFIXES)
+
+
+def _tag_iri(tag: str) -> str:
+    """``{ns}local`` -> ``nslocal`` (IRI de un elemento con espacio de nombres)."""
+    return tag[1:].replace("}", "", 1) if tag[:1] == "{" else tag
+
+
+def _local(tag: str) -> str:
+    """Nombre local de un tag con espacio de nombres."""
+    return tag.rpartition("}")[2]
+
+
+def _local_name(iri: str) -> str:
+    """Nombre local de un IRI (tras ``#``, ``/`` o ``:``)."""
+    for separator in ("#", "/", ":"):
+        head, sep, tail = iri.rpartition(separator)
+        if sep and tail:
+            return tail
+    return iri
+
+
+def _unique_names(iris, prefixes: Dict[str, str]) -> Dict[str, str]:
+    """
+    Nombre de cada IRI: su nombre local, o ``prefijo_local`` si otro IRI de
+    un espacio de nombres distinto comparte ese nombre local.
+    
+    El prefijo es el declarado para el espacio de nombres en el documento
+    o, si no lo hay, el último segmento del espacio de nombres.
+    
+    Args:
+        iris: IRIs a nombrar, en orden
+        prefixes: Prefijos declarados (prefijo -> espacio de nombres)
+    
+    Returns:
+        Diccionario IRI -> nombre, sin nombres repetidos
+    """
+    by_local: Dict[str, List[str]] = {}
+    for iri in iris:
+        by_local.setdefault(_local_name(iri), []).append(iri)
+    namespaces = {uri: prefix for prefix, uri in prefixes.items() if prefix}
+    
+    names = {}
+    taken = set(by_local)
+    for local, group in by_local.items():
+        if len(group) == 1:
+            names[group[0]] = local
+            continue
+        for iri in group:
+            namespace = iri[:len(iri) - len(local)]
+            prefix = namespaces.get(namespace) or _namespace_label(namespace)
+            name = f"{prefix}_{local}" if prefix else local
+            # Dos espacios de nombres con la misma etiqueta: numerar
+            candidate, n = name, 2
+            while candidate in taken:
+                candidate = f"{name}_{n}"
+                n += 1
+            taken.add(candidate)
+            names[iri] = candidate
+    return names
+
+
+def _namespace_label(namespace: str) -> str:
+    """Último segmento de un espacio de nombres, como identificador."""
+    segment = re.split(r"[/#:]", namespace.rstrip("/#:"))[-1]
+    segment = re.sub(r"\.(owl|rdf|owx|xml)$", "", segment, flags=re.IGNORECASE)
+    return re.sub(r"\W+", "_", segment).strip("_")
+
+
+def _is_datatype(iri: str) -> bool:
+    return iri.startswith(XSD) or iri in _LITERAL_TYPES
@@ -5,40 +5,400 @@ Parser para ontologías en formato XML.
 """
 
 import xml.etree.ElementTree as ET
+import bz2
+import gzip
+import hashlib
+import io
+import logging
+import lzma
+import mmap
+import os
 import textwrap
 import re
+import sys
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
+from operator import methodcaller
 from typing import Optional
 from dataclasses import dataclass, field
-from typing import List
+from types import MappingProxyType
+from typing import BinaryIO, Dict, Iterator, List, Mapping, Tuple, Union
+from xml.parsers import expat
 
+try:
+    from lxml import etree as LET
+except ImportError:  # lxml es opcional: se usa la stdlib como respaldo
+    LET = None
 
-@dataclass
+
+logger = logging.getLogger(__name__)
+
+# Versión del resultado del parser: incrementarla cuando cambie el Ontology
+# producido para un mismo XML (invalida la caché en disco)
+PARSER_VERSION = 2
+
+# Motores de parseo disponibles
+ENGINES = ("auto", "stdlib", "lxml")
+
+# Línea que abre un campo Sphinx (":param x:", ":raises E:", ":Example:"...).
+# Los roles en línea como ":class:`X`" no cuentan: no van seguidos de espacio
+_DOC_FIELD = re.compile(r"\s*:(\w+)(?:\s+([^:]*?))?\s*:(?=\s|$)(.*)")
+
+# Campos que cierran la descripción de la clase
+_CLASS_DESC_END = ("param", "type", "raises")
+
+# Docstrings distintos memorizados (las ontologías generadas repiten los
+# mismos bloques heredados muchas veces)
+_DOCSTRING_CACHE_SIZE = 4096
+
+# Entrada del parser: ruta (XML plano o comprimido) o flujo binario
+Source = Union[str, os.PathLike, BinaryIO]
+
+# Firmas de los formatos comprimidos que se descomprimen al vuelo
+_COMPRESSION_MAGIC = (
+    (b"\x1f\x8b", gzip.open),
+    (b"BZh", bz2.open),
+    (b"\xfd7zXZ\x00", lzma.open),
+)
+
+# Entradas del LRU de las descripciones diferidas (ver DescriptionSource)
+_LAZY_CACHE_SIZE = 256
+
+# Elementos que se convierten en objetos del modelo
+_ITEM_TAGS = ("Class", "Relation")
+
+# Marcado que delimita los elementos Class/Relation al fragmentar. Fuera
+# de comentarios, CDATA e instrucciones de procesamiento un "<" solo puede
+# abrir una etiqueta (no se admite en texto ni en valores de atributos),
+# así que basta con saltar esos tres bloques para reconocer las etiquetas
+# reales. Grupos: 1-2 etiqueta de apertura (tag, "/" si se cierra sola),
+# 3 etiqueta de cierre
+_ELEMENT_MARKUP = re.compile(
+    rb"<!--.*?-->|<!\[CDATA\[.*?\]\]>|<\?.*?\?>"
+    rb"|<(Class|Relation)(?:\s+[^\s=/>]+\s*=\s*(?:\"[^\"]*\"|'[^']*'))*\s*(/?)>"
+    rb"|</(Class|Relation)\s*>",
+    re.DOTALL)
+_XML_ENCODING = re.compile(rb"""<\?xml[^>]*encoding=["']([A-Za-z0-9._-]+)["']""")
+
+# Fragmentos por worker: más fragmentos que workers equilibran la carga
+_SHARDS_PER_WORKER = 4
+
+# Directivas de importación de módulos: <Import href="..."/> y
+# <xi:include href="..."/> (los comentarios se reconocen para saltarlos)
+_IMPORT_DIRECTIVE = re.compile(rb"<!--|<(?:Import|[\w.-]+:include)\s([^>]*)>")
+_HREF = re.compile(rb"""\bhref\s*=\s*["']([^"']*)["']""")
+_TEXT_INCLUDE = re.compile(rb"""\bparse\s*=\s*["']text["']""")
+
+# Bloque de lectura al buscar importaciones (memoria constante)
+_IMPORT_SCAN_CHUNK = 1 << 20
+
+# Hilos que cargan módulos importados (solapan lectura, descompresión y
+# caché; el parseo en paralelo de módulos usa procesos, ver ``workers``)
+_MODULE_THREADS = 8
+
+
+# Cota superior no acotada de una cardinalidad ("n", "m", "*")
+UNBOUNDED = sys.maxsize
+
+_UNBOUNDED_TOKENS = ("n", "m", "*")
+
+
+@lru_cache(maxsize=None)
+def parse_cardinality(text: str) -> Tuple[int, int]:
+    """
+    Convierte una cardinalidad textual en una tupla (mínimo, máximo).
+    
+    Ejemplos: "1" -> (1, 1), "0..1" -> (0, 1), "1..n" -> (1, UNBOUNDED),
+    "*" -> (0, UNBOUNDED). Las tuplas se memorizan, así que todas las
+    cardinalidades iguales comparten el mismo objeto.
+    
+    Una cardinalidad sin formato reconocible ("many", "", "l") se toma
+    como (0, 1), un valor escalar opcional, y se avisa una vez por valor
+    en el log.
+    """
+    parts = text.strip().lower().split("..")
+    bounds = []
+    for part in parts if len(parts) <= 2 else ():
+        part = part.strip()
+        if part in _UNBOUNDED_TOKENS:
+            bounds.append(UNBOUNDED)
+        elif part.isdigit():
+            bounds.append(int(part))
+        else:
+            break
+    if not bounds or len(bounds) != len(parts):
+        logger.warning("Cardinalidad inválida: %r; se usa 0..1", text)
+        return (0, 1)
+    
+    if len(bounds) == 1:
+        # "n"/"*" a secas equivale a "0..*"
+        return (0, UNBOUNDED) if bounds[0] == UNBOUNDED else (bounds[0], bounds[0])
+    low, high = bounds
+    return (0 if low == UNBOUNDED else low, high)
+
+
+def format_cardinality(bounds: Tuple[int, int]) -> str:
+    """
+    Formatea una cardinalidad (mínimo, máximo) para mostrarla.
+    
+    Ejemplos: (1, 1) -> "1", (0, UNBOUNDED) -> "*", (1, UNBOUNDED) -> "1..*"
+    """
+    low, high = bounds
+    if high == UNBOUNDED:
+        return "*" if low == 0 else f"{low}..*"
+    if low == high:
+        return str(low)
+    return f"{low}..{high}"
+
+
+def _intern(value):
+    """Interna cadenas de baja cardinalidad; deja intacto cualquier otro valor."""
+    return sys.intern(value) if value.__class__ is str else value
+
+
+class DescriptionRef:
+    """Posición en bytes del texto de un ``<description>`` en el archivo."""
+    __slots__ = ("source", "start", "end", "docstring")
+    
+    def __init__(self, source: "DescriptionSource", start: int, end: int,
+                 docstring: bool = False):
+        self.source = source
+        self.start = start
+        self.end = end
+        # True si es el docstring Sphinx de una clase (ver _tokenize_docstring)
+        self.docstring = docstring
+    
+    def text(self) -> str:
+        """Texto tal como lo retornaría ``findtext``."""
+        return self.source.read(self.start, self.end)
+
+
+class LazyDescription:
+    """
+    Descripción que se lee del XML original la primera vez que se usa.
+    
+    Se comporta como una cadena de solo lectura (``str()``, ``len``,
+    comparación, formato y métodos de ``str``) pero no guarda el texto:
+    cada acceso lo pide a su DescriptionSource, que solo retiene los
+    últimos textos leídos. Al serializarse con pickle se convierte en una
+    ``str`` normal.
+    
+    No es una ``str``: ``isinstance``, ``json.dumps`` o ``"".join`` la
+    rechazan. El mapper y el visualizador la convierten con
+    ``description_text`` antes de generar código, DDL o HTML.
+    
+    Todas las descripciones que salen de un mismo docstring (la de la clase
+    y los ``:param`` de sus atributos) comparten un único DescriptionRef.
+    """
+    __slots__ = ("_ref", "_param")
+    
+    def __init__(self, ref: DescriptionRef, param: Optional[str] = None):
+        self._ref = ref
+        # Atributo cuyo ``:param`` se busca en el docstring de ``ref``
+        self._param = param
+    
+    @property
+    def data(self) -> str:
+        """Texto de la descripción (se lee del archivo si no está en el LRU)."""
+        ref = self._ref
+        text = ref.text()
+        if not ref.docstring:
+            return _dedent(text)
+        if not text:
+            return ""
+        if self._param is None:
+            return _tokenize_docstring(text)[0]
+        return _param_descriptions(text).get(self._param, "")
+    
+    def __str__(self) -> str:
+        return self.data
+    
+    def __repr__(self) -> str:
+        return repr(self.data)
+    
+    def __format__(self, spec: str) -> str:
+        return format(self.data, spec)
+    
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    def __bool__(self) -> bool:
+        return bool(self.data)
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LazyDescription):
+            other = other.data
+        return self.data == other
+    
+    def __hash__(self) -> int:
+        return hash(self.data)
+    
+    def __contains__(self, item) -> bool:
+        return item in self.data
+    
+    def __getitem__(self, index):
+        return self.data[index]
+    
+    def __iter__(self):
+        return iter(self.data)
+    
+    def __add__(self, other):
+        return self.data + other
+    
+    def __radd__(self, other):
+        return other + self.data
+    
+    def __getattr__(self, name):
+        # Métodos de str (replace, split, strip...): retornan str normales
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.data, name)
+    
+    def __reduce__(self):
+        return (str, (self.data,))
+
+
+def description_text(value) -> Optional[str]:
+    """
+    Convierte una descripción en ``str`` (lee las LazyDescription).
+    
+    Args:
+        value: Descripción de una clase, atributo o relación
+        
+    Returns:
+        El texto como ``str`` normal, o None si no hay descripción
+    """
+    if value is None or value.__class__ is str:
+        return value
+    return str(value)
+
+
+class DescriptionSource:
+    """
+    Lee descripciones de un archivo XML a partir de su rango de bytes.
+    
+    El archivo se mapea en memoria (mmap) en el primer acceso y los textos
+    leídos se guardan en un LRU de ``cache_size`` entradas, de modo que las
+    descripciones que nadie consulta nunca llegan a cargarse.
+    
+    El mapa se libera con ``close()`` (o al salir de un bloque ``with``) y,
+    si no, en cuanto deja de haber LazyDescription que apunten a la fuente:
+    el LRU solo guarda una referencia débil, sin ciclos que esperen al
+    recolector. Una lectura posterior a ``close()`` vuelve a mapearlo.
+    """
+    
+    def __init__(self, path: str, encoding: str = "utf-8",
+                 cache_size: int = _LAZY_CACHE_SIZE):
+        self.path = os.fspath(path)
+        self.encoding = encoding
+        stat = os.stat(self.path)
+        self._signature = (stat.st_size, stat.st_mtime_ns)
+        self._data = None
+        source = weakref.ref(self)
+        self.read = lru_cache(maxsize=cache_size)(
+            lambda start, end: source()._read(start, end))
+    
+    def close(self):
+        """Libera el mapa en memoria del archivo y los textos del LRU."""
+        self.read.cache_clear()
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+    
+    def __enter__(self) -> "DescriptionSource":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _read(self, start: int, end: int) -> str:
+        """Texto de un ``<description>`` (equivale a ``findtext``)."""
+        if self._data is None:
+            stat = os.stat(self.path)
+            if (stat.st_size, stat.st_mtime_ns) != self._signature:
+                raise RuntimeError(f"El archivo {self.path} cambió desde que "
+                                   f"se parseó; vuelve a parsearlo")
+            with open(self.path, "rb") as f:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        raw = self._data[start:end].decode(self.encoding)
+        # Un fragmento XML resuelve entidades y CDATA igual que el parser
+        return ET.fromstring(f"<d>{raw}</d>").text or ""
+
+
+@dataclass(slots=True, frozen=True)
 class Attribute:
-    """Representa un atributo de una clase."""
+    """
+    Representa un atributo de una clase.
+    
+    Es inmutable (y hashable) porque el AttributePool comparte una misma
+    instancia entre clases: para cambiar un atributo hay que sustituirlo
+    con ``dataclasses.replace``.
+    """
     name: str
     type: str
     cardinality: str = "1"
     description: Optional[str] = None
+    # Tipo del ``:type`` del docstring ("datetime.timedelta, optional")
+    declared_type: Optional[str] = None
+    # (mínimo, máximo) parseado una sola vez desde ``cardinality``
+    bounds: Tuple[int, int] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Nombres, tipos y cardinalidades se repiten en millones de
+        # atributos: una sola copia de cada cadena
+        set_field = object.__setattr__
+        set_field(self, "name", _intern(self.name))
+        set_field(self, "type", _intern(self.type))
+        set_field(self, "cardinality", _intern(self.cardinality))
+        set_field(self, "declared_type", _intern(self.declared_type))
+        set_field(self, "bounds", parse_cardinality(self.cardinality))
+    
+    def __eq__(self, other) -> bool:
+        # Las instancias compartidas del pool se comparan por identidad
+        if self is other:
+            return True
+        if other.__class__ is not Attribute:
+            return NotImplemented
+        return (self.name == other.name and self.type == other.type
+                and self.cardinality == other.cardinality
+                and self.description == other.description
+                and self.declared_type == other.declared_type)
     
     def is_required(self) -> bool:
         """Verifica si el atributo es obligatorio."""
-        return self.cardinality in ["1", "1..1", "1..n"]
+        return self.bounds[0] >= 1
     
     def is_multiple(self) -> bool:
         """Verifica si el atributo permite múltiples valores."""
-        return ".." in self.cardinality and self.cardinality.split("..")[-1] in ["n", "*"]
+        return self.bounds[1] > 1
+    
+    def __reduce__(self):
+        # Pickle compacto: se reconstruye con el constructor posicional
+        return (Attribute, (self.name, self.type, self.cardinality,
+                            self.description, self.declared_type))
 
 
-@dataclass
+@dataclass(slots=True)
 class Class:
     """Representa una clase de la ontología."""
     id: str
     name: str
     description: Optional[str] = None
     attributes: List[Attribute] = field(default_factory=list)
+    
+    def __post_init__(self):
+        # El nombre se comparte con el source/target de las relaciones
+        self.id = _intern(self.id)
+        self.name = _intern(self.name)
+    
+    def __reduce__(self):
+        return (Class, (self.id, self.name, self.description, self.attributes))
 
 
-@dataclass
+@dataclass(slots=True)
 class Relation:
     """Representa una relación entre clases."""
     name: str
@@ -49,60 +409,685 @@ class Relation:
     target_cardinality: str = "1"
     description: Optional[str] = None
     properties: List[Attribute] = field(default_factory=list)
+    # (mínimo, máximo) de cada extremo, parseados una sola vez
+    source_bounds: Tuple[int, int] = field(init=False, repr=False, compare=False)
+    target_bounds: Tuple[int, int] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.name = _intern(self.name)
+        self.source = _intern(self.source)
+        self.target = _intern(self.target)
+        self.type = _intern(self.type)
+        self.source_cardinality = _intern(self.source_cardinality)
+        self.target_cardinality = _intern(self.target_cardinality)
+        self.source_bounds = parse_cardinality(self.source_cardinality)
+        self.target_bounds = parse_cardinality(self.target_cardinality)
     
     def is_many_to_many(self) -> bool:
         """Verifica si es una relación muchos a muchos."""
-        source_multiple = ".." in self.source_cardinality and \
-                         self.source_cardinality.split("..")[-1] in ["n", "*"]
-        target_multiple = ".." in self.target_cardinality and \
-                         self.target_cardinality.split("..")[-1] in ["n", "*"]
-        return source_multiple and target_multiple
+        return self.source_bounds[1] > 1 and self.target_bounds[1] > 1
     
     def is_one_to_many(self) -> bool:
         """Verifica si es una relación uno a muchos."""
-        target_multiple = ".." in self.target_cardinality and \
-                         self.target_cardinality.split("..")[-1] in ["n", "*"]
-        source_single = self.source_cardinality in ["1", "0..1", "1..1"]
-        return source_single and target_multiple
+        return self.source_bounds[1] == 1 and self.target_bounds[1] > 1
+    
+    def __reduce__(self):
+        return (Relation, (self.name, self.source, self.target, self.type,
+                           self.source_cardinality, self.target_cardinality,
+                           self.description, self.properties))
+
+
+class AttributePool:
+    """
+    Pool de canonicalización (hash-consing) de atributos.
+    
+    Los atributos con el mismo nombre, tipo, cardinalidad y descripción
+    (``name``, ``event_time``... repetidos en cada subclase) se sustituyen
+    por una única instancia compartida. Attribute es inmutable, así que
+    compartirlas es seguro: para cambiar un atributo de una sola clase se
+    sustituye con ``dataclasses.replace``.
+    
+    Los atributos con LazyDescription no se comparten: calcular su clave
+    obligaría a leer la descripción.
+    """
+    
+    def __init__(self):
+        self._attributes: Dict[tuple, Attribute] = {}
+    
+    def __len__(self) -> int:
+        return len(self._attributes)
+    
+    def intern(self, attr: Attribute) -> Attribute:
+        """Retorna la instancia canónica equivalente a ``attr``."""
+        description = attr.description
+        if description.__class__ is LazyDescription:
+            return attr
+        key = (attr.name, attr.type, attr.cardinality, description,
+               attr.declared_type)
+        return self._attributes.setdefault(key, attr)
+    
+    def intern_ontology(self, ontology: "Ontology"):
+        """Canonicaliza en sitio los atributos y propiedades de una ontología."""
+        intern = self.intern
+        for cls in ontology.classes:
+            cls.attributes = [intern(attr) for attr in cls.attributes]
+        for rel in ontology.relations:
+            rel.properties = [intern(prop) for prop in rel.properties]
+    
+    def clear(self):
+        """Vacía el pool (las ontologías ya parseadas no cambian)."""
+        self._attributes.clear()
+
+
+@dataclass
+class ParseStats:
+    """Estadísticas del último parseo (ver ``OntologyParser.stats``)."""
+    classes: int = 0
+    relations: int = 0
+    # Atributos de clases más propiedades de relaciones
+    attributes: int = 0
+    # Instancias de Attribute distintas entre ``attributes``
+    unique_attributes: int = 0
+    # Archivos cargados (el principal más los módulos importados)
+    modules: int = 1
+    
+    @property
+    def shared_attributes(self) -> int:
+        """Atributos que reutilizan una instancia de otro."""
+        return self.attributes - self.unique_attributes
+    
+    @classmethod
+    def from_ontology(cls, ontology: "Ontology") -> "ParseStats":
+        """Calcula las estadísticas de una ontología."""
+        attributes = [attr for c in ontology.classes for attr in c.attributes]
+        attributes.extend(prop for rel in ontology.relations for prop in rel.properties)
+        return cls(
+            classes=len(ontology.classes),
+            relations=len(ontology.relations),
+            attributes=len(attributes),
+            unique_attributes=len(set(map(id, attributes))),
+        )
+
+
+class _TrackedList(list):
+    """
+    Lista que cuenta sus modificaciones (ver Ontology).
+    
+    ``version`` cambia con cualquier operación que añada, quite, sustituya
+    o reordene elementos, también las que no alteran la longitud.
+    """
+    __slots__ = ("version",)
+    
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.version = 0
+    
+    def __reduce__(self):
+        # Se serializa como una lista normal
+        return (list, (list(self),))
+
+
+def _tracked(name: str):
+    """Método de list que además incrementa ``version``."""
+    method = getattr(list, name)
+    
+    def wrapper(self, *args):
+        self.version += 1
+        return method(self, *args)
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append",
+              "extend", "insert", "pop", "remove", "clear", "sort", "reverse"):
+    setattr(_TrackedList, _name, _tracked(_name))
+del _name
+
+
+@dataclass
+class _OntologyIndex:
+    """Índices de búsqueda de una ontología (ver Ontology)."""
+    signature: tuple
+    classes_by_name: Dict[str, Class] = field(default_factory=dict)
+    classes_by_id: Dict[str, Class] = field(default_factory=dict)
+    outgoing: Dict[str, List[Relation]] = field(default_factory=dict)
+    incoming: Dict[str, List[Relation]] = field(default_factory=dict)
+    related: Dict[str, List[Relation]] = field(default_factory=dict)
+    by_type: Dict[str, List[Relation]] = field(default_factory=dict)
 
 
 @dataclass
 class Ontology:
-    """Representa una ontología completa."""
+    """
+    Representa una ontología completa.
+    
+    Las búsquedas (``get_class``, ``outgoing``, ``incoming``...) usan
+    índices que se construyen la primera vez que se consultan y se
+    reconstruyen solos tras cualquier cambio en las listas ``classes`` y
+    ``relations`` (añadir, quitar, sustituir o reordenar elementos) o si
+    se asignan otras listas, que se copian. Tras modificar en sitio un
+    elemento ya indexado (renombrar una clase, cambiar el source de una
+    relación) hay que llamar a ``invalidate()``.
+    """
     classes: List[Class] = field(default_factory=list)
     relations: List[Relation] = field(default_factory=list)
+    _index: Optional[_OntologyIndex] = field(default=None, init=False,
+                                             repr=False, compare=False)
+    
+    def __setattr__(self, name: str, value):
+        # Las listas indexadas registran sus modificaciones
+        if name in ("classes", "relations") and value.__class__ is not _TrackedList:
+            value = _TrackedList(value)
+        object.__setattr__(self, name, value)
+    
+    def __setstate__(self, state: dict):
+        # pickle/copy restauran el __dict__ sin pasar por __setattr__
+        for name, value in state.items():
+            setattr(self, name, value)
+    
+    def get_class(self, name: str) -> Optional[Class]:
+        """Obtiene una clase por nombre."""
+        return self._get_index().classes_by_name.get(name)
+    
+    def get_class_by_id(self, class_id: str) -> Optional[Class]:
+        """Obtiene una clase por id."""
+        return self._get_index().classes_by_id.get(class_id)
+    
+    def outgoing(self, class_name: str) -> List[Relation]:
+        """Relaciones cuyo origen es la clase."""
+        return self._get_index().outgoing.get(class_name, [])
+    
+    def incoming(self, class_name: str) -> List[Relation]:
+        """Relaciones cuyo destino es la clase."""
+        return self._get_index().incoming.get(class_name, [])
+    
+    def relations_of(self, class_name: str) -> List[Relation]:
+        """Relaciones donde la clase es origen o destino, en orden original."""
+        return self._get_index().related.get(class_name, [])
+    
+    def relations_by_type(self, relation_type: str) -> List[Relation]:
+        """Relaciones de un tipo (association, aggregation...)."""
+        return self._get_index().by_type.get(relation_type, [])
+    
+    def invalidate(self):
+        """Descarta los índices; se reconstruyen en la siguiente consulta."""
+        self._index = None
+    
+    def _get_index(self) -> _OntologyIndex:
+        """Retorna los índices, reconstruyéndolos si están obsoletos."""
+        signature = (id(self.classes), self.classes.version,
+                     id(self.relations), self.relations.version)
+        index = self._index
+        if index is None or index.signature != signature:
+            index = self._build_index(signature)
+            self._index = index
+        return index
+    
+    def _build_index(self, signature: tuple) -> _OntologyIndex:
+        """Construye todos los índices en una pasada por clases y relaciones."""
+        index = _OntologyIndex(signature)
+        for cls in self.classes:
+            index.classes_by_name.setdefault(cls.name, cls)
+            if cls.id:
+                index.classes_by_id.setdefault(cls.id, cls)
+        
+        for rel in self.relations:
+            index.outgoing.setdefault(rel.source, []).append(rel)
+            index.incoming.setdefault(rel.target, []).append(rel)
+            index.related.setdefault(rel.source, []).append(rel)
+            if rel.target != rel.source:
+                index.related.setdefault(rel.target, []).append(rel)
+            index.by_type.setdefault(rel.type, []).append(rel)
+        return index
+
+
+@dataclass
+class Changeset:
+    """
+    Cambios de un parseo incremental respecto al anterior.
+    
+    Cada cambio se identifica con la clave del elemento: ``Class:<nombre>``
+    o ``Relation:<source>-<nombre>-><target>``.
+    """
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    
+    def is_empty(self) -> bool:
+        """Verifica si no hubo cambios."""
+        return not (self.added or self.removed or self.modified)
+
+
+@dataclass
+class ParseSnapshot:
+    """Huella y objeto parseado de cada elemento, por clave de elemento."""
+    entries: Dict[str, Tuple[bytes, Union[Class, Relation]]] = field(default_factory=dict)
+
+
+@dataclass
+class IncrementalResult:
+    """Resultado de ``OntologyParser.parse_incremental``."""
+    ontology: Ontology
+    changes: Changeset
+    snapshot: ParseSnapshot
 
 
 class OntologyParser:
     """Parser de ontologías XML."""
     
-    def parse(self, xml_file: str) -> Ontology:
+    def __init__(self, engine: str = "auto", cache=None,
+                 lazy_descriptions: bool = False, share_attributes: bool = False):
+        """
+        Inicializa el parser.
+        
+        Args:
+            engine: Motor XML a usar: "stdlib" (xml.etree), "lxml" (parser C
+                de lxml con XPath compilado) o "auto" (lxml si está
+                instalado, si no la stdlib)
+            cache: OntologyCache opcional; si se indica, ``parse`` reutiliza
+                el resultado de archivos ya parseados con el mismo contenido
+            lazy_descriptions: Si es True, ``parse`` solo registra la
+                posición en bytes de cada descripción y el texto se lee del
+                archivo al usarse (ver LazyDescription). Requiere un archivo
+                XML sin comprimir que no cambie mientras se usa la ontología;
+                en otro caso se parsea de forma normal. Ignora la caché y los
+                modos streaming y paralelo (ya es una sola pasada con expat)
+            share_attributes: Si es True, los atributos idénticos de
+                distintas clases comparten una instancia (ver AttributePool).
+                El pool se mantiene entre parseos del mismo parser
+        """
+        self.cache = cache
+        self.lazy_descriptions = lazy_descriptions
+        self.pool = AttributePool() if share_attributes else None
+        # Estadísticas del último parse()/parse_incremental()
+        self.stats: Optional[ParseStats] = None
+        if engine not in ENGINES:
+            raise ValueError(f"Motor desconocido: {engine!r} "
+                             f"(opciones: {', '.join(ENGINES)})")
+        if engine == "lxml" and LET is None:
+            raise ImportError("Instala lxml: pip install lxml")
+        
+        if engine == "lxml" or (engine == "auto" and LET is not None):
+            self.engine = "lxml"
+            self._etree = LET
+            self._parse_options = {"huge_tree": True}
+            self._find_classes = LET.XPath(".//Class")
+            self._find_relations = LET.XPath(".//Relation")
+            self._find_attributes = LET.XPath(".//Attribute")
+            self._find_properties = LET.XPath(".//Property")
+        else:
+            self.engine = "stdlib"
+            self._etree = ET
+            self._parse_options = {}
+            self._find_classes = methodcaller("findall", ".//Class")
+            self._find_relations = methodcaller("findall", ".//Relation")
+            self._find_attributes = methodcaller("findall", ".//Attribute")
+            self._find_properties = methodcaller("findall", ".//Property")
+    
+    def parse(self, xml_file: Source, streaming: bool = False,
+              workers: int = 1, follow_imports: bool = True) -> Ontology:
         """
         Parsea un archivo XML y retorna un objeto Ontology.
         
         Args:
-            xml_file: Ruta al archivo XML
+            xml_file: Ruta al archivo XML, que puede estar comprimido con
+                gzip, bz2 o xz, o un flujo binario (por ejemplo
+                ``sys.stdin.buffer``). La descompresión se hace en streaming,
+                sin archivos temporales
+            streaming: Si es True, usa iterparse en una sola pasada y libera
+                cada elemento en cuanto se convierte en objeto (memoria
+                constante respecto al tamaño del archivo)
+            workers: Número de procesos (como mucho uno por núcleo). Con
+                más de uno el documento se divide en rangos de bytes en los
+                límites de ``<Class>`` y ``<Relation>`` que se parsean en
+                paralelo. Si hay módulos importados, cada proceso parsea
+                módulos completos; con un solo worker los módulos se
+                cargan en un pool de hasta 8 hilos
+            follow_imports: Si es True, carga también los módulos indicados
+                con ``<Import href="..."/>`` o ``<xi:include href="..."/>``
+                (rutas relativas al archivo que los importa, de forma
+                recursiva). Cada módulo se parsea y se cachea por separado y
+                la ontología final une sus clases y relaciones, con cada
+                módulo después de los que importa
             
         Returns:
             Objeto Ontology con clases y relaciones
         """
-        tree = ET.parse(xml_file)
+        modules = [xml_file]
+        if follow_imports and _is_path(xml_file):
+            modules = _module_order(xml_file, self.cache)
+        
+        salt = self._cache_salt(follow_imports)
+        if len(modules) == 1:
+            ontology = self._parse_module(xml_file, streaming, workers, salt)
+        else:
+            ontology = Ontology()
+            for part in self._parse_modules(modules, streaming, workers, salt):
+                ontology.classes.extend(part.classes)
+                ontology.relations.extend(part.relations)
+        
+        self.stats = ParseStats.from_ontology(ontology)
+        self.stats.modules = len(modules)
+        return ontology
+    
+    def _cache_salt(self, follow_imports: bool) -> str:
+        """
+        Opciones del parser que forman parte de la clave de caché.
+        
+        Args:
+            follow_imports: Si ``parse`` sigue las importaciones
+            
+        Returns:
+            Texto que se pasa como ``salt`` a ``OntologyCache.key_for``
+        """
+        return (f"lazy={int(self.lazy_descriptions)};"
+                f"shared={int(self.pool is not None)};"
+                f"imports={int(follow_imports)}")
+    
+    def _parse_modules(self, modules: List[str], streaming: bool,
+                       workers: int, salt: str = "") -> List[Ontology]:
+        """
+        Parsea varios módulos, cada uno completo en un solo worker.
+        
+        Con ``workers`` > 1 (y más de un núcleo) los módulos se reparten
+        entre procesos; si no, un pool de hilos solapa su lectura,
+        descompresión y caché. Las descripciones diferidas necesitan el
+        archivo abierto en este proceso y siempre usan hilos.
+        """
+        processes = min(workers, len(modules), os.cpu_count() or 1)
+        if processes > 1 and not self.lazy_descriptions:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                parts = list(executor.map(
+                    _parse_module_worker, modules,
+                    [self.engine] * len(modules),
+                    [self.cache] * len(modules),
+                    [streaming] * len(modules),
+                    [salt] * len(modules)))
+            if self.pool is not None:
+                # Cada worker tiene su propio pool: se unifican aquí
+                for part in parts:
+                    self.pool.intern_ontology(part)
+            return parts
+        
+        threads = min(len(modules), _MODULE_THREADS)
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            return list(executor.map(
+                lambda module: self._parse_module(module, streaming, 1, salt),
+                modules))
+    
+    def _parse_module(self, xml_file: Source, streaming: bool,
+                      workers: int, salt: str = "") -> Ontology:
+        """Parsea un único archivo, sin seguir sus importaciones."""
+        ontology = self._parse_lazy(xml_file) if self.lazy_descriptions else None
+        if ontology is None:
+            ontology = self._parse_cached(xml_file, streaming, workers, salt)
+        return ontology
+    
+    def _parse_cached(self, xml_file: Source, streaming: bool,
+                      workers: int, salt: str = "") -> Ontology:
+        """
+        Parsea reutilizando la caché en disco si está configurada.
+        
+        ``salt`` (ver ``_cache_salt``) separa en la caché los resultados de
+        parsers con opciones distintas.
+        """
+        if self.cache is None or not _is_path(xml_file):
+            return self._parse_file(xml_file, streaming, workers)
+        
+        key = self.cache.key_for(xml_file, salt)
+        ontology = self.cache.get(key)
+        if ontology is None:
+            ontology = self._parse_file(xml_file, streaming, workers)
+            self.cache.put(key, ontology)
+        elif self.pool is not None:
+            self.pool.intern_ontology(ontology)
+        return ontology
+    
+    def _parse_file(self, xml_file: Source, streaming: bool,
+                    workers: int) -> Ontology:
+        """Parsea el archivo sin pasar por la caché."""
+        if workers > 1 and _is_path(xml_file):
+            ontology = self._parse_parallel(xml_file, workers)
+            if ontology is not None:
+                return ontology
+        
+        if streaming:
+            ontology = Ontology()
+            for item in self.iterparse(xml_file):
+                if isinstance(item, Class):
+                    ontology.classes.append(item)
+                else:
+                    ontology.relations.append(item)
+            return ontology
+        
+        with _open_source(xml_file) as stream:
+            tree = self._etree.parse(stream, self._make_parser())
         root = tree.getroot()
         
         ontology = Ontology()
         
         # Parsear clases
-        for class_elem in root.findall(".//Class"):
+        for class_elem in self._find_classes(root):
             cls = self._parse_class(class_elem)
             ontology.classes.append(cls)
         
         # Parsear relaciones
-        for rel_elem in root.findall(".//Relation"):
+        for rel_elem in self._find_relations(root):
             rel = self._parse_relation(rel_elem)
             ontology.relations.append(rel)
         
         return ontology
     
+    def iterparse(self, xml_file: Source) -> Iterator[Union[Class, Relation]]:
+        """
+        Recorre el XML en streaming y genera clases y relaciones en orden
+        de documento.
+        
+        Cada elemento ``Class``/``Relation`` se libera (y se desengancha de
+        su padre) en cuanto se convierte en objeto, de modo que nunca se
+        mantiene el árbol completo en memoria.
+        
+        Args:
+            xml_file: Ruta al archivo XML (plano o comprimido) o flujo binario
+            
+        Yields:
+            Objetos Class y Relation
+        """
+        for elem in self._iter_elements(xml_file):
+            if elem.tag == "Class":
+                yield self._parse_class(elem)
+            else:
+                yield self._parse_relation(elem)
+    
+    def parse_incremental(self, xml_file: Source,
+                          previous: Optional[ParseSnapshot] = None) -> IncrementalResult:
+        """
+        Parsea reutilizando los objetos de los elementos que no cambiaron.
+        
+        Cada elemento Class/Relation se identifica por una huella de su
+        serialización canónica. Si coincide con la de ``previous`` se
+        reutiliza el objeto ya parseado en lugar de volver a parsearlo.
+        
+        Args:
+            xml_file: Ruta al archivo XML (plano o comprimido) o flujo binario
+            previous: Snapshot del parseo anterior (None = primer parseo)
+            
+        Returns:
+            IncrementalResult con la ontología, los cambios y el snapshot
+            a pasar en la siguiente llamada
+        """
+        previous_entries = previous.entries if previous else {}
+        ontology = Ontology()
+        changes = Changeset()
+        snapshot = ParseSnapshot()
+        occurrences = {}
+        
+        for elem in self._iter_elements(xml_file):
+            key = _element_key(elem)
+            count = occurrences.get(key, 0) + 1
+            occurrences[key] = count
+            if count > 1:
+                key = f"{key}#{count}"
+            
+            fingerprint = _element_fingerprint(elem)
+            old = previous_entries.get(key)
+            if old is not None and old[0] == fingerprint:
+                item = old[1]
+            else:
+                if elem.tag == "Class":
+                    item = self._parse_class(elem)
+                else:
+                    item = self._parse_relation(elem)
+                if old is None:
+                    changes.added.append(key)
+                else:
+                    changes.modified.append(key)
+            
+            snapshot.entries[key] = (fingerprint, item)
+            if elem.tag == "Class":
+                ontology.classes.append(item)
+            else:
+                ontology.relations.append(item)
+        
+        changes.removed = [key for key in previous_entries
+                           if key not in snapshot.entries]
+        self.stats = ParseStats.from_ontology(ontology)
+        return IncrementalResult(ontology, changes, snapshot)
+    
+    def _iter_elements(self, xml_file: Source) -> Iterator[ET.Element]:
+        """
+        Genera los elementos Class/Relation en orden de documento.
+        
+        Cada elemento se libera cuando el consumidor pide el siguiente.
+        """
+        with _open_source(xml_file) as stream:
+            if self.engine == "lxml":
+                yield from self._iter_elements_lxml(stream)
+            else:
+                yield from self._iter_elements_stdlib(stream)
+    
+    def _iter_elements_stdlib(self, stream: BinaryIO):
+        """Variante para xml.etree: desengancha cada elemento de su padre."""
+        # Pila de elementos abiertos para poder desenganchar cada elemento
+        # procesado de su padre
+        stack = []
+        # Número de Class/Relation abiertos: los anidados se liberan con su
+        # elemento contenedor, igual que en el modo árbol
+        open_items = 0
+        
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                stack.append(elem)
+                if elem.tag in _ITEM_TAGS:
+                    open_items += 1
+                continue
+            
+            stack.pop()
+            if elem.tag not in _ITEM_TAGS:
+                continue
+            
+            open_items -= 1
+            yield elem
+            if open_items == 0:
+                elem.clear()
+                if stack:
+                    stack[-1].remove(elem)
+    
+    def _iter_elements_lxml(self, stream: BinaryIO):
+        """Variante para lxml: filtra por tag en C y usa getparent."""
+        events = LET.iterparse(stream, events=("end",), tag=_ITEM_TAGS,
+                               **self._parse_options)
+        for _, elem in events:
+            yield elem
+            if not any(anc.tag in _ITEM_TAGS for anc in elem.iterancestors()):
+                parent = elem.getparent()
+                elem.clear()
+                if parent is not None:
+                    parent.remove(elem)
+    
+    def _parse_parallel(self, xml_file: str, workers: int) -> Optional[Ontology]:
+        """
+        Parsea el documento repartiendo sus elementos entre procesos.
+        
+        Retorna None si el documento no se puede fragmentar de forma segura
+        (comprimido, DTD/entidades, espacios de nombres, elementos anidados
+        o demasiado pocos elementos) o si la máquina no tiene más de un
+        núcleo, en cuyo caso se usa el parseo secuencial.
+        """
+        # Más procesos que núcleos solo añade arranque y serialización
+        workers = min(workers, os.cpu_count() or 1)
+        if workers < 2:
+            return None
+        
+        with open(xml_file, "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            header = data[:4096]
+            if b"<!DOCTYPE" in header or b"<!ENTITY" in header:
+                return None
+            if any(header.startswith(magic) for magic, _ in _COMPRESSION_MAGIC):
+                return None
+            # Los fragmentos no heredan las declaraciones de espacios de
+            # nombres de sus ancestros
+            if data.find(b"xmlns") >= 0:
+                return None
+            ranges = _scan_element_ranges(data)
+        
+        if ranges is None or len(ranges) < workers * 2:
+            return None
+        
+        match = _XML_ENCODING.search(header)
+        encoding = match.group(1).decode("ascii") if match else "utf-8"
+        
+        ontology = Ontology()
+        shards = _split_ranges(ranges, workers * _SHARDS_PER_WORKER)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                _parse_shard,
+                [xml_file] * len(shards),
+                shards,
+                [encoding] * len(shards),
+                [self.engine] * len(shards),
+            )
+            # map() conserva el orden de los fragmentos: orden de documento
+            for classes, relations in results:
+                ontology.classes.extend(classes)
+                ontology.relations.extend(relations)
+        if self.pool is not None:
+            # Cada worker tiene su propio pool: se unifican aquí
+            self.pool.intern_ontology(ontology)
+        return ontology
+    
+    def _parse_lazy(self, xml_file: Source) -> Optional[Ontology]:
+        """
+        Parsea con expat registrando los rangos de bytes de las descripciones.
+        
+        Retorna None si la entrada no admite lectura diferida (flujo,
+        archivo comprimido, UTF-16 o DTD con entidades), en cuyo caso se
+        usa el parseo normal.
+        """
+        if not _is_path(xml_file):
+            return None
+        with open(xml_file, "rb") as f:
+            header = f.read(4096)
+            if (any(header.startswith(magic) for magic, _ in _COMPRESSION_MAGIC)
+                    or header[:2] in (b"\xff\xfe", b"\xfe\xff")
+                    or b"<!DOCTYPE" in header or b"<!ENTITY" in header):
+                return None
+            match = _XML_ENCODING.search(header)
+            encoding = match.group(1).decode("ascii") if match else "utf-8"
+            
+            builder = _LazyBuilder(DescriptionSource(xml_file, encoding), self.pool)
+            f.seek(0)
+            builder.parser.ParseFile(f)
+        # Los handlers de expat forman un ciclo con el builder, que retiene
+        # la fuente: se rompe para que esta se libere sin el recolector
+        builder.parser = None
+        return builder.ontology
+    
+    def _make_parser(self):
+        """Crea el parser XML del motor seleccionado."""
+        return self._etree.XMLParser(**self._parse_options)
+    
     def _clean_description(self, text: Optional[str]) -> Optional[str]:
         """
         Limpia la descripción preservando saltos de línea y
@@ -115,61 +1100,47 @@ class OntologyParser:
     def _parse_docstring_description(self, text: Optional[str]):
         """
         Separa descripción de clase y atributos a partir de docstring Sphinx.
-
+        
         Retorna:
             class_description: str
             attr_descriptions: dict(nombre_atributo -> descripción)
+            attr_types: dict(nombre_atributo -> tipo ``:type``)
         """
         if not text:
-            return "", {}
-
-        text = textwrap.dedent(text).strip()
-
-        # Extraer descripciones de atributos
-        attr_pattern = re.compile(
-            r":param\s+(\w+)\s*:\s*(.+?)(?=\n\s*:param|\n\s*:type|\Z)",
-            re.DOTALL
-        )
-        attr_descriptions = {
-            name: desc.strip().replace("\n", " ")
-            for name, desc in attr_pattern.findall(text)
-        }
-
-        # Descripción de clase = todo antes del primer :param
-        class_desc = text.split(":param")[0]
-        # Limpiar encabezados de docstring que no sean útiles
-       
-        class_desc = class_desc.strip()
-
-        # Tomar solo la frase relevante si hay varias
-        #if "." in class_desc:
-         #   sentences = [s.strip() for s in class_desc.split(".") if s.strip()]
-          #  if sentences:
-           #     class_desc = sentences[0]
-
-        return class_desc, attr_descriptions
+            return "", {}, {}
+        
+        class_desc, params, types = _tokenize_docstring(text)
+        return class_desc, dict(params), dict(types)
     
     def _parse_class(self, elem: ET.Element) -> Class:
-        raw_description = self._clean_description(elem.findtext("description"))
-        class_desc, attr_descs = self._parse_docstring_description(raw_description)
-
+        """Parsea un elemento Class."""
+        class_desc, attr_descs, attr_types = self._parse_docstring_description(
+            elem.findtext("description")
+        )
+        
         cls = Class(
             id=elem.get("id", ""),
             name=elem.get("name", ""),
             description=class_desc
         )
-
+        
         # Parsear atributos
-        for attr_elem in elem.findall(".//Attribute"):
+        for attr_elem in self._find_attributes(elem):
             name = attr_elem.get("name", "")
+            description = attr_descs.get(name)
+            if description is None:
+                description = self._clean_description(attr_elem.findtext("description"))
             attr = Attribute(
                 name=name,
                 type=attr_elem.get("type", "string"),
                 cardinality=attr_elem.get("cardinality", attr_elem.get("multiplicity", "1")),
-                description=attr_descs.get(name, self._clean_description(attr_elem.findtext("description")))
+                description=description,
+                declared_type=attr_types.get(name)
             )
+            if self.pool is not None:
+                attr = self.pool.intern(attr)
             cls.attributes.append(attr)
-
+        
         return cls
     
     def _parse_relation(self, elem: ET.Element) -> Relation:
@@ -187,7 +1158,7 @@ class OntologyParser:
         )
         
         # Parsear propiedades de la relación
-        for prop_elem in elem.findall(".//Property"):
+        for prop_elem in self._find_properties(elem):
             prop = Attribute(
                 name=prop_elem.get("name", ""),
                 type=prop_elem.get("type", "string"),
@@ -196,6 +1167,494 @@ class OntologyParser:
                     prop_elem.findtext("description")
                 )
             )
+            if self.pool is not None:
+                prop = self.pool.intern(prop)
             rel.properties.append(prop)
         
-        return rel
\ No newline at end of file
+        return rel
+
+
+def _is_path(source: Source) -> bool:
+    """Verifica si la entrada es una ruta (y no un flujo)."""
+    return isinstance(source, (str, os.PathLike))
+
+
+@contextmanager
+def _open_source(source: Source) -> Iterator[BinaryIO]:
+    """
+    Abre la entrada del parser como flujo binario.
+    
+    Los formatos gzip, bz2 y xz se detectan por su firma y se descomprimen
+    al vuelo. Los flujos recibidos no se cierran al terminar.
+    """
+    with ExitStack() as stack:
+        if _is_path(source):
+            stream = stack.enter_context(open(source, "rb"))
+        else:
+            stream = source
+            if not hasattr(stream, "peek"):
+                stream = stack.enter_context(io.BufferedReader(_RawReader(stream)))
+        
+        head = stream.peek(8)[:8]
+        for magic, opener in _COMPRESSION_MAGIC:
+            if head.startswith(magic):
+                stream = stack.enter_context(opener(stream))
+                break
+        yield stream
+
+
+class _RawReader(io.RawIOBase):
+    """Adapta cualquier objeto con read() para poder bufferizarlo (peek)."""
+    
+    def __init__(self, stream):
+        self._stream = stream
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _module_order(xml_file: str, cache=None) -> List[str]:
+    """
+    Rutas del archivo y de todos sus módulos importados, cada módulo
+    después de los que importa (recorrido en postorden, sin repetir
+    módulos y tolerando ciclos).
+    
+    Con una OntologyCache las importaciones de cada archivo se recuerdan
+    mientras no cambie, así que no se vuelve a recorrer.
+    """
+    if cache is None:
+        find_imports = _find_imports
+    else:
+        def find_imports(path: str) -> List[str]:
+            return cache.imports_for(path, _find_imports)
+    
+    root = os.path.abspath(xml_file)
+    order = []
+    seen = {root}
+    stack = [(root, iter(find_imports(root)))]
+    while stack:
+        path, pending = stack[-1]
+        for module in pending:
+            if module not in seen:
+                seen.add(module)
+                stack.append((module, iter(find_imports(module))))
+                break
+        else:
+            stack.pop()
+            order.append(path)
+    return order
+
+
+def _find_imports(path: str) -> List[str]:
+    """
+    Rutas absolutas de los módulos que importa un archivo.
+    
+    El archivo (descomprimido al vuelo) se recorre por bloques: solo se
+    retiene el final de cada bloque si corta una etiqueta.
+    """
+    base = os.path.dirname(path)
+    modules = []
+    pending = b""
+    in_comment = False
+    with _open_source(path) as stream:
+        for chunk in iter(lambda: stream.read(_IMPORT_SCAN_CHUNK), b""):
+            data = pending + chunk
+            pos = 0
+            while True:
+                if in_comment:
+                    end = data.find(b"-->", pos)
+                    if end < 0:
+                        # "--" del cierre puede quedar al final del bloque
+                        pos = max(pos, len(data) - 2)
+                        break
+                    in_comment = False
+                    pos = end + 3
+                    continue
+                match = _IMPORT_DIRECTIVE.search(data, pos)
+                if match is None:
+                    # Etiqueta o comentario cortado por el final del bloque
+                    cut = data.rfind(b"<", pos)
+                    pos = cut if cut >= 0 and data.find(b">", cut) < 0 else len(data)
+                    break
+                pos = match.end()
+                if match.group(1) is None:
+                    in_comment = True
+                    continue
+                module = _import_href(match.group(1), base, path)
+                if module is not None:
+                    modules.append(module)
+            pending = data[pos:]
+    return modules
+
+
+def _import_href(attrs: bytes, base: str, path: str) -> Optional[str]:
+    """Ruta absoluta del módulo de una directiva (None si no importa XML)."""
+    if _TEXT_INCLUDE.search(attrs):
+        return None
+    href = _HREF.search(attrs)
+    if href is None:
+        return None
+    href = href.group(1).decode("utf-8")
+    if "://" in href:
+        raise ValueError(f"Solo se admiten módulos locales: {href} (en {path})")
+    module = os.path.abspath(os.path.join(base, href))
+    if not os.path.exists(module):
+        raise FileNotFoundError(f"Módulo importado no encontrado: {href} "
+                                f"(en {path})")
+    return module
+
+
+def _dedent(text: Optional[str]) -> str:
+    """Limpia una descripción igual que ``_clean_description`` ("" si vacía)."""
+    return textwrap.dedent(text).strip() if text else ""
+
+
+class _LazyFrame:
+    """Elemento abierto durante el parseo diferido (ver _LazyBuilder)."""
+    __slots__ = ("tag", "item", "attrs", "span", "children", "params", "types")
+    
+    def __init__(self, tag: str, item=None, attrs=None):
+        self.tag = tag
+        self.item = item
+        self.attrs = attrs
+        # DescriptionRef del primer <description> hijo (None si no tiene texto)
+        self.span = None
+        # Atributos/propiedades pendientes: (atributos XML, ref propio)
+        self.children = []
+        # Atributos con ``:param`` y tipos ``:type`` del docstring de la clase
+        self.params = frozenset()
+        self.types = {}
+
+
+class _LazyBuilder:
+    """
+    Construye la ontología desde eventos expat sin retener descripciones.
+    
+    Reproduce el resultado del modo árbol (``.//Class``, ``.//Attribute``,
+    ``findtext("description")``...) pero cada descripción se sustituye por
+    una LazyDescription con la posición de su texto en el archivo. Los
+    docstrings de las clases se tokenizan al pasar para obtener los tipos
+    ``:type``, que son cortos y se guardan como cadenas normales.
+    """
+    
+    def __init__(self, source: DescriptionSource,
+                 pool: Optional[AttributePool] = None):
+        self.source = source
+        self.pool = pool
+        self.ontology = Ontology()
+        self.parser = expat.ParserCreate()
+        self.parser.StartElementHandler = self._start
+        self.parser.EndElementHandler = self._end
+        self.parser.CharacterDataHandler = self._text
+        self.parser.CommentHandler = self._mark
+        self.parser.StartCdataSectionHandler = self._mark
+        self.parser.ProcessingInstructionHandler = self._mark
+        # Un frame por elemento abierto (None si no interesa)
+        self._frames = []
+        self._open_classes = []
+        self._open_relations = []
+        # Frame dueño del <description> en curso y dónde empieza su texto
+        self._owner = None
+        self._start_index = None
+        # Texto del <description> en curso (el de ``findtext``: hasta el
+        # primer elemento hijo). Solo se guarda el de los docstrings de clase
+        self._chunks = None
+        self._in_text = False
+        self._has_text = False
+    
+    def _mark(self, *args):
+        """Primer evento dentro de un <description>: ahí empieza su texto."""
+        if self._owner is not None and self._start_index is None:
+            self._start_index = self.parser.CurrentByteIndex
+    
+    def _text(self, data: str):
+        self._mark()
+        if self._owner is not None and self._in_text:
+            self._has_text = True
+            if self._chunks is not None:
+                self._chunks.append(data)
+    
+    def _start(self, tag: str, attrs: dict):
+        self._mark()
+        if self._owner is not None:
+            # El texto que sigue a un hijo ya no es el de ``findtext``
+            self._in_text = False
+        frame = None
+        if tag == "Class":
+            cls = Class(id=attrs.get("id", ""), name=attrs.get("name", ""),
+                        description="")
+            self.ontology.classes.append(cls)
+            frame = _LazyFrame(tag, cls)
+            self._open_classes.append(frame)
+        elif tag == "Relation":
+            rel = Relation(
+                name=attrs.get("name", ""),
+                source=attrs.get("source", ""),
+                target=attrs.get("target", ""),
+                type=attrs.get("type", "association"),
+                source_cardinality=attrs.get("source_cardinality", "1"),
+                target_cardinality=attrs.get("target_cardinality", "1"),
+            )
+            self.ontology.relations.append(rel)
+            frame = _LazyFrame(tag, rel)
+            self._open_relations.append(frame)
+        elif tag == "Attribute" and self._open_classes:
+            frame = _LazyFrame(tag, attrs=attrs)
+        elif tag == "Property" and self._open_relations:
+            frame = _LazyFrame(tag, attrs=attrs)
+        elif tag == "description" and self._owner is None:
+            parent = self._frames[-1] if self._frames else None
+            if parent is not None and parent.span is None:
+                self._owner = parent
+                self._start_index = None
+                self._in_text = True
+                self._has_text = False
+                self._chunks = [] if parent.tag == "Class" else None
+                frame = _LazyFrame(tag)
+        self._frames.append(frame)
+    
+    def _end(self, tag: str):
+        self._mark()
+        frame = self._frames.pop()
+        if frame is None:
+            return
+        
+        if frame.tag == "description":
+            owner = self._owner
+            end = self.parser.CurrentByteIndex
+            start = end if self._start_index is None else self._start_index
+            if self._has_text:
+                owner.span = DescriptionRef(self.source, start, end,
+                                            docstring=owner.tag == "Class")
+            if self._chunks:
+                _, params, types = _tokenize_docstring.__wrapped__("".join(self._chunks))
+                owner.params = frozenset(name for name, _ in params)
+                owner.types = dict(types)
+            self._owner = None
+            self._chunks = None
+        elif frame.tag == "Attribute":
+            for owner in self._open_classes:
+                owner.children.append((frame.attrs, frame.span))
+        elif frame.tag == "Property":
+            for owner in self._open_relations:
+                owner.children.append((frame.attrs, frame.span))
+        elif frame.tag == "Class":
+            self._open_classes.pop()
+            self._finish_class(frame)
+        else:
+            self._open_relations.pop()
+            self._finish_relation(frame)
+    
+    def _finish_class(self, frame: _LazyFrame):
+        """Crea los atributos de la clase una vez conocido su docstring."""
+        cls = frame.item
+        ref = frame.span
+        if ref is not None:
+            cls.description = LazyDescription(ref)
+        for attrs, own in frame.children:
+            name = _intern(attrs.get("name", ""))
+            if name in frame.params:
+                description = LazyDescription(ref, name)
+            else:
+                description = _lazy(own)
+            cls.attributes.append(self._share(Attribute(
+                name=name,
+                type=attrs.get("type", "string"),
+                cardinality=attrs.get("cardinality", attrs.get("multiplicity", "1")),
+                description=description,
+                declared_type=frame.types.get(name),
+            )))
+    
+    def _finish_relation(self, frame: _LazyFrame):
+        rel = frame.item
+        rel.description = _lazy(frame.span)
+        for attrs, own in frame.children:
+            rel.properties.append(self._share(Attribute(
+                name=attrs.get("name", ""),
+                type=attrs.get("type", "string"),
+                cardinality=attrs.get("cardinality", "1"),
+                description=_lazy(own),
+            )))
+    
+    def _share(self, attr: Attribute) -> Attribute:
+        return self.pool.intern(attr) if self.pool is not None else attr
+
+
+def _lazy(ref: Optional[DescriptionRef]) -> Optional[LazyDescription]:
+    """LazyDescription de un ``<description>`` propio (None si no hay texto)."""
+    return LazyDescription(ref) if ref is not None else None
+
+
+@lru_cache(maxsize=_LAZY_CACHE_SIZE)
+def _param_descriptions(text: str) -> Mapping[str, str]:
+    """
+    Descripciones ``:param`` de un docstring, por nombre de atributo.
+    
+    El resultado se memoriza y lo comparten todas las llamadas: es de solo
+    lectura.
+    """
+    return MappingProxyType(dict(_tokenize_docstring(text)[1]))
+
+
+def _element_key(elem) -> str:
+    """Clave estable de un elemento Class/Relation entre parseos."""
+    if elem.tag == "Class":
+        return f"Class:{elem.get('name', '')}"
+    return (f"Relation:{elem.get('source', '')}-{elem.get('name', '')}"
+            f"->{elem.get('target', '')}")
+
+
+def _element_fingerprint(elem) -> bytes:
+    """
+    Huella de un elemento: hash de su serialización canónica.
+    
+    La serialización incluye tags, atributos ordenados, texto y anidamiento,
+    así que no depende del orden de los atributos, de las comillas ni de
+    cómo se escribieron las entidades en el archivo.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    _feed_canonical(elem, digest.update)
+    return digest.digest()
+
+
+def _feed_canonical(elem, update):
+    """Vuelca recursivamente la forma canónica de un elemento."""
+    update(b"<")
+    update(elem.tag.encode("utf-8"))
+    for name, value in sorted(elem.items()):
+        update(f"\0{name}={value}".encode("utf-8"))
+    update(b">")
+    if elem.text:
+        update(elem.text.encode("utf-8"))
+    for child in elem:
+        # Comentarios e instrucciones de lxml: solo cuenta su tail
+        if isinstance(child.tag, str):
+            _feed_canonical(child, update)
+        if child.tail:
+            update(child.tail.encode("utf-8"))
+    update(b"</>")
+
+
+@lru_cache(maxsize=_DOCSTRING_CACHE_SIZE)
+def _tokenize_docstring(text: str) -> Tuple[str, tuple, tuple]:
+    """
+    Tokeniza un docstring Sphinx en una sola pasada por líneas.
+    
+    La descripción de la clase llega hasta el primer ``:param``, ``:type``
+    o ``:raises``. A partir de ahí cada línea que abre un campo (incluidos
+    otros como ``:Example:``) cierra el anterior y el resto de líneas
+    continúan el campo abierto. Solo se conservan ``:param`` y ``:type``.
+    
+    Returns:
+        Tupla (descripción de clase, ((atributo, descripción), ...),
+        ((atributo, tipo), ...))
+    """
+    lines = textwrap.dedent(text).strip().split("\n")
+    class_lines = []
+    fields = []
+    current = class_lines
+    for line in lines:
+        match = _DOC_FIELD.match(line) if line.lstrip()[:1] == ":" else None
+        if match and (fields or match.group(1) in _CLASS_DESC_END):
+            kind, arg, rest = match.groups()
+            # ":param str name:" -> el nombre es la última palabra
+            name = arg.split()[-1] if arg else ""
+            current = [rest]
+            fields.append((kind, name, current))
+        else:
+            current.append(line)
+    
+    params = []
+    types = []
+    for kind, name, body in fields:
+        value = " ".join(body).strip()
+        if not name or not value:
+            continue
+        if kind == "param":
+            params.append((name, value))
+        elif kind == "type":
+            types.append((name, value))
+    
+    return "\n".join(class_lines).strip(), tuple(params), tuple(types)
+
+
+def _scan_element_ranges(data) -> Optional[List[Tuple[int, int]]]:
+    """
+    Localiza los rangos de bytes de los elementos Class/Relation.
+    
+    Es un escaneo lineal del marcado, sin construir el árbol: las etiquetas
+    dentro de comentarios, CDATA o instrucciones de procesamiento no
+    cuentan. Retorna None si encuentra elementos anidados o etiquetas
+    desparejadas, que no se pueden fragmentar.
+    """
+    ranges = []
+    start = None
+    tag = None
+    for match in _ELEMENT_MARKUP.finditer(data):
+        opening, self_closing, closing = match.group(1, 2, 3)
+        if opening is not None:
+            if start is not None:
+                return None
+            if self_closing:
+                ranges.append((match.start(), match.end()))
+            else:
+                start, tag = match.start(), opening
+        elif closing is not None:
+            if closing != tag:
+                return None
+            ranges.append((start, match.end()))
+            start = tag = None
+    return ranges if start is None else None
+
+
+def _split_ranges(ranges: List[Tuple[int, int]],
+                  num_shards: int) -> List[List[Tuple[int, int]]]:
+    """Agrupa rangos consecutivos en fragmentos de tamaño similar en bytes."""
+    total = sum(end - start for start, end in ranges)
+    target = max(1, total // num_shards)
+    shards = []
+    current = []
+    size = 0
+    for start, end in ranges:
+        current.append((start, end))
+        size += end - start
+        if size >= target:
+            shards.append(current)
+            current = []
+            size = 0
+    if current:
+        shards.append(current)
+    return shards
+
+
+def _parse_module_worker(xml_file: str, engine: str, cache,
+                         streaming: bool, salt: str) -> Ontology:
+    """Parsea en un proceso worker un módulo importado completo."""
+    parser = OntologyParser(engine=engine, cache=cache)
+    return parser._parse_module(xml_file, streaming, 1, salt)
+
+
+def _parse_shard(xml_file: str, ranges: List[Tuple[int, int]],
+                 encoding: str, engine: str) -> Tuple[List[Class], List[Relation]]:
+    """Parsea en un proceso worker los elementos de un fragmento."""
+    parser = OntologyParser(engine=engine)
+    with open(xml_file, "rb") as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        body = b"".join(data[start:end] for start, end in ranges)
+    
+    document = (f'<?xml version="1.0" encoding="{encoding}"?><Shard>'.encode("ascii")
+                + body + b"</Shard>")
+    root = parser._etree.fromstring(document, parser._make_parser())
+    classes = []
+    relations = []
+    for elem in root:
+        if elem.tag == "Class":
+            classes.append(parser._parse_class(elem))
+        else:
+            relations.append(parser._parse_relation(elem))
+    return classes, relations
@@ -11,7 +11,7 @@ import html
 import os
 import networkx as nx
 from typing import Optional
-from .parser import Ontology
+from .parser import Ontology, description_text, format_cardinality, parse_cardinality
 
 
 class OntologyVisualizer:
@@ -36,7 +36,8 @@ class OntologyVisualizer:
             # Preparamos el HTML que irá DENTRO del panel lateral
             
             # Encabezado y Descripción
-            safe_desc = html.escape(cls.description) if cls.description else "<i>Sin descripción</i>"
+            description = description_text(cls.description)
+            safe_desc = html.escape(description) if description else "<i>Sin descripción</i>"
             
             # Inicio del contenido del panel
             panel_html = f"""
@@ -61,7 +62,8 @@ class OntologyVisualizer:
                 """
                 for attr in cls.attributes:
                     card = attr.cardinality if attr.cardinality != "1..1" else "1"
-                    safe_desc = html.escape(attr.description) if attr.description else "<i>Sin descripción</i>"
+                    description = description_text(attr.description)
+                    safe_desc = html.escape(description) if description else "<i>Sin descripción</i>"
                     panel_html += f"""
                     <tr>
                         <td style='padding: 6px; border: 1px solid #ddd;'><b>{attr.name}</b></td>
@@ -73,17 +75,17 @@ class OntologyVisualizer:
                 panel_html += "</table>"
             else:
                 panel_html += "<div style='padding:10px; color:#999; font-style:italic;'>No attributes</div>"
-
+            
             panel_html += "<strong>Connected Relations:</strong>"
             
             # Filtramos relaciones donde esta clase sea origen o destino
-            related = [r for r in self.ontology.relations if r.source == cls.name or r.target == cls.name]
+            related = self.ontology.relations_of(cls.name)
             
             if related:
                 panel_html += "<table style='border-color: #e0e0e0;'><thead><tr style='background:#f9f9f9;'><th>Source</th><th>Relation</th><th>Target</th></tr></thead><tbody>"
                 for rel in related:
-                    s_card = self._format_cardinality(rel.source_cardinality)
-                    t_card = self._format_cardinality(rel.target_cardinality)
+                    s_card = format_cardinality(rel.source_bounds)
+                    t_card = format_cardinality(rel.target_bounds)
                     
                     # Resaltamos el nombre de la otra clase para que sea fácil de leer
                     source_display = f"<b>{rel.source}</b>" if rel.source == cls.name else rel.source
@@ -99,7 +101,7 @@ class OntologyVisualizer:
                 panel_html += "</tbody></table>"
             else:
                 panel_html += "<p style='color:#999; font-style:italic;'>No connections</p>" 
-
+            
             # Agregamos el nodo.
             # Nota: 'popup_html' es un atributo personalizado que usaremos con JS después.
             # Dejamos 'title' vacío o simple para que no moleste el tooltip nativo.
@@ -115,8 +117,8 @@ class OntologyVisualizer:
         
         # --- 2. PROCESAR RELACIONES (ARISTAS) ---
         for rel in self.ontology.relations:
-            source_card = self._format_cardinality(rel.source_cardinality)
-            target_card = self._format_cardinality(rel.target_cardinality)
+            source_card = format_cardinality(rel.source_bounds)
+            target_card = format_cardinality(rel.target_bounds)
             label = f"[{source_card}]  {rel.name}  [{target_card}]"
             
             # HTML para el panel si se hace clic en la relación
@@ -125,9 +127,10 @@ class OntologyVisualizer:
             <p><b>Tipo:</b> {rel.type}</p>
             <p>{rel.source} ⟶ {rel.target}</p>
             """
-            if rel.description:
-                rel_html += f"<p><i>{rel.description}</i></p>"
-
+            description = description_text(rel.description)
+            if description:
+                rel_html += f"<p><i>{description}</i></p>"
+            
             edge_color = self._get_edge_color(rel.type)
             
             self.graph.add_edge(
@@ -151,24 +154,7 @@ class OntologyVisualizer:
         Returns:
             Cardinalidad formateada (ej: "0..*", "1", "1")
         """
-        # Normalizar la cardinalidad
-        cardinality = cardinality.strip()
-        
-        # Reemplazar 'n' por '*' para consistencia
-        if cardinality.endswith('n'):
-            cardinality = cardinality[:-1] + '*'
-        
-        # Casos especiales
-        if cardinality == "1..1":
-            return "1"
-        elif cardinality == "*":
-            return "*"
-        elif cardinality == "0..*":
-            return "*"
-        elif cardinality == "1..*":
-            return "1..*"
-        
-        return cardinality
+        return format_cardinality(parse_cardinality(cardinality))
     
     def _get_edge_color(self, relation_type: str) -> str:
         """
@@ -280,7 +266,7 @@ class OntologyVisualizer:
         print(f"  • Abre el archivo en tu navegador")
         print(f"  • Pasa el mouse sobre nodos para ver atributos")
         print(f"  • Pasa el mouse sobre relaciones para ver detalles")
-
+    
     def _inject_custom_js(self, file_path: str):
         """Inyecta CSS y JS robusto para detectar la red y abrir el panel."""
         # 1. Calculamos los totales desde el objeto ontology antes de generar el HTML
@@ -297,7 +283,7 @@ class OntologyVisualizer:
                 font-family: sans-serif; border-right: 5px solid #2B7CE9;
             }
             #side-panel.open { left: 0; }
-
+            
             /* Estilo para la Tabla de Estadísticas Superior Derecha */
             #stats-counter {
                 position: fixed; 
@@ -315,14 +301,14 @@ class OntologyVisualizer:
             #stats-counter table { border-collapse: collapse; margin-top: 0; }
             #stats-counter td { padding: 2px 8px; font-size: 12px; border: none; }
             .stat-val { font-weight: bold; color: #2B7CE9; text-align: right; }
-
+            
             .close-btn { float: right; cursor: pointer; font-size: 28px; line-height: 20px; }
             table { width: 100%; border-collapse: collapse; margin-top: 15px; }
             th, td { border: 1px solid #ddd; padding: 8px; text-align: left; font-size: 13px; }
             th { background-color: #f8f8f8; }
         </style>
         """
-
+        
         stats_html = f"""
         <div id="stats-counter">
             <table>
@@ -332,14 +318,14 @@ class OntologyVisualizer:
             </table>
         </div>
         """
-
+        
         panel_html = """
         <div id="side-panel">
             <span style="float:right; cursor:pointer; font-size:24px;" onclick="document.getElementById('side-panel').classList.remove('open')">&times;</span>
             <div id="panel-content"></div>
         </div>
         """
-
+        
         custom_js = """
         <script type="text/javascript">
             function initPanelIntegration() {
@@ -352,12 +338,12 @@ class OntologyVisualizer:
                     setTimeout(initPanelIntegration, 500);
                     return;
                 }
-
+                
                 networkInstance.on("dragStart", function (params) {
                 // Desactiva la física mientras arrastras para que el grafo no "baile"
                 networkInstance.setOptions({ physics: { enabled: false } });
                 });
-
+                
                 networkInstance.on("click", function (params) {
                     var panel = document.getElementById('side-panel');
                     var content = document.getElementById('panel-content');
@@ -0,0 +1,64 @@
+"""Fixtures comunes de los tests"""
+from pathlib import Path
+
+import pytest
+
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "examples"
+
+# Ontología pequeña con los casos que cubren los distintos modos de parseo:
+# docstring con :param/:type, descripción propia de atributo, herencia,
+# relación con propiedades y cardinalidades N:M
+SMALL_ONTOLOGY = """<?xml version='1.0' encoding='utf-8'?>
+<Ontology>
+    <Class name="Author">
+        <description>Autor de libros
+
+:param name: Nombre completo
+:type name: string
+:param born: Fecha de nacimiento
+:type born: datetime.date, optional</description>
+        <Attributes>
+            <Attribute name="author_id" type="integer" cardinality="1" primary_key="true" />
+            <Attribute name="name" type="string" cardinality="1" />
+            <Attribute name="born" type="date" cardinality="0..1" />
+        </Attributes>
+    </Class>
+    <Class name="Book">
+        <description>Libro publicado</description>
+        <Attributes>
+            <Attribute name="title" type="string" cardinality="1">
+                <description>Título original</description>
+            </Attribute>
+            <Attribute name="tags" type="string" cardinality="0..*" />
+        </Attributes>
+    </Class>
+    <Class name="Novel">
+        <Attributes>
+            <Attribute name="genre" type="string" cardinality="0..1" />
+        </Attributes>
+    </Class>
+    <Relations>
+        <Relation name="is_a" source="Novel" target="Book" />
+        <Relation name="writes" source="Author" target="Book"
+                  source_cardinality="1..*" target_cardinality="0..*">
+            <description>Autoría</description>
+            <Property name="role" type="string" cardinality="0..1" />
+        </Relation>
+    </Relations>
+</Ontology>
+"""
+
+
+@pytest.fixture
+def example_xml() -> str:
+    """Ruta de la ontología CyberDEM de ejemplo."""
+    return str(EXAMPLES / "CyberDEM_Ontology.xml")
+
+
+@pytest.fixture
+def small_xml(tmp_path) -> str:
+    """Ruta de una copia de SMALL_ONTOLOGY."""
+    path = tmp_path / "small.xml"
+    path.write_text(SMALL_ONTOLOGY, encoding="utf-8")
+    return str(path)
@@ -0,0 +1,47 @@
+"""Tests del CLI"""
+import sys
+
+import pytest
+
+from ontology2db import cli
+
+
+def run_cli(monkeypatch, capsys, *args) -> str:
+    monkeypatch.setattr(sys, "argv", ["ontology2db", *args])
+    cli.main()
+    return capsys.readouterr().out
+
+
+@pytest.mark.parametrize("flags, summary", [
+    ([], False),
+    (["--fold-one-to-one"], True),
+])
+def test_denormalization_summary(example_xml, tmp_path, monkeypatch, capsys, flags, summary):
+    out = run_cli(monkeypatch, capsys, example_xml, "-o", str(tmp_path / "models.py"),
+                  "--no-cache", *flags)
+    assert ("Clusters uno a uno" in out) == summary
+
+
+def test_fold_report(example_xml, tmp_path, monkeypatch, capsys):
+    report = tmp_path / "report.txt"
+    run_cli(monkeypatch, capsys, example_xml, "-o", str(tmp_path / "models.py"),
+            "--no-cache", "--fold-one-to-one", "2", "--denormalization-report", str(report))
+    assert report.read_text(encoding="utf-8").startswith("Clusters uno a uno")
+
+
+def test_ddl_dialect_mysql(example_xml, tmp_path, monkeypatch, capsys):
+    out = run_cli(monkeypatch, capsys, example_xml, "--no-models", "--no-cache",
+                  "--ddl-dir", str(tmp_path), "--ddl-dialect", "mysql")
+    assert "DDL exportado" in out
+    assert len(list(tmp_path.glob("*/schema.sql"))) == 1
+
+
+@pytest.mark.parametrize("flags, indexed", [
+    ([], True),
+    (["--index", "event_time"], True),
+    (["--no-indexes"], False),
+])
+def test_no_indexes(example_xml, tmp_path, monkeypatch, capsys, flags, indexed):
+    models = tmp_path / "models.py"
+    run_cli(monkeypatch, capsys, example_xml, "-o", str(models), "--no-cache", *flags)
+    assert ("Index(" in models.read_text(encoding="utf-8")) == indexed
@@ -0,0 +1,57 @@
+"""Tests de SQLAlchemyGenerator"""
+import ast
+import importlib.util
+import itertools
+
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import configure_mappers
+
+from ontology2db.codegen import SQLAlchemyGenerator
+from ontology2db.mapper import (INHERITANCE_STRATEGIES, KEY_STRATEGIES, IndexPolicy,
+                                InheritancePolicy, OntologyMapper)
+from ontology2db.parser import OntologyParser
+
+
+def load_models(path, name: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def unused_imports(path) -> set:
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    imported = {alias.asname or alias.name for node in tree.body
+                if isinstance(node, (ast.Import, ast.ImportFrom)) for alias in node.names}
+    used = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+    return imported - used
+
+
+@pytest.mark.parametrize("key_strategy, inheritance", list(itertools.product(
+    KEY_STRATEGIES, INHERITANCE_STRATEGIES)))
+def test_models_create_on_sqlite(example_xml, tmp_path, key_strategy, inheritance):
+    mapper = OntologyMapper(key_strategy=key_strategy,
+                            inheritance=InheritancePolicy(default=inheritance))
+    schema = mapper.map(OntologyParser().parse(example_xml))
+    path = tmp_path / "models.py"
+    SQLAlchemyGenerator().generate(schema, str(path))
+    
+    # Solo se importa lo que el módulo usa
+    assert not unused_imports(path)
+    models = load_models(path, f"models_{key_strategy}_{inheritance}")
+    configure_mappers()
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine)
+    assert set(inspect(engine).get_table_names()) == {table.name for table in schema.tables}
+
+
+def test_partial_index_imports_text(small_xml, tmp_path):
+    policy = IndexPolicy()
+    policy.add_spec("Author:name:born IS NOT NULL")
+    schema = OntologyMapper(index_policy=policy).map(OntologyParser().parse(small_xml))
+    path = tmp_path / "models.py"
+    SQLAlchemyGenerator().generate(schema, str(path))
+    
+    assert not unused_imports(path)
+    assert "text" in load_models(path, "models_partial").__dict__
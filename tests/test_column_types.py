@@ -0,0 +1,128 @@
+"""Tests de TypeResolver"""
+import pytest
+
+from ontology2db.column_types import TypeResolver
+from ontology2db.mapper import OntologyMapper
+from ontology2db.parser import OntologyParser
+
+
+@pytest.mark.parametrize("type_str, declared, expected", [
+    # El tipo del XML manda si no es genérico
+    ("integer", None, "Integer"),
+    ("float", "str", "Float"),
+    ("boolean", None, "Boolean"),
+    ("date", None, "Date"),
+    ("String(64)", None, "String(64)"),
+    ("varchar(10)", None, "String(10)"),
+    # Con "string" se usa el :type del docstring
+    ("string", "int", "Integer"),
+    ("string", "float, optional", "Float"),
+    ("string", "bool or None", "Boolean"),
+    ("string", "datetime.date", "Date"),
+    ("string", "datetime.timedelta, optional", "Interval"),
+    ("string", "string(32)", "String(32)"),
+    ("string", "value from the :class:`~cyberdem.enumerations.ReconType`", "SmallInteger"),
+    ("string", "list of strings", "JSON"),
+    ("string", "dict", "JSON"),
+    ("string", "dictionary, optional", "JSON"),
+])
+def test_resolve(type_str, declared, expected):
+    assert TypeResolver().resolve(type_str, declared) == expected
+
+
+@pytest.mark.parametrize("type_str, declared", [
+    ("string", None),
+    ("string", "SomethingUnknown"),
+    ("unknown", None),
+])
+def test_resolve_falls_back_to_string(type_str, declared):
+    assert TypeResolver().resolve(type_str, declared) == "String"
+
+
+def test_string_lengths_and_enum_type():
+    resolver = TypeResolver(string_lengths={"code": 8}, enum_type="Integer")
+    assert resolver.resolve("string", None, "code") == "String(8)"
+    # La longitud del tipo gana a la configurada
+    assert resolver.resolve("string(4)", None, "code") == "String(4)"
+    assert resolver.resolve("string", None, "other") == "String"
+    assert resolver.resolve("string", "value from the ReconType") == "Integer"
+
+
+@pytest.mark.parametrize("declared, expected", [
+    ("list", True),
+    ("list of strings", True),
+    ("tuple, optional", True),
+    ("set of int or None", True),
+    ("dict", False),
+    ("string", False),
+    ("listing", False),
+    (None, False),
+    ("", False),
+])
+def test_is_list(declared, expected):
+    assert TypeResolver().is_list(declared) is expected
+
+
+@pytest.mark.parametrize("type_str, declared, expected", [
+    ("string", "list of ints", "Integer"),
+    ("string", "list of strings", "String"),
+    ("string", "list of dates, optional", "Date"),
+    ("string", "list of values from the ReconType", "SmallInteger"),
+    ("string", "list of categories", "String"),
+    # Sin tipo de elemento reconocible: el del XML
+    ("float", "list", "Float"),
+    ("integer", "list of Widgets", "Integer"),
+    ("string", None, "String"),
+])
+def test_element_type(type_str, declared, expected):
+    assert TypeResolver().element_type(type_str, declared) == expected
+
+
+def test_declared_types_become_native_columns(tmp_path):
+    path = tmp_path / "typed.xml"
+    path.write_text("""<Ontology><Class name="Sensor">
+        <description>Sensor
+
+:param label: Etiqueta
+:type label: string(40)
+:param count: Lecturas
+:type count: int
+:param ratio: Proporción
+:type ratio: float, optional
+:param active: Activo
+:type active: bool
+:param installed: Instalación
+:type installed: datetime.date
+:param kind: Tipo
+:type kind: value from the :class:`~cyberdem.enumerations.SensorType`
+:param extra: Datos
+:type extra: dict
+:param readings: Valores
+:type readings: list of floats</description>
+        <Attribute name="label" type="string"/>
+        <Attribute name="count" type="string"/>
+        <Attribute name="ratio" type="string"/>
+        <Attribute name="active" type="string"/>
+        <Attribute name="installed" type="string"/>
+        <Attribute name="kind" type="string"/>
+        <Attribute name="extra" type="string"/>
+        <Attribute name="readings" type="string"/>
+        <Attribute name="note" type="string"/>
+    </Class></Ontology>""", encoding="utf-8")
+    
+    schema = OntologyMapper().map(OntologyParser().parse(str(path)))
+    types = {col.name: col.type for col in schema.get_table("Sensor").columns}
+    assert types == {
+        "id": "Integer",
+        "label": "String(40)",
+        "count": "Integer",
+        "ratio": "Float",
+        "active": "Boolean",
+        "installed": "Date",
+        "kind": "SmallInteger",
+        "extra": "JSON",
+        # Lista declarada: multivaluado aunque la cardinalidad sea 1
+        "readings": "JSONB",
+        # Sin :type se queda en String
+        "note": "String",
+    }
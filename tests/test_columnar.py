@@ -0,0 +1,44 @@
+"""Tests de ColumnarOntology"""
+import pytest
+
+from ontology2db.columnar import ColumnarOntology
+from ontology2db.mapper import InheritancePolicy, OntologyMapper
+from ontology2db.parser import OntologyParser
+
+
+@pytest.fixture(params=["small_xml", "example_xml"])
+def ontology(request):
+    return OntologyParser().parse(request.getfixturevalue(request.param))
+
+
+def test_round_trip(ontology):
+    columnar = ColumnarOntology.from_ontology(ontology)
+    assert columnar.num_classes == len(ontology.classes)
+    assert columnar.to_ontology() == ontology
+
+
+def test_streamed_columnar_equals_tree(small_xml):
+    parser = OntologyParser()
+    columnar = ColumnarOntology.from_items(parser.iterparse(small_xml))
+    assert columnar.to_ontology() == parser.parse(small_xml)
+
+
+@pytest.mark.parametrize("inheritance", ["none", "joined", "single"])
+@pytest.mark.parametrize("multivalued", ["json", "child_table", "array"])
+def test_maps_like_objects(ontology, inheritance, multivalued):
+    mapper = OntologyMapper(multivalued=multivalued,
+                            inheritance=InheritancePolicy(default=inheritance))
+    expected = mapper.map(ontology).tables
+    assert mapper.map(ColumnarOntology.from_ontology(ontology)).tables == expected
+
+
+def test_mapper_reads_the_arrays(ontology, monkeypatch):
+    expected = OntologyMapper().map(ontology).tables
+    columnar = ColumnarOntology.from_ontology(ontology)
+    
+    # El mapper no crea vistas de fila: trabaja con códigos y símbolos
+    def no_rows(*args):
+        raise AssertionError("el mapper creó una vista de fila")
+    for name in ("class_row", "relation_row", "_attribute_rows"):
+        monkeypatch.setattr(ColumnarOntology, name, no_rows)
+    assert OntologyMapper().map(columnar).tables == expected
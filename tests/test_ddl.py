@@ -0,0 +1,209 @@
+"""Tests del DDL exportado"""
+import contextlib
+import io
+import re
+import sqlite3
+
+import pytest
+
+from ontology2db.codegen import KEY_STRING_LENGTH, SQLAlchemyGenerator
+from ontology2db.ddl import PartitionPolicy, PartitionSpec, foreign_key_name, plan_ddl
+from ontology2db.mapper import (DISCRIMINATOR, INHERITANCE_STRATEGIES, KEY_STRATEGIES,
+                                Column, IndexPolicy, InheritancePolicy, OntologyMapper,
+                                RelationalSchema, Table)
+from ontology2db.parser import OntologyParser
+
+
+def _table(name, *references):
+    table = Table(name=name, columns=[Column("id", "Integer", nullable=False,
+                                             primary_key=True)])
+    for column, target in references:
+        table.columns.append(Column(column, "Integer", foreign_key=f"{target}.id"))
+    return table
+
+
+@pytest.fixture
+def cyclic_schema() -> RelationalSchema:
+    """D -> A <-> B (ciclo) y C -> C (referencia a sí misma)."""
+    schema = RelationalSchema()
+    schema.add_table(_table("D", ("a_id", "A")))
+    schema.add_table(_table("A", ("b_id", "B")))
+    schema.add_table(_table("B", ("a_id", "A")))
+    schema.add_table(_table("C", ("parent_id", "C")))
+    return schema
+
+
+def export_ddl(schema, tmp_path, dialect="sqlite", **kwargs):
+    """Exporta el DDL en silencio y retorna la carpeta creada."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return SQLAlchemyGenerator().export_ddl_to_files(schema, str(tmp_path),
+                                                         dialect=dialect, **kwargs)
+
+
+def run_on_sqlite(sql: str):
+    connection = sqlite3.connect(":memory:")
+    connection.execute("PRAGMA foreign_keys = ON")
+    connection.executescript(sql)
+    return connection
+
+
+def test_plan_defers_only_cycle_edges(cyclic_schema):
+    plan = plan_ddl(cyclic_schema)
+    
+    # Cada tabla después de las que referencia; el ciclo en orden del esquema
+    assert [table.name for table in plan.tables] == ["A", "B", "D", "C"]
+    assert plan.deferred == {("A", "b_id")}
+    # Las referencias a la propia tabla no se difieren
+    c = cyclic_schema.get_table("C")
+    assert not plan.is_deferred(c, c.columns[1])
+
+
+def test_plan_without_cycles_defers_nothing():
+    schema = RelationalSchema()
+    for table in (_table("Order", ("customer_id", "Customer")), _table("Customer")):
+        schema.add_table(table)
+    plan = plan_ddl(schema)
+    assert [table.name for table in plan.tables] == ["Customer", "Order"]
+    assert not plan.deferred
+
+
+def test_deferred_foreign_keys_use_alter_table(cyclic_schema, tmp_path):
+    path = export_ddl(cyclic_schema, tmp_path, dialect="postgresql")
+    
+    name = foreign_key_name(cyclic_schema.get_table("A"), Column("b_id", "Integer"))
+    deferred = (path / "deferred_foreign_keys.sql").read_text(encoding="utf-8")
+    assert deferred.count("ALTER TABLE") == 1 and name in deferred
+    schema_sql = (path / "schema.sql").read_text(encoding="utf-8")
+    assert schema_sql.index('CREATE TABLE "B"') < schema_sql.index('CREATE TABLE "D"')
+    assert schema_sql.rstrip().endswith(deferred.strip().splitlines()[-1])
+
+
+def test_cyclic_schema_runs_on_sqlite(cyclic_schema, tmp_path):
+    path = export_ddl(cyclic_schema, tmp_path)
+    connection = run_on_sqlite((path / "schema.sql").read_text(encoding="utf-8"))
+    
+    # SQLite no tiene ADD CONSTRAINT: las FKs del ciclo quedan en línea
+    assert not (path / "deferred_foreign_keys.sql").exists()
+    assert [row[2] for row in connection.execute("PRAGMA foreign_key_list(A)")] == ["B"]
+
+
+def _columns(connection, table):
+    return [row[1] for row in connection.execute(f'PRAGMA table_info("{table}")')]
+
+
+def _tables(connection):
+    return {row[0] for row in connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+@pytest.mark.parametrize("strategy", INHERITANCE_STRATEGIES)
+def test_inheritance_ddl_runs_on_sqlite(small_xml, example_xml, tmp_path, strategy):
+    mapper = OntologyMapper(inheritance=InheritancePolicy(default=strategy))
+    schema = mapper.map(OntologyParser().parse(small_xml))
+    connection = run_on_sqlite(
+        (export_ddl(schema, tmp_path / "small") / "schema.sql").read_text(encoding="utf-8"))
+    
+    # Novel is_a Book
+    if strategy == "single":
+        assert "Novel" not in _tables(connection)
+        assert {DISCRIMINATOR, "title", "genre"} <= set(_columns(connection, "Book"))
+    else:
+        assert _columns(connection, "Novel")[0] == "id"
+    if strategy == "joined":
+        assert DISCRIMINATOR in _columns(connection, "Book")
+        assert [(row[2], row[3]) for row in connection.execute(
+            "PRAGMA foreign_key_list(Novel)")] == [("Book", "id")]
+    elif strategy == "concrete":
+        assert {"title", "tags", "genre"} <= set(_columns(connection, "Novel"))
+        assert not list(connection.execute("PRAGMA foreign_key_list(Novel)"))
+    
+    schema = mapper.map(OntologyParser().parse(example_xml))
+    sql = (export_ddl(schema, tmp_path / "example") / "schema.sql").read_text(encoding="utf-8")
+    assert len(_tables(run_on_sqlite(sql))) == len(schema.tables)
+
+
+def test_partition_policy_specs():
+    policy = PartitionPolicy()
+    policy.add_spec("Event,Log:created_at:week")
+    assert policy.tables == {"Event": PartitionSpec("created_at", "week"),
+                             "Log": PartitionSpec("created_at", "week")}
+    for spec in ("Event", "Event:", "Event:created_at:hour"):
+        with pytest.raises(ValueError):
+            policy.add_spec(spec)
+
+
+def test_partitioned_postgresql_ddl(example_xml, tmp_path):
+    schema = OntologyMapper().map(OntologyParser().parse(example_xml))
+    partitions = PartitionPolicy()
+    partitions.add_spec("_CyberEvent:event_time:month")
+    path = export_ddl(schema, tmp_path, dialect="postgresql", partitions=partitions)
+    
+    sql = (path / "schema.sql").read_text(encoding="utf-8")
+    event = (path / "_cyberevent.sql").read_text(encoding="utf-8")
+    assert "PARTITION BY RANGE (event_time)" in event
+    assert "PRIMARY KEY (id, event_time)" in event
+    assert "USING brin (event_time)" in event
+    assert 'PARTITION OF "_CyberEvent" DEFAULT' in event
+    assert "SELECT ontology2db_create_partitions('_CyberEvent'" in (
+        path / "partitions.sql").read_text(encoding="utf-8")
+    # Nadie puede referenciar la tabla particionada con una FK a su id
+    assert "REFERENCES \"_CyberEvent\"" not in sql
+    
+    pglast = pytest.importorskip("pglast")
+    pglast.parse_sql(sql)
+    pglast.parse_sql((path / "partitions.sql").read_text(encoding="utf-8"))
+
+
+def test_partitions_need_postgresql(example_xml, tmp_path):
+    schema = OntologyMapper().map(OntologyParser().parse(example_xml))
+    partitions = PartitionPolicy()
+    partitions.add_spec("_CyberEvent:event_time")
+    with pytest.raises(ValueError):
+        export_ddl(schema, tmp_path, dialect="sqlite", partitions=partitions)
+
+
+def test_unbounded_strings_on_mysql(example_xml, tmp_path):
+    policy = IndexPolicy()
+    policy.add_spec("name")
+    mapper = OntologyMapper(index_policy=policy, key_strategy="ontology_id")
+    schema = mapper.map(OntologyParser().parse(example_xml))
+    sql = (export_ddl(schema, tmp_path, dialect="mysql") / "schema.sql").read_text(
+        encoding="utf-8")
+    
+    # MySQL no admite VARCHAR sin longitud ni índices sobre TEXT
+    assert not re.search(r"VARCHAR(?!\()", sql)
+    assert "TEXT" in sql
+    assert f"name VARCHAR({KEY_STRING_LENGTH})" in sql
+
+
+@pytest.mark.parametrize("key_strategy", KEY_STRATEGIES)
+def test_key_strategy_ddl_runs_on_sqlite(example_xml, tmp_path, key_strategy):
+    schema = OntologyMapper(key_strategy=key_strategy).map(OntologyParser().parse(example_xml))
+    connection = run_on_sqlite(
+        (export_ddl(schema, tmp_path) / "schema.sql").read_text(encoding="utf-8"))
+    
+    def column_types(table):
+        # Afinidad de SQLite: la PK BigInteger se declara INTEGER para
+        # autoincrementar y sus foreign keys BIGINT
+        return {row[1]: "INTEGER" if "INT" in row[2] else row[2]
+                for row in connection.execute(f'PRAGMA table_info("{table}")')}
+    
+    types = {table: column_types(table) for table in _tables(connection)}
+    assert len(types) == len(schema.tables)
+    # Cada foreign key tiene el tipo de la clave que referencia
+    for table in types:
+        for row in connection.execute(f'PRAGMA foreign_key_list("{table}")'):
+            target, column, target_column = row[2:5]
+            assert types[table][column] == types[target][target_column], (table, column)
+
+
+@pytest.mark.parametrize("key_strategy", ["integer", "identity", "sequence"])
+def test_generated_integer_keys_on_sqlite(small_xml, tmp_path, key_strategy):
+    schema = OntologyMapper(key_strategy=key_strategy).map(OntologyParser().parse(small_xml))
+    connection = run_on_sqlite(
+        (export_ddl(schema, tmp_path) / "schema.sql").read_text(encoding="utf-8"))
+    
+    # SQLite solo autoincrementa INTEGER PRIMARY KEY: sin secuencias ni identity
+    for name in ("Ana", "Luis"):
+        connection.execute('INSERT INTO "Author" (author_id, name) VALUES (1, ?)', (name,))
+    assert [row[0] for row in connection.execute('SELECT id FROM "Author"')] == [1, 2]
@@ -0,0 +1,133 @@
+"""Tests del plegado de relaciones uno a uno"""
+import pytest
+
+from ontology2db.denormalize import fold_one_to_one, find_one_to_one_clusters
+from ontology2db.mapper import Column, OntologyMapper, RelationalSchema, Table
+from ontology2db.parser import OntologyParser
+
+
+def _table(name, *columns, references=()):
+    """Tabla con PK ``id``, columnas de texto y foreign keys (columna, destino, unique)."""
+    table = Table(name=name, columns=[Column("id", "Integer", nullable=False,
+                                             primary_key=True)])
+    for column in columns:
+        table.columns.append(Column(column, "String"))
+    for column, target, unique in references:
+        table.columns.append(Column(column, "Integer", foreign_key=f"{target}.id",
+                                    unique=unique))
+    return table
+
+
+def _schema(*tables) -> RelationalSchema:
+    schema = RelationalSchema()
+    for table in tables:
+        schema.add_table(table)
+    return schema
+
+
+@pytest.fixture
+def chain_schema() -> RelationalSchema:
+    """A -1:1-> B -1:1-> C; B también referencia a X (N:1)."""
+    return _schema(
+        _table("A", "name", references=[("b_id", "B", True)]),
+        _table("B", "label", references=[("c_id", "C", True), ("x_id", "X", False)]),
+        _table("C", "value"),
+        _table("X", "code"),
+    )
+
+
+def _columns(schema, name) -> list:
+    return [col.name for col in schema.get_table(name).columns]
+
+
+def test_chain_is_one_cluster(chain_schema):
+    clusters = find_one_to_one_clusters(chain_schema)
+    assert len(clusters) == 1
+    cluster = clusters[0]
+    assert (cluster.root, cluster.depth, cluster.joins) == ("A", 2, 2)
+    assert [(link.parent, link.column, link.child) for link in cluster.links] == [
+        ("A", "b_id", "B"), ("B", "c_id", "C")]
+
+
+def test_fold_leaves_only(chain_schema):
+    report = fold_one_to_one(chain_schema, max_depth=1)
+    assert [(item.table, item.into, item.columns) for item in report.folded] == [
+        ("C", "B", ["c_value"])]
+    assert report.joins_removed == 1
+    assert chain_schema.get_table("C") is None
+    # Las columnas ocupan el lugar de la foreign key
+    assert _columns(chain_schema, "B") == ["id", "label", "c_value", "x_id"]
+    assert _columns(chain_schema, "A") == ["id", "name", "b_id"]
+    group = chain_schema.get_table("B").embedded[0]
+    assert (group.name, group.foreign_key, group.columns) == ("C", "c_id", ["c_value"])
+
+
+def test_fold_whole_chain(chain_schema):
+    report = fold_one_to_one(chain_schema, max_depth=2)
+    assert [(item.table, item.into) for item in report.folded] == [("C", "B"), ("B", "A")]
+    assert [table.name for table in chain_schema.tables] == ["A", "X"]
+    assert _columns(chain_schema, "A") == ["id", "name", "b_label", "b_c_value", "b_x_id"]
+    
+    # La foreign key hacia la tabla plegada desaparece y la que llevaba
+    # la tabla plegada pasa a su dueña
+    assert chain_schema.references_to("B") == []
+    assert chain_schema.references_to("C") == []
+    assert [(table.name, col.name) for table, col in chain_schema.references_to("X")] == [
+        ("A", "b_x_id")]
+    # b_id era opcional: lo incrustado también
+    columns = {col.name: col for col in chain_schema.get_table("A").columns}
+    assert all(columns[name].nullable for name in ("b_label", "b_c_value", "b_x_id"))
+
+
+def test_fold_skips_repeated_columns():
+    schema = _schema(
+        _table("A", "b_label", references=[("b_id", "B", True)]),
+        _table("B", "label"),
+    )
+    report = fold_one_to_one(schema)
+    assert report.folded == []
+    assert report.skipped == [("B", "columnas repetidas en A")]
+    assert _columns(schema, "A") == ["id", "b_label", "b_id"]
+
+
+@pytest.mark.parametrize("tables", [
+    # N:1: foreign key sin UNIQUE
+    [_table("A", references=[("b_id", "B", False)]), _table("B", "label")],
+    # B se referencia desde dos tablas
+    [_table("A", references=[("b_id", "B", True)]),
+     _table("D", references=[("b_id", "B", True)]),
+     _table("B", "label")],
+    # Ciclo A <-> B
+    [_table("A", references=[("b_id", "B", True)]),
+     _table("B", references=[("a_id", "A", True)])],
+    # Referencia a sí misma
+    [_table("A", references=[("parent_id", "A", True)])],
+])
+def test_not_one_to_one(tables):
+    schema = _schema(*tables)
+    assert find_one_to_one_clusters(schema) == []
+    names = [table.name for table in schema.tables]
+    assert fold_one_to_one(schema, max_depth=3).folded == []
+    assert [table.name for table in schema.tables] == names
+
+
+def test_mapper_folds_one_to_one(tmp_path):
+    path = tmp_path / "profile.xml"
+    path.write_text("""<Ontology>
+        <Class name="User"><Attribute name="login" type="string"/></Class>
+        <Class name="Profile"><Attribute name="bio" type="text"/></Class>
+        <Relations><Relation name="has" source="Profile" target="User"/></Relations>
+    </Ontology>""", encoding="utf-8")
+    ontology = OntologyParser().parse(str(path))
+    
+    mapper = OntologyMapper()
+    schema = mapper.map(ontology)
+    assert [cluster.root for cluster in mapper.denormalization.clusters] == ["User"]
+    assert mapper.denormalization.folded == []
+    assert schema.get_table("Profile") is not None
+    
+    mapper = OntologyMapper(fold_one_to_one=1)
+    schema = mapper.map(ontology)
+    assert [table.name for table in schema.tables] == ["User"]
+    assert _columns(schema, "User") == ["id", "login", "profile_bio"]
+    assert mapper.denormalization.joins_removed == 1
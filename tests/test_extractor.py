@@ -0,0 +1,58 @@
+"""Tests de PackageExtractor"""
+import pytest
+
+from ontology2db.extractor import OntologyXMLWriter, extract_package
+from ontology2db.parser import OntologyParser
+
+
+def _write_package(root):
+    package = root / "shop"
+    (package / "events").mkdir(parents=True)
+    (package / "__init__.py").write_text("from .events import *\n")
+    (package / "base.py").write_text(
+        "class Entity:\n"
+        "    def __init__(self, name: str, id=None):\n"
+        "        self.name = name\n")
+    (package / "events" / "__init__.py").write_text(
+        "from .order import Order\n__all__ = ['Order']\n")
+    (package / "events" / "order.py").write_text(
+        "from ..base import Entity\n\n"
+        "class Customer(Entity):\n"
+        "    pass\n\n"
+        "class Order(Entity):\n"
+        "    def __init__(self, customer_id: int, total: float, ghost_id=None, **kwargs):\n"
+        "        super().__init__(**kwargs)\n")
+    return package
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_extract_package(tmp_path, workers):
+    output = tmp_path / "shop.xml"
+    stats = extract_package(str(_write_package(tmp_path)), str(output), workers=workers)
+    
+    assert (stats.modules, stats.classes, stats.relations) == (4, 3, 3)
+    # ghost_id no apunta a ninguna clase: se cuenta, no se inventa
+    assert stats.unresolved_references == 1
+    ontology = OntologyParser().parse(str(output))
+    assert sorted(cls.name for cls in ontology.classes) == ["Customer", "Entity", "Order"]
+    order = ontology.get_class("Order")
+    # Clave propia más los argumentos de __init__ (sin self/id/kwargs)
+    assert [(attr.name, attr.type) for attr in order.attributes] == [
+        ("order_id", "integer"), ("customer_id", "integer"), ("total", "float"),
+        ("ghost_id", "string")]
+    assert sorted((rel.name, rel.source, rel.target) for rel in ontology.relations) == [
+        ("is_a", "Customer", "Entity"), ("is_a", "Order", "Entity"),
+        ("references", "Order", "Customer")]
+
+
+def test_writer_keeps_previous_file_on_error(tmp_path):
+    output = tmp_path / "ontology.xml"
+    output.write_text("previous", encoding="utf-8")
+    
+    with pytest.raises(RuntimeError):
+        with OntologyXMLWriter(str(output)) as writer:
+            writer.write_class("A", None, [])
+            raise RuntimeError("fallo a mitad")
+    
+    assert output.read_text(encoding="utf-8") == "previous"
+    assert [path.name for path in tmp_path.iterdir()] == ["ontology.xml"]
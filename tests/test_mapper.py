@@ -0,0 +1,243 @@
+"""Tests de OntologyMapper"""
+import pytest
+
+from ontology2db.mapper import (Column, IndexPolicy, OntologyMapper, RelationalSchema,
+                                Table)
+from ontology2db.parser import OntologyParser
+
+
+# Atributos multivaluados obligatorio (1..*) y opcional (0..*), este con
+# el tipo de sus elementos en el docstring
+MULTIVALUED_ONTOLOGY = """<Ontology><Class name="Host">
+    <description>Equipo
+
+:param ports: Puertos abiertos
+:type ports: list of ints, optional</description>
+    <Attribute name="name" type="string" cardinality="1"/>
+    <Attribute name="addresses" type="string" cardinality="1..*"/>
+    <Attribute name="ports" type="string" cardinality="0..*"/>
+</Class></Ontology>"""
+
+
+@pytest.fixture
+def multivalued_ontology(tmp_path):
+    path = tmp_path / "multivalued.xml"
+    path.write_text(MULTIVALUED_ONTOLOGY, encoding="utf-8")
+    return OntologyParser().parse(str(path))
+
+
+def _columns(table) -> dict:
+    return {col.name: col for col in table.columns}
+
+
+@pytest.mark.parametrize("multivalued, addresses, ports", [
+    ("json", "JSONB", "JSONB"),
+    ("array", "ARRAY(String)", "ARRAY(Integer)"),
+])
+def test_multivalued_columns(multivalued_ontology, multivalued, addresses, ports):
+    schema = OntologyMapper(multivalued=multivalued).map(multivalued_ontology)
+    assert [table.name for table in schema.tables] == ["Host"]
+    columns = _columns(schema.get_table("Host"))
+    assert (columns["addresses"].type, columns["ports"].type) == (addresses, ports)
+    # 1..* es obligatorio y 0..* opcional
+    assert not columns["addresses"].nullable
+    assert columns["ports"].nullable
+    assert not columns["name"].nullable
+
+
+def test_multivalued_child_tables(multivalued_ontology):
+    schema = OntologyMapper(multivalued="child_table").map(multivalued_ontology)
+    assert [table.name for table in schema.tables] == ["Host", "Host_addresses", "Host_ports"]
+    # Los valores salen de la tabla dueña
+    assert set(_columns(schema.get_table("Host"))) == {"id", "name"}
+    
+    for name, element_type in [("Host_addresses", "String"), ("Host_ports", "Integer")]:
+        table = schema.get_table(name)
+        assert table.owner == "Host"
+        columns = _columns(table)
+        assert list(columns) == ["host_id", "position", "value"]
+        owner = columns["host_id"]
+        assert owner.foreign_key == "Host.id"
+        assert owner.primary_key and not owner.nullable
+        assert columns["position"].primary_key and columns["position"].type == "Integer"
+        assert columns["value"].type == element_type
+        assert not columns["value"].nullable
+        assert [col.name for col in table.columns if col.primary_key] == ["host_id", "position"]
+
+
+def test_unknown_multivalued_strategy():
+    with pytest.raises(ValueError, match="desconocida: set"):
+        OntologyMapper(multivalued="set")
+
+
+def _references(schema, name) -> list:
+    return [(table.name, col.name) for table, col in schema.references_to(name)]
+
+
+def _associations(schema, name) -> list:
+    return [(table.name, other) for table, other in schema.associations_of(name)]
+
+
+def test_schema_lookups(small_xml):
+    schema = OntologyMapper().map(OntologyParser().parse(small_xml))
+    assert schema.get_table("Book").name == "Book"
+    assert schema.get_table("Missing") is None
+    assert _associations(schema, "Author") == [("Author_Book", "Book")]
+    assert _associations(schema, "Book") == [("Author_Book", "Author")]
+    assert _associations(schema, "Novel") == []
+    assert ("Author_Book", "author_id") in _references(schema, "Author")
+    assert ("Author_Book", "book_id") in _references(schema, "Book")
+    assert _references(schema, "Missing") == []
+
+
+def test_schema_lookups_follow_add_table_and_add_column():
+    schema = RelationalSchema()
+    schema.add_table(Table(name="A"))
+    schema.add_table(Table(name="B"))
+    # Se consultan antes de los cambios para que los índices existan
+    assert _references(schema, "A") == []
+    assert _associations(schema, "A") == []
+    
+    schema.add_column(schema.get_table("B"), Column("a_id", "Integer", foreign_key="A.id"))
+    assert _references(schema, "A") == [("B", "a_id")]
+    
+    schema.add_table(Table(name="A_B", is_association_table=True,
+                           columns=[Column("a_id", "Integer", foreign_key="A.id"),
+                                    Column("b_id", "Integer", foreign_key="B.id")]))
+    assert _references(schema, "A") == [("B", "a_id"), ("A_B", "a_id")]
+    assert _associations(schema, "A") == [("A_B", "B")]
+    assert _associations(schema, "B") == [("A_B", "A")]
+    # Sin endpoints guardados los extremos salen del nombre
+    assert schema.get_table("A_B").association_endpoints() == ("A", "B")
+    
+    # Autoasociación: un solo extremo
+    schema.add_table(Table(name="C_C", is_association_table=True, endpoints=("C", "C")))
+    assert _associations(schema, "C") == [("C_C", "C")]
+
+
+def test_schema_reindex_after_direct_changes():
+    schema = RelationalSchema()
+    schema.add_table(Table(name="A"))
+    schema.add_table(Table(name="B", columns=[Column("a_id", "Integer", foreign_key="A.id")]))
+    assert _references(schema, "A") == [("B", "a_id")]
+    
+    # Tablas añadidas directamente a la lista: se indexan al consultar
+    schema.tables.append(Table(name="C", columns=[Column("a_id", "Integer", foreign_key="A.id")]))
+    assert schema.get_table("C") is not None
+    assert _references(schema, "A") == [("B", "a_id"), ("C", "a_id")]
+    
+    # Cambios en sitio (quitar tablas, renombrar, columnas nuevas) necesitan reindex()
+    table = schema.get_table("C")
+    del schema.tables[1]
+    table.name = "D"
+    table.columns.append(Column("e_id", "Integer", foreign_key="E.id"))
+    schema.reindex()
+    assert schema.get_table("B") is None
+    assert schema.get_table("C") is None
+    assert schema.get_table("D").name == "D"
+    assert _references(schema, "A") == [("D", "a_id")]
+    assert _references(schema, "E") == [("D", "e_id")]
+
+
+# Host 1:N Port (foreign key no única en Port), Host N:M Network y
+# "event_time" en dos tablas
+INDEXED_ONTOLOGY = """<Ontology>
+    <Class name="Host">
+        <Attribute name="name" type="string"/>
+        <Attribute name="tags" type="string" cardinality="0..*"/>
+        <Attribute name="event_time" type="datetime"/>
+    </Class>
+    <Class name="Port">
+        <Attribute name="number" type="int"/>
+        <Attribute name="status" type="string"/>
+        <Attribute name="event_time" type="datetime"/>
+    </Class>
+    <Class name="Network"><Attribute name="cidr" type="string"/></Class>
+    <Relations>
+        <Relation name="has" source="Host" target="Port"
+                  source_cardinality="1" target_cardinality="0..*"/>
+        <Relation name="joins" source="Host" target="Network"
+                  source_cardinality="0..*" target_cardinality="0..*"/>
+        <Relation name="uses" source="Network" target="Port"/>
+    </Relations>
+</Ontology>"""
+
+
+@pytest.fixture
+def indexed_ontology(tmp_path):
+    path = tmp_path / "indexed.xml"
+    path.write_text(INDEXED_ONTOLOGY, encoding="utf-8")
+    return OntologyParser().parse(str(path))
+
+
+def _indexes(schema) -> dict:
+    """Índices por tabla como {nombre: (columnas, where, using)}."""
+    return {table.name: {index.name: (tuple(index.columns), index.where, index.using)
+                         for index in table.indexes}
+            for table in schema.tables}
+
+
+def test_default_indexes(indexed_ontology):
+    schema = OntologyMapper().map(indexed_ontology)
+    indexes = _indexes(schema)
+    # La foreign key 1:1 (network_id) es UNIQUE y no necesita otro índice
+    port_columns = {col.name: col for col in schema.get_table("Port").columns}
+    assert port_columns["network_id"].unique
+    assert indexes["Port"] == {"ix_port_host_id": (("host_id",), None, None)}
+    # La PK (host_id, network_id) ya indexa el primer extremo
+    assert indexes["Host_Network"] == {
+        "ix_host_network_network_id": (("network_id",), None, None)}
+    assert indexes["Host"] == {"ix_host_tags": (("tags",), None, "gin")}
+    assert indexes["Network"] == {}
+
+
+def test_hot_composite_and_partial_indexes(indexed_ontology):
+    policy = IndexPolicy()
+    policy.add_spec("event_time")
+    policy.add_spec("Port:number, status")
+    policy.add_spec("Port:status:status = 'open'")
+    indexes = _indexes(OntologyMapper(index_policy=policy).map(indexed_ontology))
+    assert indexes["Host"]["ix_host_event_time"] == (("event_time",), None, None)
+    assert indexes["Port"] == {
+        "ix_port_event_time": (("event_time",), None, None),
+        "ix_port_host_id": (("host_id",), None, None),
+        "ix_port_number_status": (("number", "status"), None, None),
+        "ix_port_status": (("status",), "status = 'open'", None),
+    }
+
+
+def test_association_index_policy(indexed_ontology):
+    schema = OntologyMapper(index_policy=IndexPolicy(association_tables=False)).map(
+        indexed_ontology)
+    assert schema.get_table("Host_Network").indexes == []
+    assert schema.get_table("Port").indexes
+
+
+def test_child_table_value_index(indexed_ontology):
+    schema = OntologyMapper(multivalued="child_table").map(indexed_ontology)
+    assert _indexes(schema)["Host_tags"] == {
+        "ix_host_tags_value_host_id": (("value", "host_id"), None, None)}
+
+
+def test_disabled_policy_emits_no_indexes(indexed_ontology):
+    policy = IndexPolicy.disabled()
+    schema = OntologyMapper(index_policy=policy, multivalued="child_table").map(
+        indexed_ontology)
+    assert all(not table.indexes for table in schema.tables)
+
+
+@pytest.mark.parametrize("spec, message", [
+    ("Missing:a", "tabla inexistente: Missing"),
+    ("Port:number,nope", "no tiene las columnas nope"),
+])
+def test_extra_index_errors(indexed_ontology, spec, message):
+    policy = IndexPolicy()
+    policy.add_spec(spec)
+    with pytest.raises(ValueError, match=message):
+        OntologyMapper(index_policy=policy).map(indexed_ontology)
+
+
+@pytest.mark.parametrize("spec", ["Port:", ":a", "Port: , "])
+def test_bad_index_spec(spec):
+    with pytest.raises(ValueError, match="mal especificado"):
+        IndexPolicy().add_spec(spec)
@@ -0,0 +1,178 @@
+"""Tests de OWLParser"""
+import gzip
+import logging
+import runpy
+
+import pytest
+
+from ontology2db.codegen import SQLAlchemyGenerator
+from ontology2db.mapper import OntologyMapper
+from ontology2db.owl import OWLParser, is_owl_file
+from ontology2db.parser import LET
+
+
+# La misma ontología en RDF/XML y en OWL/XML
+RDF_XML = """<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:rdfs="http://www.w3.org/2000/01/rdf-schema#"
+         xmlns:owl="http://www.w3.org/2002/07/owl#"
+         xml:base="http://example.org/pizza">
+    <owl:Ontology rdf:about=""/>
+    <owl:Class rdf:about="#Food"/>
+    <owl:Class rdf:about="#Pizza">
+        <rdfs:comment>Una pizza</rdfs:comment>
+        <rdfs:subClassOf rdf:resource="#Food"/>
+        <rdfs:subClassOf>
+            <owl:Restriction>
+                <owl:onProperty rdf:resource="#hasBase"/>
+                <owl:cardinality rdf:datatype="http://www.w3.org/2001/XMLSchema#nonNegativeInteger">1</owl:cardinality>
+            </owl:Restriction>
+        </rdfs:subClassOf>
+        <rdfs:subClassOf>
+            <owl:Restriction>
+                <owl:onProperty rdf:resource="#name"/>
+                <owl:minCardinality rdf:datatype="http://www.w3.org/2001/XMLSchema#nonNegativeInteger">1</owl:minCardinality>
+            </owl:Restriction>
+        </rdfs:subClassOf>
+    </owl:Class>
+    <owl:Class rdf:about="#Base"/>
+    <owl:ObjectProperty rdf:about="#hasBase">
+        <rdfs:domain rdf:resource="#Pizza"/>
+        <rdfs:range rdf:resource="#Base"/>
+    </owl:ObjectProperty>
+    <owl:DatatypeProperty rdf:about="#name">
+        <rdf:type rdf:resource="http://www.w3.org/2002/07/owl#FunctionalProperty"/>
+        <rdfs:comment>Nombre en la carta</rdfs:comment>
+        <rdfs:domain rdf:resource="#Pizza"/>
+        <rdfs:range rdf:resource="http://www.w3.org/2001/XMLSchema#string"/>
+    </owl:DatatypeProperty>
+    <owl:DatatypeProperty rdf:about="#price">
+        <rdfs:domain rdf:resource="#Pizza"/>
+        <rdfs:range rdf:resource="http://www.w3.org/2001/XMLSchema#decimal"/>
+    </owl:DatatypeProperty>
+</rdf:RDF>
+"""
+
+OWL_XML = """<?xml version="1.0"?>
+<Ontology xmlns="http://www.w3.org/2002/07/owl#"
+          ontologyIRI="http://example.org/pizza">
+    <Prefix name="xsd" IRI="http://www.w3.org/2001/XMLSchema#"/>
+    <Prefix name="rdfs" IRI="http://www.w3.org/2000/01/rdf-schema#"/>
+    <Declaration><Class IRI="#Food"/></Declaration>
+    <Declaration><Class IRI="#Pizza"/></Declaration>
+    <Declaration><Class IRI="#Base"/></Declaration>
+    <Declaration><ObjectProperty IRI="#hasBase"/></Declaration>
+    <Declaration><DataProperty IRI="#name"/></Declaration>
+    <Declaration><DataProperty IRI="#price"/></Declaration>
+    <SubClassOf><Class IRI="#Pizza"/><Class IRI="#Food"/></SubClassOf>
+    <SubClassOf>
+        <Class IRI="#Pizza"/>
+        <ObjectExactCardinality cardinality="1"><ObjectProperty IRI="#hasBase"/></ObjectExactCardinality>
+    </SubClassOf>
+    <SubClassOf>
+        <Class IRI="#Pizza"/>
+        <DataMinCardinality cardinality="1"><DataProperty IRI="#name"/></DataMinCardinality>
+    </SubClassOf>
+    <ObjectPropertyDomain><ObjectProperty IRI="#hasBase"/><Class IRI="#Pizza"/></ObjectPropertyDomain>
+    <ObjectPropertyRange><ObjectProperty IRI="#hasBase"/><Class IRI="#Base"/></ObjectPropertyRange>
+    <FunctionalDataProperty><DataProperty IRI="#name"/></FunctionalDataProperty>
+    <DataPropertyDomain><DataProperty IRI="#name"/><Class IRI="#Pizza"/></DataPropertyDomain>
+    <DataPropertyRange><DataProperty IRI="#name"/><Datatype abbreviatedIRI="xsd:string"/></DataPropertyRange>
+    <DataPropertyDomain><DataProperty IRI="#price"/><Class IRI="#Pizza"/></DataPropertyDomain>
+    <DataPropertyRange><DataProperty IRI="#price"/><Datatype abbreviatedIRI="xsd:decimal"/></DataPropertyRange>
+    <AnnotationAssertion>
+        <AnnotationProperty abbreviatedIRI="rdfs:comment"/><IRI>#Pizza</IRI><Literal>Una pizza</Literal>
+    </AnnotationAssertion>
+    <AnnotationAssertion>
+        <AnnotationProperty abbreviatedIRI="rdfs:comment"/><IRI>#name</IRI><Literal>Nombre en la carta</Literal>
+    </AnnotationAssertion>
+</Ontology>
+"""
+
+ENGINES = ["stdlib"] + (["lxml"] if LET is not None else [])
+
+
+@pytest.fixture(params=[("pizza.owl", RDF_XML), ("pizza.owx", OWL_XML)],
+                ids=["rdf_xml", "owl_xml"])
+def owl_file(request, tmp_path) -> str:
+    name, text = request.param
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_parse(owl_file, engine):
+    ontology = OWLParser(engine=engine).parse(owl_file)
+    
+    assert [cls.name for cls in ontology.classes] == ["Food", "Pizza", "Base"]
+    pizza = ontology.get_class("Pizza")
+    assert pizza.id == "http://example.org/pizza#Pizza"
+    assert pizza.description == "Una pizza"
+    attributes = {attr.name: attr for attr in pizza.attributes}
+    assert (attributes["name"].type, attributes["name"].cardinality) == ("string", "1")
+    assert attributes["name"].description == "Nombre en la carta"
+    assert (attributes["price"].type, attributes["price"].cardinality) == ("float", "0..1")
+    
+    relations = {(rel.name, rel.source, rel.target): rel for rel in ontology.relations}
+    assert set(relations) == {("is_a", "Pizza", "Food"), ("hasBase", "Pizza", "Base")}
+    assert relations[("hasBase", "Pizza", "Base")].target_cardinality == "1"
+
+
+def test_syntaxes_agree(tmp_path):
+    rdf = tmp_path / "pizza.rdf"
+    rdf.write_text(RDF_XML, encoding="utf-8")
+    owx = tmp_path / "pizza.owx"
+    owx.write_text(OWL_XML, encoding="utf-8")
+    parser = OWLParser()
+    
+    def summary(ontology):
+        return ([(cls.id, cls.name, cls.description,
+                  sorted((attr.name, attr.type, attr.cardinality) for attr in cls.attributes))
+                 for cls in ontology.classes],
+                sorted((rel.name, rel.source, rel.target, rel.target_cardinality)
+                       for rel in ontology.relations))
+    assert summary(parser.parse(str(rdf))) == summary(parser.parse(str(owx)))
+
+
+def test_compressed(tmp_path):
+    path = tmp_path / "pizza.owl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(RDF_XML)
+    assert is_owl_file(str(path))
+    assert [cls.name for cls in OWLParser().parse(str(path)).classes] == ["Food", "Pizza", "Base"]
+
+
+def test_same_local_name_in_two_namespaces(tmp_path, caplog):
+    path = tmp_path / "menu.owl"
+    path.write_text("""<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:rdfs="http://www.w3.org/2000/01/rdf-schema#"
+         xmlns:owl="http://www.w3.org/2002/07/owl#"
+         xmlns:food="http://example.org/food#"
+         xmlns:menu="http://example.org/menu#">
+    <owl:Class rdf:about="http://example.org/food#Pizza"/>
+    <owl:Class rdf:about="http://example.org/menu#Pizza"/>
+    <owl:Class rdf:about="http://example.org/menu#Order"/>
+    <owl:ObjectProperty rdf:about="http://example.org/menu#item">
+        <rdfs:domain rdf:resource="http://example.org/menu#Order"/>
+        <rdfs:range rdf:resource="http://example.org/food#Pizza"/>
+    </owl:ObjectProperty>
+    <owl:DatatypeProperty rdf:about="http://example.org/menu#note">
+        <rdfs:domain rdf:resource="http://www.w3.org/2002/07/owl#Thing"/>
+    </owl:DatatypeProperty>
+</rdf:RDF>
+""", encoding="utf-8")
+    with caplog.at_level(logging.WARNING, logger="ontology2db.owl"):
+        ontology = OWLParser().parse(str(path))
+    
+    assert [cls.name for cls in ontology.classes] == ["food_Pizza", "menu_Pizza", "Order"]
+    assert [(rel.source, rel.target) for rel in ontology.relations] == [("Order", "food_Pizza")]
+    # Las propiedades sin dónde mapearse se avisan en lugar de perderse
+    assert "http://example.org/menu#note" in caplog.text
+    
+    # Sin nombres repetidos, los modelos generados se pueden importar
+    models = tmp_path / "models.py"
+    SQLAlchemyGenerator().generate(OntologyMapper().map(ontology), str(models))
+    module = runpy.run_path(str(models))
+    assert {"food_Pizza", "menu_Pizza"} <= set(module["Base"].metadata.tables)
@@ -0,0 +1,514 @@
+"""Tests de OntologyParser"""
+import bz2
+import dataclasses
+import gc
+import gzip
+import json
+import logging
+import lzma
+import pickle
+import shutil
+import weakref
+
+import pytest
+
+from ontology2db import parser as parser_module
+from ontology2db.cache import OntologyCache
+from ontology2db.mapper import OntologyMapper
+from ontology2db.parser import (LET, UNBOUNDED, Attribute, Class, DescriptionSource,
+                                LazyDescription, OntologyParser, Relation,
+                                description_text, format_cardinality, parse_cardinality)
+
+
+@pytest.fixture(params=["small_xml", "example_xml"])
+def xml_file(request) -> str:
+    return request.getfixturevalue(request.param)
+
+
+def test_parse_small(small_xml):
+    ontology = OntologyParser().parse(small_xml)
+    
+    assert [cls.name for cls in ontology.classes] == ["Author", "Book", "Novel"]
+    author = ontology.get_class("Author")
+    assert author.description == "Autor de libros"
+    # Las descripciones de atributos salen de los :param del docstring
+    assert [attr.description for attr in author.attributes] == [
+        None, "Nombre completo", "Fecha de nacimiento"]
+    assert ontology.get_class("Book").attributes[0].description == "Título original"
+    writes = ontology.relations[1]
+    assert (writes.source, writes.target, writes.description) == ("Author", "Book", "Autoría")
+    assert [prop.name for prop in writes.properties] == ["role"]
+
+
+def test_streaming_equals_tree(xml_file):
+    parser = OntologyParser()
+    assert parser.parse(xml_file, streaming=True) == parser.parse(xml_file)
+
+
+@pytest.mark.skipif(LET is None, reason="lxml no instalado")
+@pytest.mark.parametrize("streaming", [False, True])
+def test_lxml_equals_stdlib(xml_file, streaming):
+    expected = OntologyParser(engine="stdlib").parse(xml_file, streaming=streaming)
+    assert OntologyParser(engine="lxml").parse(xml_file, streaming=streaming) == expected
+
+
+# Documentos con marcas que un troceado ingenuo por bytes rompería
+SHARD_CASES = {
+    "comment": ('<Ontology><!-- <Class name="Fake"> -->'
+                '<Class name="A"><description>x</description>'
+                '<Attribute name="a" type="int"/></Class>{classes}'
+                '<Relations><Relation name="r" source="A" target="C1">'
+                '<!-- </Relation> --></Relation></Relations></Ontology>'),
+    "cdata": ('<Ontology><Class name="A"><description>'
+              '<![CDATA[<Class name="X"></Class>]]></description></Class>'
+              '{classes}</Ontology>'),
+    "gt_in_attribute": '<Ontology><Class name="A" note="a>b"/>{classes}</Ontology>',
+}
+
+
+@pytest.mark.parametrize("case", sorted(SHARD_CASES))
+def test_parallel_equals_tree(tmp_path, monkeypatch, case):
+    # La máquina de los tests puede tener un solo núcleo
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    classes = "".join(f'<Class name="C{i}"/>' for i in range(20))
+    path = tmp_path / "shards.xml"
+    path.write_text(SHARD_CASES[case].format(classes=classes), encoding="utf-8")
+    parser = OntologyParser()
+    
+    assert parser._parse_parallel(str(path), 2) is not None
+    assert parser.parse(str(path), workers=2) == parser.parse(str(path))
+
+
+def test_parallel_falls_back_on_namespaces(tmp_path, monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    classes = "".join(f'<Class name="C{i}"/>' for i in range(20))
+    path = tmp_path / "ns.xml"
+    path.write_text(f'<Ontology xmlns="urn:x">{classes}</Ontology>', encoding="utf-8")
+    parser = OntologyParser()
+    
+    assert parser._parse_parallel(str(path), 2) is None
+    assert parser.parse(str(path), workers=2) == parser.parse(str(path))
+
+
+def test_parallel_example(example_xml, monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    parser = OntologyParser()
+    assert parser.parse(example_xml, workers=2) == parser.parse(example_xml)
+
+
+def test_cached_equals_tree(xml_file, tmp_path, monkeypatch):
+    expected = OntologyParser().parse(xml_file)
+    parser = OntologyParser(cache=OntologyCache(tmp_path / "cache"))
+    assert parser.parse(xml_file) == expected
+    
+    # La segunda vez sale de la caché, sin volver a parsear
+    def no_parse(*args):
+        raise AssertionError("se volvió a parsear")
+    monkeypatch.setattr(parser, "_parse_file", no_parse)
+    assert parser.parse(xml_file) == expected
+
+
+def test_cache_misses_after_change(small_xml, tmp_path):
+    parser = OntologyParser(cache=OntologyCache(tmp_path / "cache"))
+    parser.parse(small_xml)
+    with open(small_xml, "r+", encoding="utf-8") as f:
+        text = f.read().replace('name="Novel"', 'name="ShortStory"')
+        f.seek(0)
+        f.write(text)
+        f.truncate()
+    
+    assert parser.parse(small_xml).classes[2].name == "ShortStory"
+
+
+def test_cache_key_includes_parser_options(small_xml, tmp_path):
+    cache = OntologyCache(tmp_path / "cache")
+    expected = OntologyParser().parse(small_xml)
+    for parser, follow_imports in [(OntologyParser(cache=cache), True),
+                                   (OntologyParser(cache=cache), False),
+                                   (OntologyParser(cache=cache, share_attributes=True), True)]:
+        assert parser.parse(small_xml, follow_imports=follow_imports) == expected
+    # Cada combinación de opciones tiene su propia entrada
+    assert len(list(cache.cache_dir.glob("*.o2db"))) == 3
+    
+    salts = {OntologyParser(lazy_descriptions=lazy)._cache_salt(True)
+             for lazy in (False, True)}
+    assert len({cache.key_for(small_xml, salt) for salt in salts}) == 2
+
+
+def test_cache_evicts_imports_without_stat(small_xml, tmp_path):
+    cache = OntologyCache(tmp_path / "cache")
+    # imports_for sin key_for: la memoria .imports no tiene .stat al lado
+    assert cache.imports_for(small_xml, lambda path: ["m.xml"]) == ["m.xml"]
+    memo = next(cache.cache_dir.glob("*.imports"))
+    cache.put("k", OntologyParser().parse(small_xml))
+    # No es huérfana: se conserva mientras quepa
+    assert memo.exists()
+    
+    cache.max_bytes = cache._entry_path("k").stat().st_size
+    cache._evict()
+    assert not memo.exists()
+    assert cache.get("k") is not None
+
+
+# 20 clases con el mismo "created" y un "note" cuya descripción varía
+SHARED_ONTOLOGY = "<Ontology>{}</Ontology>".format("".join(
+    f'<Class name="C{i}"><Attribute name="created" type="datetime" cardinality="1"/>'
+    f'<Attribute name="note" type="string" cardinality="0..1">'
+    f'<description>Nota {i % 2}</description></Attribute></Class>'
+    for i in range(20)))
+
+
+@pytest.fixture
+def shared_xml(tmp_path) -> str:
+    path = tmp_path / "shared.xml"
+    path.write_text(SHARED_ONTOLOGY, encoding="utf-8")
+    return str(path)
+
+
+def test_shared_attributes_are_one_instance(shared_xml):
+    parser = OntologyParser(share_attributes=True)
+    ontology = parser.parse(shared_xml)
+    created = [cls.attributes[0] for cls in ontology.classes]
+    notes = [cls.attributes[1] for cls in ontology.classes]
+    assert all(attr is created[0] for attr in created)
+    # Distinta descripción: dos instancias, una por texto
+    assert len(set(map(id, notes))) == 2
+    assert notes[0] is notes[2] and notes[0] is not notes[1]
+    
+    stats = parser.stats
+    assert (stats.attributes, stats.unique_attributes) == (40, 3)
+    assert stats.shared_attributes == 37
+    assert len(parser.pool) == 3
+    
+    # Sin pool cada atributo es una instancia propia
+    unshared = OntologyParser()
+    assert unshared.parse(shared_xml) == ontology
+    assert unshared.stats.shared_attributes == 0
+
+
+def test_shared_attributes_through_cache_and_workers(shared_xml, tmp_path, monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    expected = OntologyParser().parse(shared_xml)
+    cache = OntologyCache(tmp_path / "cache")
+    # En paralelo cada worker tiene su pool; luego caché vacía y llena
+    for workers, parser_cache in ((2, None), (1, cache), (1, cache)):
+        parser = OntologyParser(cache=parser_cache, share_attributes=True)
+        ontology = parser.parse(shared_xml, workers=workers)
+        assert ontology == expected
+        assert parser.stats.unique_attributes == 3
+        created = {id(cls.attributes[0]) for cls in ontology.classes}
+        assert len(created) == 1
+    assert len(list(cache.cache_dir.glob("*.o2db"))) == 1
+
+
+@pytest.mark.parametrize("text, bounds", [
+    ("1", (1, 1)),
+    ("0..1", (0, 1)),
+    ("1..n", (1, UNBOUNDED)),
+    ("0..*", (0, UNBOUNDED)),
+    ("*", (0, UNBOUNDED)),
+    ("N", (0, UNBOUNDED)),
+    (" 2 .. 5 ", (2, 5)),
+    ("n..m", (0, UNBOUNDED)),
+])
+def test_parse_cardinality(text, bounds):
+    assert parse_cardinality(text) == bounds
+
+
+@pytest.mark.parametrize("text", ["muchos", "", "l", "1..2..3", "-1"])
+def test_invalid_cardinality_warns_and_falls_back(text, caplog):
+    # Cada valor se avisa una sola vez (la función memoriza)
+    parse_cardinality.cache_clear()
+    with caplog.at_level(logging.WARNING, logger="ontology2db.parser"):
+        assert parse_cardinality(text) == (0, 1)
+    assert "Cardinalidad inválida" in caplog.text
+    # Una errata no convierte un atributo escalar en multivaluado
+    attr = Attribute("a", "string", cardinality=text)
+    assert not attr.is_multiple() and not attr.is_required()
+
+
+@pytest.mark.parametrize("bounds, text", [
+    ((1, 1), "1"), ((0, 1), "0..1"), ((0, UNBOUNDED), "*"), ((1, UNBOUNDED), "1..*"),
+])
+def test_format_cardinality(bounds, text):
+    assert format_cardinality(bounds) == text
+    assert parse_cardinality(text) == bounds
+
+
+DOCSTRING = """Sensor de red, ver :class:`~cyberdem.base.Device`.
+Segunda línea :attr:`x`.
+
+:param str name: Nombre del sensor
+    que sigue en otra línea
+:type name: str
+:param empty:
+:type empty:
+:raises ValueError: Si el nombre está vacío
+:param count: Lecturas
+:Example:
+    sensor = Sensor()
+:param  ratio : Proporción
+:type ratio: float, optional"""
+
+
+def test_tokenize_docstring():
+    description, params, types = parser_module._tokenize_docstring(DOCSTRING)
+    # Los roles en línea no abren campos
+    assert description == ("Sensor de red, ver :class:`~cyberdem.base.Device`.\n"
+                           "Segunda línea :attr:`x`.")
+    # El tipo en línea no forma parte del nombre; las continuaciones se
+    # unen con espacios; los campos sin texto se omiten; :raises y
+    # :Example: cierran el campo anterior sin conservarse
+    assert params == (("name", "Nombre del sensor     que sigue en otra línea"),
+                      ("count", "Lecturas"),
+                      ("ratio", "Proporción"))
+    assert types == (("name", "str"), ("ratio", "float, optional"))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", ("", (), ())),
+    ("Solo descripción", ("Solo descripción", (), ())),
+    (":class:`Foo` al principio", (":class:`Foo` al principio", (), ())),
+    # Antes del primer :param/:type/:raises los demás campos son descripción
+    ("Texto\n:returns: algo\n:param a: A", ("Texto\n:returns: algo", (("a", "A"),), ())),
+    (":raises KeyError: nunca\n:param a: A", ("", (("a", "A"),), ())),
+    ("    Indentado\n\n    :param a: A", ("Indentado", (("a", "A"),), ())),
+])
+def test_tokenize_docstring_cases(text, expected):
+    assert parser_module._tokenize_docstring(text) == expected
+
+
+def test_memoized_docstrings_are_not_shared_mutables():
+    result = parser_module._tokenize_docstring(DOCSTRING)
+    assert parser_module._tokenize_docstring(DOCSTRING) is result
+    # Tuplas: nadie puede alterar la entrada memorizada
+    assert isinstance(result[1], tuple) and isinstance(result[2], tuple)
+    
+    parser = OntologyParser()
+    _, descriptions, types = parser._parse_docstring_description(DOCSTRING)
+    descriptions["name"] = "cambiado"
+    types.clear()
+    _, descriptions, types = parser._parse_docstring_description(DOCSTRING)
+    assert descriptions["name"].startswith("Nombre del sensor")
+    assert types["name"] == "str"
+    
+    shared = parser_module._param_descriptions(DOCSTRING)
+    with pytest.raises(TypeError):
+        shared["name"] = "cambiado"
+
+
+def test_attribute_cardinality_flags():
+    assert Attribute("a", "string", cardinality="1").is_required()
+    assert not Attribute("a", "string", cardinality="0..1").is_required()
+    assert Attribute("a", "string", cardinality="1..*").is_multiple()
+    assert not Attribute("a", "string", cardinality="0..1").is_multiple()
+    assert Attribute("a", "string", cardinality="0..1").bounds == (0, 1)
+
+
+def _runtime(text: str) -> str:
+    """Copia de ``text`` creada en ejecución (sin internar por el compilador)."""
+    return "".join(list(text))
+
+
+def test_model_objects_have_no_dict():
+    attr = Attribute("a", "string")
+    cls = Class("c1", "C", attributes=[attr])
+    rel = Relation("r", "C", "D")
+    for obj in (attr, cls, rel):
+        assert not hasattr(obj, "__dict__")
+        # Attribute (frozen con slots) da TypeError en Python < 3.12
+        with pytest.raises((AttributeError, TypeError)):
+            obj.extra = 1
+
+
+def test_model_strings_are_interned(small_xml):
+    a = Attribute(_runtime("event_time"), _runtime("datetime"), _runtime("0..1"))
+    b = Attribute(_runtime("event_time"), _runtime("datetime"), _runtime("0..1"))
+    assert a.name is b.name and a.type is b.type and a.cardinality is b.cardinality
+    cls = Class(_runtime("c1"), _runtime("Book"))
+    rel = Relation(_runtime("is_a"), _runtime("Novel"), _runtime("Book"))
+    assert cls.name is rel.target
+    
+    # Dos parseos comparten las mismas cadenas
+    first = OntologyParser().parse(small_xml)
+    second = OntologyParser().parse(small_xml)
+    assert first.classes[0].attributes[1].name is second.classes[0].attributes[1].name
+    assert first.relations[0].source is second.classes[2].name
+
+
+def test_attribute_is_frozen_value():
+    attr = Attribute("a", "string", "0..1", "Texto", "str")
+    same = Attribute("a", "string", "0..1", "Texto", "str")
+    assert attr == same and attr is not same
+    assert hash(attr) == hash(same)
+    assert len({attr, same}) == 1
+    assert attr != Attribute("a", "string", "0..1", "Otro", "str")
+    assert attr != Attribute("a", "string", "0..1", "Texto")
+    assert attr != ("a", "string")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        attr.name = "b"
+    
+    # replace recalcula bounds; bounds no cuenta en la comparación
+    changed = dataclasses.replace(attr, cardinality="1..*")
+    assert changed.bounds == (1, UNBOUNDED) and changed.is_multiple()
+    assert changed != attr
+    assert pickle.loads(pickle.dumps(attr)) == attr
+    assert pickle.loads(pickle.dumps(attr)).bounds == (0, 1)
+
+
+def test_ontology_indexes_follow_list_changes(small_xml):
+    ontology = OntologyParser().parse(small_xml)
+    assert [rel.name for rel in ontology.outgoing("Author")] == ["writes"]
+    
+    essay = Class(id="essay", name="Essay")
+    ontology.classes.append(essay)
+    ontology.relations.append(Relation(name="cites", source="Essay", target="Book"))
+    assert ontology.get_class("Essay") is essay
+    assert [rel.name for rel in ontology.incoming("Book")] == ["is_a", "writes", "cites"]
+    
+    ontology.classes.remove(essay)
+    assert ontology.get_class("Essay") is None
+    ontology.relations = ontology.relations[:1]
+    assert ontology.outgoing("Author") == []
+    
+    # Los cambios en sitio de un elemento requieren invalidate()
+    ontology.classes[0].name = "Writer"
+    ontology.invalidate()
+    assert ontology.get_class("Writer") is ontology.classes[0]
+
+
+def test_incremental_equals_tree(xml_file):
+    parser = OntologyParser()
+    first = parser.parse_incremental(xml_file)
+    assert first.ontology == parser.parse(xml_file)
+    
+    second = parser.parse_incremental(xml_file, first.snapshot)
+    assert second.changes.is_empty()
+    assert second.ontology == first.ontology
+    # Los elementos sin cambios se reutilizan
+    assert all(new is old for new, old in zip(second.ontology.classes,
+                                              first.ontology.classes))
+
+
+def test_incremental_reports_changes(small_xml):
+    parser = OntologyParser()
+    first = parser.parse_incremental(small_xml)
+    with open(small_xml, encoding="utf-8") as f:
+        text = f.read()
+    text = text.replace('name="genre" type="string"', 'name="genre" type="text"')
+    text = text.replace('<Relation name="is_a" source="Novel" target="Book" />', "")
+    with open(small_xml, "w", encoding="utf-8") as f:
+        f.write(text)
+    
+    result = parser.parse_incremental(small_xml, first.snapshot)
+    assert result.changes.modified == ["Class:Novel"]
+    assert result.changes.removed == ["Relation:Novel-is_a->Book"]
+    assert result.changes.added == []
+    assert result.ontology == parser.parse(small_xml)
+    assert result.ontology.classes[0] is first.ontology.classes[0]
+
+
+@pytest.mark.parametrize("suffix, opener", [
+    (".gz", gzip.open), (".bz2", bz2.open), (".xz", lzma.open),
+])
+@pytest.mark.parametrize("streaming", [False, True])
+def test_compressed_equals_plain(xml_file, tmp_path, suffix, opener, streaming):
+    compressed = tmp_path / f"ontology.xml{suffix}"
+    with open(xml_file, "rb") as src, opener(compressed, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    
+    parser = OntologyParser()
+    expected = parser.parse(xml_file)
+    assert parser.parse(str(compressed), streaming=streaming) == expected
+    # También desde un flujo (stdin), detectando la compresión por la firma
+    with open(compressed, "rb") as stream:
+        assert parser.parse(stream, streaming=streaming) == expected
+
+
+def test_lazy_equals_tree(xml_file):
+    expected = OntologyParser().parse(xml_file)
+    lazy = OntologyParser(lazy_descriptions=True).parse(xml_file)
+    assert isinstance(lazy.classes[0].description, LazyDescription)
+    assert lazy == expected
+    
+    lazy_attrs = [attr for cls in lazy.classes for attr in cls.attributes]
+    attrs = [attr for cls in expected.classes for attr in cls.attributes]
+    # Los tipos declarados en el docstring se resuelven al parsear
+    assert [a.declared_type for a in lazy_attrs] == [a.declared_type for a in attrs]
+    # Sin texto no hay descripción, igual que en el parseo normal
+    assert ([a.description is None for a in lazy_attrs]
+            == [a.description is None for a in attrs])
+    assert [str(a.description) for a in lazy_attrs] == [str(a.description) for a in attrs]
+
+
+def test_lazy_descriptions_become_str_at_the_boundary(small_xml):
+    lazy = OntologyParser(lazy_descriptions=True).parse(small_xml)
+    description = lazy.classes[0].description
+    assert not isinstance(description, str)
+    text = description_text(description)
+    assert text.__class__ is str and text == description
+    assert description_text(None) is None
+    
+    # Las tablas del mapper solo llevan str: json y join funcionan
+    schema = OntologyMapper().map(lazy)
+    descriptions = [table.description for table in schema.tables if table.description]
+    assert descriptions and all(d.__class__ is str for d in descriptions)
+    assert json.loads(json.dumps(descriptions)) == descriptions
+    assert "".join(descriptions)
+
+
+def test_description_source_close(small_xml):
+    parser = OntologyParser(lazy_descriptions=True)
+    description = parser.parse(small_xml).classes[0].description
+    source = description._ref.source
+    expected = str(description)
+    assert source._data is not None
+    
+    with source:
+        pass
+    assert source._data is None
+    # Tras cerrarla vuelve a mapear el archivo si se lee
+    assert str(description) == expected
+    
+    # Sin ciclos: se libera (con su mmap) al soltar la última descripción
+    gc.disable()
+    try:
+        collected = weakref.ref(source)
+        del source, description
+        assert collected() is None
+    finally:
+        gc.enable()
+
+
+def _write_modules(tmp_path):
+    """a.xml importa b.xml.gz, que incluye c.xml.xz, que importa a.xml."""
+    (tmp_path / "a.xml").write_text(
+        '<Ontology><!-- <Import href="missing.xml"/> --><Import href="b.xml.gz"/>'
+        '<Classes><Class name="A"/></Classes></Ontology>', encoding="utf-8")
+    with gzip.open(tmp_path / "b.xml.gz", "wt", encoding="utf-8") as f:
+        f.write('<Ontology><xi:include xmlns:xi="http://www.w3.org/2001/XInclude" '
+                'href="c.xml.xz"/><Class name="B"/></Ontology>')
+    with lzma.open(tmp_path / "c.xml.xz", "wt", encoding="utf-8") as f:
+        f.write('<Ontology><Import href="a.xml"/><Class name="C"/></Ontology>')
+    return str(tmp_path / "a.xml")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_imported_modules(tmp_path, monkeypatch, workers):
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    path = _write_modules(tmp_path)
+    parser = OntologyParser(cache=OntologyCache(tmp_path / "cache"))
+    
+    # Cada módulo va después de los que importa; los ciclos no se repiten
+    ontology = parser.parse(path, workers=workers)
+    assert [cls.name for cls in ontology.classes] == ["C", "B", "A"]
+    assert [cls.name for cls in parser.parse(path, follow_imports=False).classes] == ["A"]
+
+
+def test_import_scan_across_chunks(tmp_path, monkeypatch):
+    path = _write_modules(tmp_path)
+    expected = parser_module._module_order(path)
+    # Bloques diminutos: cortes en mitad de etiquetas y comentarios
+    monkeypatch.setattr(parser_module, "_IMPORT_SCAN_CHUNK", 7)
+    assert parser_module._module_order(path) == expected
+    assert len(expected) == 3